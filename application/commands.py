@@ -1,7 +1,8 @@
 from domain.seedwork import Command, CommandHandler
 from domain.factories import IngestedDataFactory
-from domain.repositories import DataRepository
-from typing import Dict, Any
+from domain.repositories import DataRepository, EventStore
+from domain.entities import IngestedData
+from typing import Dict, Any, List, Optional, Tuple
 
 
 class IngestDataCommand(Command):
@@ -15,10 +16,12 @@ class IngestDataCommand(Command):
 class IngestDataCommandHandler(CommandHandler):
     """Handler for IngestDataCommand"""
     
-    def __init__(self, repository: DataRepository, event_bus):
+    def __init__(self, repository: DataRepository, event_bus, fat_event_max_bytes: int = 0,
+                 event_store: Optional[EventStore] = None):
         self.repository = repository
         self.event_bus = event_bus
-        self.factory = IngestedDataFactory()
+        self.factory = IngestedDataFactory(fat_event_max_bytes)
+        self.event_store = event_store
     
     def handle(self, command: IngestDataCommand):
         """Handle the IngestDataCommand"""
@@ -28,11 +31,63 @@ class IngestDataCommandHandler(CommandHandler):
         # Persist the entity
         self.repository.add(data)
         
-        # Publish domain events
-        for event in data.get_events():
-            self.event_bus.publish(event)
+        # Keep the events in the event store as well, unless the repository appended them
+        if self.event_store is not None and not self.repository.appends_to_event_store:
+            self.event_store.append(data.get_events())
+        
+        # Publish domain events, unless the repository stored them in its outbox
+        if not self.repository.stores_events:
+            for event in data.get_events():
+                self.event_bus.publish(event)
         
         # Clear events to prevent duplicate publishing
         data.clear_events()
         
-        return data
\ No newline at end of file
+        return data
+
+
+class IngestDataBatchCommand(Command):
+    """Command to ingest several records into the system at once"""
+    
+    def __init__(self, records: List[Dict[str, Any]]):
+        self.records = records
+
+
+class IngestDataBatchCommandHandler(CommandHandler):
+    """Handler for IngestDataBatchCommand"""
+    
+    def __init__(self, repository: DataRepository, event_bus, fat_event_max_bytes: int = 0,
+                 event_store: Optional[EventStore] = None):
+        self.repository = repository
+        self.event_bus = event_bus
+        self.factory = IngestedDataFactory(fat_event_max_bytes)
+        self.event_store = event_store
+    
+    def handle(self, command: IngestDataBatchCommand) -> List[Tuple[Optional[IngestedData], Optional[str]]]:
+        """Handle the IngestDataBatchCommand, returning a (data, error) pair per record"""
+        results = []
+        batch = []
+        for record in command.records:
+            try:
+                data = self.factory.create(record["partner_id"], record["payload"])
+            except ValueError as e:
+                results.append((None, str(e)))
+                continue
+            results.append((data, None))
+            batch.append(data)
+        
+        # Persist all valid entities in a single write
+        self.repository.add_many(batch)
+        
+        if self.event_store is not None and not self.repository.appends_to_event_store:
+            self.event_store.append([event for data in batch for event in data.get_events()])
+        
+        # Publish the domain events of the whole batch together
+        if not self.repository.stores_events:
+            events = [event for data in batch for event in data.get_events()]
+            self.event_bus.publish_batch(events)
+        
+        for data in batch:
+            data.clear_events()
+        
+        return results
\ No newline at end of file
@@ -0,0 +1,23 @@
+# application/processing.py
+import time
+
+
+def process_data(data_id, partner_id, timestamp, payload):
+    """
+    Simulate data processing
+    In a real application, this would perform actual processing on the data
+    """
+    print(f"Processing data: {data_id} from partner {partner_id}")
+    
+    # Simulate processing time
+    time.sleep(2)
+    
+    # Return a simulated result
+    return {
+        "processed": True,
+        "data_id": data_id,
+        "partner_id": partner_id,
+        "processing_timestamp": time.time(),
+        "field_count": len(payload) if payload is not None else None,
+        "result": f"Processed data {data_id} successfully"
+    }
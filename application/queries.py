@@ -1,7 +1,10 @@
 # application/queries.py
 from domain.seedwork import Query, QueryHandler
-from domain.repositories import DataRepository
-from typing import List, Optional
+from domain.repositories import DataReader, DataViewRepository
+from domain.entities import IngestedDataSummary
+import base64
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
 
 
 class GetDataByIdQuery(Query):
@@ -14,7 +17,7 @@ class GetDataByIdQuery(Query):
 class GetDataByIdQueryHandler(QueryHandler):
     """Handler for GetDataByIdQuery"""
     
-    def __init__(self, repository: DataRepository):
+    def __init__(self, repository: DataReader):
         self.repository = repository
     
     def handle(self, query: GetDataByIdQuery):
@@ -22,6 +25,24 @@ class GetDataByIdQueryHandler(QueryHandler):
         return self.repository.get_by_id(query.data_id)
 
 
+class GetDataViewQuery(Query):
+    """Query to get the denormalized view of data by ID"""
+    
+    def __init__(self, data_id: str):
+        self.data_id = data_id
+
+
+class GetDataViewQueryHandler(QueryHandler):
+    """Handler for GetDataViewQuery"""
+    
+    def __init__(self, repository: DataViewRepository):
+        self.repository = repository
+    
+    def handle(self, query: GetDataViewQuery):
+        """Handle the GetDataViewQuery"""
+        return self.repository.get_view(query.data_id)
+
+
 class GetDataByPartnerIdQuery(Query):
     """Query to get data by partner ID"""
     
@@ -32,7 +53,7 @@ class GetDataByPartnerIdQuery(Query):
 class GetDataByPartnerIdQueryHandler(QueryHandler):
     """Handler for GetDataByPartnerIdQuery"""
     
-    def __init__(self, repository: DataRepository):
+    def __init__(self, repository: DataReader):
         self.repository = repository
     
     def handle(self, query: GetDataByPartnerIdQuery):
@@ -48,9 +69,91 @@ class GetAllDataQuery(Query):
 class GetAllDataQueryHandler(QueryHandler):
     """Handler for GetAllDataQuery"""
     
-    def __init__(self, repository: DataRepository):
+    def __init__(self, repository: DataReader):
         self.repository = repository
     
     def handle(self, query: GetAllDataQuery):
         """Handle the GetAllDataQuery"""
-        return self.repository.get_all() 
\ No newline at end of file
+        return self.repository.get_all()
+
+
+class GetDataSummariesQuery(Query):
+    """Query to list data without payloads, optionally for a single partner and time range"""
+    
+    def __init__(self, partner_id: Optional[str] = None, start: Optional[datetime] = None,
+                 end: Optional[datetime] = None):
+        self.partner_id = partner_id
+        self.start = start
+        self.end = end
+
+
+class GetDataSummariesQueryHandler(QueryHandler):
+    """Handler for GetDataSummariesQuery"""
+    
+    def __init__(self, repository: DataReader):
+        self.repository = repository
+    
+    def handle(self, query: GetDataSummariesQuery) -> List[IngestedDataSummary]:
+        """Handle the GetDataSummariesQuery"""
+        if query.partner_id is None:
+            return self.repository.get_all_summaries()
+        return self.repository.get_summaries_by_partner_id(query.partner_id, query.start, query.end)
+
+
+def encode_cursor(summary: IngestedDataSummary) -> str:
+    """Build an opaque pagination cursor from the (timestamp, id) key of a summary"""
+    key = f"{summary.timestamp.isoformat()}|{summary.id}"
+    return base64.urlsafe_b64encode(key.encode('utf-8')).decode('ascii').rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Recover the (timestamp, id) key from a pagination cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, data_id = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8').split("|", 1)
+        return datetime.fromisoformat(timestamp), data_id
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid pagination cursor")
+
+
+class GetDataPageQuery(Query):
+    """Query to get one page of data summaries in (timestamp, id) order"""
+    
+    def __init__(self, limit: int, cursor: Optional[str] = None):
+        self.limit = limit
+        self.cursor = cursor
+
+
+class GetDataPageQueryHandler(QueryHandler):
+    """Handler for GetDataPageQuery"""
+    
+    def __init__(self, repository: DataReader):
+        self.repository = repository
+    
+    def handle(self, query: GetDataPageQuery) -> Tuple[List[IngestedDataSummary], Optional[str]]:
+        """Handle the GetDataPageQuery, returning the page and the cursor of the next one"""
+        after = decode_cursor(query.cursor) if query.cursor else None
+        # Read one extra row to know whether there is a next page
+        items = self.repository.get_summary_page(query.limit + 1, after)
+        if len(items) <= query.limit:
+            return items, None
+        items = items[:query.limit]
+        return items, encode_cursor(items[-1])
+
+
+class StreamAllDataQuery(Query):
+    """Query to stream all data summaries without loading them at once"""
+    
+    def __init__(self, batch_size: int = 1000):
+        self.batch_size = batch_size
+
+
+class StreamAllDataQueryHandler(QueryHandler):
+    """Handler for StreamAllDataQuery"""
+    
+    def __init__(self, repository: DataReader):
+        self.repository = repository
+    
+    def handle(self, query: StreamAllDataQuery) -> Iterator[IngestedDataSummary]:
+        """Handle the StreamAllDataQuery"""
+        return self.repository.iter_summaries(query.batch_size)
\ No newline at end of file
@@ -1,17 +1,22 @@
-from domain.repositories import DataRepository
-from domain.entities import IngestedData
-from .commands import IngestDataCommand, IngestDataCommandHandler
+from domain.repositories import DataReader, DataRepository, EventStore
+from domain.entities import IngestedData, IngestedDataSummary
+from .commands import IngestDataCommand, IngestDataCommandHandler, IngestDataBatchCommand, IngestDataBatchCommandHandler
 from .queries import GetDataByIdQuery, GetDataByIdQueryHandler
-from typing import Optional, List
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Tuple, Iterator
 
 
 class DataIngestionService:
     """Service for data ingestion operations"""
     
-    def __init__(self, repository: DataRepository, event_bus):
+    def __init__(self, repository: DataRepository, event_bus, fat_event_max_bytes: int = 0,
+                 event_store: Optional[EventStore] = None):
         self.repository = repository
         self.event_bus = event_bus
-        self.command_handler = IngestDataCommandHandler(repository, event_bus)
+        # Payloads up to this size travel inside DataIngested (0 disables fat events);
+        # with an event store, the events are also appended to it
+        self.command_handler = IngestDataCommandHandler(repository, event_bus, fat_event_max_bytes, event_store)
+        self.batch_command_handler = IngestDataBatchCommandHandler(repository, event_bus, fat_event_max_bytes, event_store)
         self.query_handler = GetDataByIdQueryHandler(repository)
     
     def ingest_data(self, partner_id: str, payload: dict) -> IngestedData:
@@ -19,6 +24,11 @@ class DataIngestionService:
         command = IngestDataCommand(partner_id, payload)
         return self.command_handler.handle(command)
     
+    def ingest_batch(self, records: List[Dict[str, Any]]) -> List[Tuple[Optional[IngestedData], Optional[str]]]:
+        """Ingest several records with a single write and a single event publish"""
+        command = IngestDataBatchCommand(records)
+        return self.batch_command_handler.handle(command)
+    
     def get_data_by_id(self, data_id: str) -> Optional[IngestedData]:
         """Get data by ID"""
         query = GetDataByIdQuery(data_id)
@@ -28,7 +38,7 @@ class DataIngestionService:
 class QueryService:
     """Service for query operations"""
     
-    def __init__(self, repository: DataRepository):
+    def __init__(self, repository: DataReader):
         self.repository = repository
     
     def get_data_by_id(self, data_id: str) -> Optional[IngestedData]:
@@ -37,6 +47,13 @@ class QueryService:
         query = GetDataByIdQuery(data_id)
         return handler.handle(query)
     
+    def get_data_view(self, data_id: str) -> Optional[Dict[str, Any]]:
+        """Get data by ID together with its validation and processing results"""
+        from .queries import GetDataViewQuery, GetDataViewQueryHandler
+        handler = GetDataViewQueryHandler(self.repository)
+        query = GetDataViewQuery(data_id)
+        return handler.handle(query)
+    
     def get_all_data(self) -> List[IngestedData]:
         """Get all data"""
         from .queries import GetAllDataQuery, GetAllDataQueryHandler
@@ -49,4 +66,26 @@ class QueryService:
         from .queries import GetDataByPartnerIdQuery, GetDataByPartnerIdQueryHandler
         handler = GetDataByPartnerIdQueryHandler(self.repository)
         query = GetDataByPartnerIdQuery(partner_id)
+        return handler.handle(query)
+    
+    def get_data_summaries(self, partner_id: Optional[str] = None, start: Optional[datetime] = None,
+                           end: Optional[datetime] = None) -> List[IngestedDataSummary]:
+        """Get id, partner and timestamp of all data, or of one partner's data in [start, end), without payloads"""
+        from .queries import GetDataSummariesQuery, GetDataSummariesQueryHandler
+        handler = GetDataSummariesQueryHandler(self.repository)
+        query = GetDataSummariesQuery(partner_id, start, end)
+        return handler.handle(query)
+    
+    def get_data_page(self, limit: int, cursor: Optional[str] = None) -> Tuple[List[IngestedDataSummary], Optional[str]]:
+        """Get one page of data summaries and the cursor of the next page"""
+        from .queries import GetDataPageQuery, GetDataPageQueryHandler
+        handler = GetDataPageQueryHandler(self.repository)
+        query = GetDataPageQuery(limit, cursor)
+        return handler.handle(query)
+    
+    def stream_all_data(self, batch_size: int = 1000) -> Iterator[IngestedDataSummary]:
+        """Stream all data summaries with constant memory"""
+        from .queries import StreamAllDataQuery, StreamAllDataQueryHandler
+        handler = StreamAllDataQueryHandler(self.repository)
+        query = StreamAllDataQuery(batch_size)
         return handler.handle(query)
\ No newline at end of file
@@ -0,0 +1,140 @@
+# benchmarks/common.py
+"""Workload generation, latency statistics and JSON reports shared by the benchmarks"""
+import json
+import math
+import os
+import platform
+import random
+import string
+import subprocess
+import sys
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class SyntheticWorkload:
+    """Deterministic ingest records with a fixed number of partners and payload size
+
+    Partners are drawn uniformly, or with a Zipf-like skew when skew > 0 so a
+    few partners receive most of the records. Each payload is a flat JSON
+    object of roughly payload_bytes bytes once serialized.
+    """
+
+    def __init__(self, partners: int = 100, payload_bytes: int = 256, skew: float = 0.0, seed: int = 42):
+        self.partner_ids = [f"partner-{index:06d}" for index in range(partners)]
+        self.payload_bytes = payload_bytes
+        self.random = random.Random(seed)
+        self._weights = [1.0 / (rank + 1) ** skew for rank in range(partners)] if skew > 0 else None
+
+    def partner_id(self) -> str:
+        if self._weights is None:
+            return self.random.choice(self.partner_ids)
+        return self.random.choices(self.partner_ids, self._weights)[0]
+
+    def payload(self) -> Dict[str, Any]:
+        # ~40 bytes of JSON per field: "field_00": "<24 chars>",
+        fields = max(1, self.payload_bytes // 40)
+        payload = {
+            f"field_{index:02d}": "".join(self.random.choices(string.ascii_letters, k=24))
+            for index in range(fields - 2)
+        }
+        payload["name"] = "".join(self.random.choices(string.ascii_lowercase, k=8))
+        payload["age"] = self.random.randint(0, 120)
+        return payload
+
+    def record(self) -> Dict[str, Any]:
+        return {"partner_id": self.partner_id(), "payload": self.payload()}
+
+    def records(self, count: int) -> Iterator[Dict[str, Any]]:
+        for _ in range(count):
+            yield self.record()
+
+
+def load_replay_file(path: str) -> List[Dict[str, Any]]:
+    """Requests to replay from a JSONL file
+
+    Each line is either a request, {"method": "GET", "path": "/ingest/all?limit=10"}
+    with an optional "json" body, or an ingest record {"partner_id": ..., "payload": ...}
+    which is sent to POST /ingest. Other lines are skipped.
+    """
+    requests = []
+    skipped = 0
+    with open(path) as replay_file:
+        for line in replay_file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                skipped += 1
+                continue
+            if isinstance(entry, dict) and "method" in entry and "path" in entry:
+                requests.append({"method": entry["method"].upper(), "path": entry["path"], "json": entry.get("json")})
+            elif isinstance(entry, dict) and "partner_id" in entry and "payload" in entry:
+                requests.append({"method": "POST", "path": "/ingest", "json": {
+                    "partner_id": entry["partner_id"], "payload": entry["payload"]
+                }})
+            else:
+                skipped += 1
+    if skipped:
+        print(f"Skipped {skipped} lines of {path} that are neither requests nor ingest records")
+    return requests
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0, items: Optional[int] = None) -> Dict[str, Any]:
+    """Throughput and latency percentiles (milliseconds) of a list of latencies in seconds"""
+    values = sorted(latencies)
+    summary = {
+        "count": len(values),
+        "errors": errors,
+        "seconds": round(elapsed, 4),
+        "per_second": round(len(values) / elapsed, 1) if elapsed > 0 else None,
+        "mean_ms": round(sum(values) / len(values) * 1000, 4) if values else None,
+        "p50_ms": round(percentile(values, 0.50) * 1000, 4),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 4),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 4),
+        "max_ms": round(values[-1] * 1000, 4) if values else None,
+    }
+    if items is not None:
+        summary["items"] = items
+        summary["items_per_second"] = round(items / elapsed, 1) if elapsed > 0 else None
+    return summary
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def write_report(name: str, settings: Dict[str, Any], results: Dict[str, Any], output: Optional[str]):
+    """Print the results and write them as sorted JSON, so reports of two commits diff cleanly"""
+    report = {
+        "benchmark": name,
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "settings": settings,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if output:
+        with open(output, "w") as report_file:
+            report_file.write(text + "\n")
+        print(f"Report written to {output}")
+    else:
+        sys.stdout.write(text + "\n")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# benchmarks/entity_construction.py
+"""Per-entity memory and construction time of IngestedData, before and after __slots__
+
+"legacy" is a copy of the previous dict-based domain classes, where rehydrating
+a stored row went through from_dict and recorded a throwaway DataIngested event.
+
+    python benchmarks/entity_construction.py [--count 100000]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from domain.entities import IngestedData
+from domain.factories import IngestedDataFactory
+from domain.value_objects import PartnerId, Payload, Timestamp
+
+
+class LegacyDataIngested:
+    def __init__(self, data_id, partner_id, timestamp):
+        self.id = str(uuid.uuid4())
+        self.occurred_on = datetime.utcnow()
+        self.data_id = data_id
+        self.partner_id = partner_id
+        self.timestamp = timestamp
+
+
+class LegacyValue:
+    def __init__(self, value):
+        self.value = value
+
+
+class LegacyIngestedData:
+    def __init__(self, partner_id, payload, timestamp=None):
+        self.id = str(uuid.uuid4())
+        self._events = []
+        self._partner_id = partner_id
+        self._payload = payload
+        self._timestamp = timestamp or LegacyValue(datetime.utcnow())
+        self._events.append(LegacyDataIngested(self.id, partner_id.value, self._timestamp.value))
+
+    @classmethod
+    def from_dict(cls, data):
+        entity = cls(
+            partner_id=LegacyValue(data["partner_id"]),
+            payload=LegacyValue(data["payload"]),
+            timestamp=LegacyValue(datetime.fromisoformat(data["timestamp"]))
+        )
+        entity.id = data["id"]
+        return entity
+
+
+def legacy_create(i):
+    return LegacyIngestedData(LegacyValue("partner"), LegacyValue({"i": i}))
+
+
+def legacy_rehydrate(row):
+    data_id, partner_id, payload, timestamp = row
+    return LegacyIngestedData.from_dict({
+        "id": data_id,
+        "partner_id": partner_id,
+        "payload": payload,
+        "timestamp": timestamp.isoformat()
+    })
+
+
+factory = IngestedDataFactory()
+
+
+def slotted_create(i):
+    return factory.create("partner", {"i": i})
+
+
+def slotted_rehydrate(row):
+    data_id, partner_id, payload, timestamp = row
+    return IngestedData.rehydrate(data_id, PartnerId(partner_id), Payload(payload), Timestamp(timestamp))
+
+
+def measure(build, inputs):
+    """Return (microseconds per entity, bytes per entity) for building one entity per input"""
+    gc.collect()
+    start = time.perf_counter()
+    entities = [build(item) for item in inputs]
+    elapsed = time.perf_counter() - start
+    del entities
+
+    gc.collect()
+    tracemalloc.start()
+    entities = [build(item) for item in inputs]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # The payload dicts are shared with the inputs for rehydration, so only the list itself is subtracted
+    allocated -= sys.getsizeof(entities)
+    del entities
+    return elapsed / len(inputs) * 1e6, allocated / len(inputs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    now = datetime.utcnow()
+    numbers = list(range(args.count))
+    rows = [(str(uuid.uuid4()), "partner", {"i": i}, now) for i in numbers]
+
+    print(f"{'case':<32}{'us/entity':>12}{'bytes/entity':>15}")
+    for name, build, inputs in (
+        ("create (legacy)", legacy_create, numbers),
+        ("create (slots)", slotted_create, numbers),
+        ("rehydrate from_dict (legacy)", legacy_rehydrate, rows),
+        ("rehydrate (slots, no events)", slotted_rehydrate, rows),
+    ):
+        micros, size = measure(build, inputs)
+        print(f"{name:<32}{micros:>12.2f}{size:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+# benchmarks/http_load.py
+"""Load test of the ingestion and query endpoints of infrastructure/api.py
+
+Drives the Flask app through its test client or over real HTTP (a local
+threaded server), backed by SQLite or by InMemoryDataRepository, with a
+SimpleEventBus. Each phase reports throughput and p50/p95/p99 latency per
+endpoint; --output writes the report as JSON to diff between commits.
+
+    python benchmarks/http_load.py [--mode test-client|http] [--repository sqlite|memory]
+        [--requests 2000] [--concurrency 8] [--partners 100] [--payload-bytes 256]
+        [--skew 0] [--batch-size 100] [--replay requests.jsonl] [--output report.json]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.common import SyntheticWorkload, load_replay_file, summarize, write_report
+
+
+class TestClientDriver:
+    """Sends requests through Flask's test client, one client per thread"""
+
+    name = "test-client"
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method: str, path: str, body: Optional[Any] = None) -> Tuple[int, bytes]:
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(path, method=method, json=body)
+        return response.status_code, response.get_data()
+
+    def close(self):
+        pass
+
+
+class HttpDriver:
+    """Serves the app on a local threaded HTTP/1.1 server and sends requests over keep-alive connections"""
+
+    name = "http"
+
+    def __init__(self, app):
+        from werkzeug.serving import make_server, WSGIRequestHandler
+
+        class KeepAliveHandler(WSGIRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_request(self, *args, **kwargs):
+                pass
+
+        self.server = make_server("127.0.0.1", 0, app, threaded=True, request_handler=KeepAliveHandler)
+        self.port = self.server.server_port
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        self._local = threading.local()
+
+    def request(self, method: str, path: str, body: Optional[Any] = None) -> Tuple[int, bytes]:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection("127.0.0.1", self.port)
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        headers = {"Content-Type": "application/json"} if data is not None else {}
+        try:
+            connection.request(method, path, body=data, headers=headers)
+            response = connection.getresponse()
+            return response.status, response.read()
+        except (http.client.HTTPException, ConnectionError):
+            connection.close()
+            self._local.connection = None
+            raise
+
+    def close(self):
+        self.server.shutdown()
+
+
+def build_app(repository: str):
+    """Import the app and wire it to the chosen repository with a fresh SimpleEventBus"""
+    from infrastructure import api
+    from infrastructure.event_bus import SimpleEventBus
+    from infrastructure.repositories_impl import InMemoryDataRepository, SQLAlchemyDataRepository
+    from application.services import DataIngestionService, QueryService
+
+    data_repo = InMemoryDataRepository() if repository == "memory" else SQLAlchemyDataRepository()
+    # No debug subscribers: printing every event would dominate the measurements
+    api.data_service = DataIngestionService(data_repo, SimpleEventBus())
+    api.query_service = QueryService(data_repo)
+    return api.app
+
+
+def endpoint_of(app, method: str, path: str) -> str:
+    """Route of a request, e.g. "GET /ingest/<data_id>", to group latencies by endpoint"""
+    try:
+        rule, _ = app.url_map.bind("localhost").match(path.split("?", 1)[0], method=method, return_rule=True)
+        return f"{method} {rule.rule}"
+    except Exception:
+        return f"{method} {path.split('?', 1)[0]}"
+
+
+def run_phase(driver, app, requests: List[Dict[str, Any]], concurrency: int,
+              on_response: Callable[[Dict[str, Any], int, bytes], None] = None,
+              items_of: Callable[[Dict[str, Any]], int] = None) -> Dict[str, Any]:
+    """Send the requests on `concurrency` threads and summarize them per endpoint"""
+    latencies: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    items: Dict[str, int] = {}
+    lock = threading.Lock()
+
+    def send(request):
+        endpoint = endpoint_of(app, request["method"], request["path"])
+        started = time.perf_counter()
+        try:
+            status, body = driver.request(request["method"], request["path"], request.get("json"))
+            failed = status >= 400
+        except Exception:
+            status, body, failed = None, b"", True
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.setdefault(endpoint, []).append(elapsed)
+            if failed:
+                errors[endpoint] = errors.get(endpoint, 0) + 1
+            if items_of is not None:
+                items[endpoint] = items.get(endpoint, 0) + items_of(request)
+        if on_response is not None and not failed:
+            on_response(request, status, body)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(send, requests))
+    elapsed = time.perf_counter() - started
+    return {
+        endpoint: summarize(values, elapsed, errors.get(endpoint, 0), items.get(endpoint) if items_of else None)
+        for endpoint, values in sorted(latencies.items())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=("test-client", "http"), default="test-client")
+    parser.add_argument("--repository", choices=("sqlite", "memory"), default="sqlite")
+    parser.add_argument("--database-url", help="SQLAlchemy URL, a fresh SQLite file by default")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per phase")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--partners", type=int, default=100)
+    parser.add_argument("--payload-bytes", type=int, default=256)
+    parser.add_argument("--skew", type=float, default=0.0, help="Zipf exponent of the partner distribution")
+    parser.add_argument("--batch-size", type=int, default=100, help="records per /ingest/batch request")
+    parser.add_argument("--page-size", type=int, default=100, help="limit of /ingest/all pages")
+    parser.add_argument("--replay", help="JSONL file of requests or ingest records to replay")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    # The database URL is read when the infrastructure modules are imported
+    if args.repository == "sqlite":
+        database_url = args.database_url or f"sqlite:///{tempfile.mkdtemp(prefix='bench-')}/ingestion.db"
+        os.environ["DATABASE_URL"] = database_url
+    app = build_app(args.repository)
+    driver = HttpDriver(app) if args.mode == "http" else TestClientDriver(app)
+    workload = SyntheticWorkload(args.partners, args.payload_bytes, args.skew, args.seed)
+    pick = random.Random(args.seed)
+    results = {}
+
+    ingested_ids = []
+
+    def remember_id(request, status, body):
+        ingested_ids.append(json.loads(body)["id"])
+
+    try:
+        print(f"ingest: {args.requests} requests")
+        results["ingest"] = run_phase(driver, app, [
+            {"method": "POST", "path": "/ingest", "json": record} for record in workload.records(args.requests)
+        ], args.concurrency, on_response=remember_id)
+
+        batches = max(1, args.requests // args.batch_size)
+        print(f"ingest_batch: {batches} requests of {args.batch_size} records")
+        results["ingest_batch"] = run_phase(driver, app, [
+            {"method": "POST", "path": "/ingest/batch", "json": list(workload.records(args.batch_size))}
+            for _ in range(batches)
+        ], args.concurrency, items_of=lambda request: len(request["json"]))
+
+        print(f"get_by_id: {args.requests} requests")
+        results["get_by_id"] = run_phase(driver, app, [
+            {"method": "GET", "path": f"/ingest/{pick.choice(ingested_ids)}"} for _ in range(args.requests)
+        ], args.concurrency)
+
+        partner_requests = max(1, args.requests // 10)
+        print(f"get_by_partner: {partner_requests} requests")
+        results["get_by_partner"] = run_phase(driver, app, [
+            {"method": "GET", "path": f"/ingest/partner/{workload.partner_id()}"} for _ in range(partner_requests)
+        ], args.concurrency)
+
+        print(f"list_pages: {partner_requests} requests")
+        results["list_pages"] = run_phase(driver, app, [
+            {"method": "GET", "path": f"/ingest/all?limit={args.page_size}"} for _ in range(partner_requests)
+        ], args.concurrency)
+
+        if args.replay:
+            requests = load_replay_file(args.replay)
+            print(f"replay: {len(requests)} requests from {args.replay}")
+            results["replay"] = run_phase(driver, app, requests, args.concurrency)
+    finally:
+        driver.close()
+
+    write_report("http_load", {
+        "mode": args.mode,
+        "repository": args.repository,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "partners": args.partners,
+        "payload_bytes": args.payload_bytes,
+        "skew": args.skew,
+        "batch_size": args.batch_size,
+        "page_size": args.page_size,
+        "replay": args.replay,
+        "seed": args.seed,
+    }, results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# benchmarks/repositories.py
+"""Latency of DataRepository add, get_by_id and get_by_partner_id as the data set grows
+
+Both repositories are filled with add_many up to each size in turn, then
+--operations calls of each method are timed against the filled repository.
+SQLite uses a fresh file unless DATABASE_URL points elsewhere.
+
+    python benchmarks/repositories.py [--repository memory sqlite] [--sizes 1000 10000 100000 1000000]
+        [--operations 1000] [--partners 100] [--payload-bytes 256] [--skew 0] [--output report.json]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.common import SyntheticWorkload, summarize, write_report
+
+# Rows per add_many call while seeding
+SEED_BATCH_SIZE = 10000
+
+
+def create_repository(name: str):
+    if name == "memory":
+        from infrastructure.repositories_impl import InMemoryDataRepository
+        return InMemoryDataRepository()
+    from infrastructure.database import create_tables
+    from infrastructure.repositories_impl import SQLAlchemyDataRepository
+    create_tables()
+    return SQLAlchemyDataRepository()
+
+
+def timed(operation, arguments):
+    latencies = []
+    started = time.perf_counter()
+    for argument in arguments:
+        call_started = time.perf_counter()
+        operation(argument)
+        latencies.append(time.perf_counter() - call_started)
+    return latencies, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repository", nargs="+", choices=("memory", "sqlite"), default=["memory", "sqlite"])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--operations", type=int, default=1000, help="timed calls of each method per size")
+    parser.add_argument("--partners", type=int, default=100)
+    parser.add_argument("--payload-bytes", type=int, default=256)
+    parser.add_argument("--skew", type=float, default=0.0, help="Zipf exponent of the partner distribution")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    # The database URL is read when the infrastructure modules are imported
+    if "sqlite" in args.repository and not os.environ.get("DATABASE_URL"):
+        os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='bench-')}/ingestion.db"
+    from domain.factories import IngestedDataFactory
+    factory = IngestedDataFactory()
+
+    results = {}
+    for name in args.repository:
+        repository = create_repository(name)
+        workload = SyntheticWorkload(args.partners, args.payload_bytes, args.skew, args.seed)
+        pick = random.Random(args.seed)
+        ids = []
+        results[name] = {}
+
+        def new_entities(count):
+            return [factory.create(record["partner_id"], record["payload"]) for record in workload.records(count)]
+
+        for size in sorted(args.sizes):
+            while len(ids) < size:
+                batch = new_entities(min(SEED_BATCH_SIZE, size - len(ids)))
+                repository.add_many(batch)
+                ids.extend(data.id for data in batch)
+            print(f"{name}: {len(ids)} records")
+
+            size_results = {}
+            latencies, elapsed = timed(repository.get_by_id, [pick.choice(ids) for _ in range(args.operations)])
+            size_results["get_by_id"] = summarize(latencies, elapsed)
+            partner_latencies, elapsed = timed(
+                repository.get_by_partner_id, [workload.partner_id() for _ in range(args.operations)]
+            )
+            size_results["get_by_partner_id"] = summarize(partner_latencies, elapsed)
+            # Timed last so the reads above see exactly `size` records
+            added = new_entities(args.operations)
+            latencies, elapsed = timed(repository.add, added)
+            ids.extend(data.id for data in added)
+            size_results["add"] = summarize(latencies, elapsed)
+            results[name][str(size)] = size_results
+
+    write_report("repositories", {
+        "repositories": args.repository,
+        "sizes": sorted(args.sizes),
+        "operations": args.operations,
+        "partners": args.partners,
+        "payload_bytes": args.payload_bytes,
+        "skew": args.skew,
+        "seed": args.seed,
+    }, results, args.output)
+
+
+if __name__ == "__main__":
+    main()
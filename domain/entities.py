@@ -2,18 +2,25 @@
 from .seedwork import Entity, Aggregate
 from .value_objects import Timestamp, PartnerId, Payload
 from .events import DataIngested
-from typing import Dict, Any
+from datetime import datetime
+from typing import Dict, Any, NamedTuple
 
 
 class IngestedData(Aggregate):
     """Aggregate root for ingested data"""
     
-    def __init__(self, partner_id: PartnerId, payload: Payload, timestamp: Timestamp = None):
+    __slots__ = ("_partner_id", "_payload", "_timestamp")
+    
+    def __init__(self, partner_id: PartnerId, payload: Payload, timestamp: Timestamp = None,
+                 embed_payload: bool = False):
         super().__init__()
         self._partner_id = partner_id
         self._payload = payload
         self._timestamp = timestamp or Timestamp()
-        self._record_event(DataIngested(self.id, self.partner_id.value, self.timestamp.value))
+        self._record_event(DataIngested(
+            self.id, self.partner_id.value, self.timestamp.value,
+            payload=self.payload.value if embed_payload else None
+        ))
     
     @property
     def partner_id(self) -> PartnerId:
@@ -36,15 +43,37 @@ class IngestedData(Aggregate):
             "timestamp": self.timestamp.value.isoformat()
         }
     
+    @classmethod
+    def rehydrate(cls, data_id: str, partner_id: PartnerId, payload: Payload, timestamp: Timestamp) -> 'IngestedData':
+        """Rebuild an already stored entity; unlike the constructor it records no DataIngested event"""
+        entity = cls.__new__(cls)
+        entity._id = data_id
+        entity._events = []
+        entity._partner_id = partner_id
+        entity._payload = payload
+        entity._timestamp = timestamp
+        return entity
+    
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'IngestedData':
         """Create entity from dictionary representation"""
-        from datetime import datetime
-        
-        entity = cls(
-            partner_id=PartnerId(data["partner_id"]),
-            payload=Payload(data["payload"]),
-            timestamp=Timestamp(datetime.fromisoformat(data["timestamp"]))
+        return cls.rehydrate(
+            data["id"],
+            PartnerId(data["partner_id"]),
+            Payload(data["payload"]),
+            Timestamp(datetime.fromisoformat(data["timestamp"]))
         )
-        entity.id = data["id"]
-        return entity
\ No newline at end of file
+
+class IngestedDataSummary(NamedTuple):
+    """Lightweight read-only view of IngestedData without its payload, used by listings"""
+    id: str
+    partner_id: str
+    timestamp: datetime
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert summary to dictionary representation"""
+        return {
+            "id": self.id,
+            "partner_id": self.partner_id,
+            "timestamp": self.timestamp.isoformat()
+        }
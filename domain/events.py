@@ -1,33 +1,54 @@
 from .seedwork import DomainEvent
 from datetime import datetime
+from typing import Optional
 
 
 class DataIngested(DomainEvent):
     """Event triggered when new data is ingested into the system"""
     
-    def __init__(self, data_id: str, partner_id: str, timestamp: datetime):
+    __slots__ = ("data_id", "partner_id", "timestamp", "payload")
+    
+    def __init__(self, data_id: str, partner_id: str, timestamp: datetime, payload: Optional[dict] = None):
         super().__init__()
         self.data_id = data_id
         self.partner_id = partner_id
         self.timestamp = timestamp
+        # Only set for "fat" events; consumers read the payload from the repository otherwise
+        self.payload = payload
+    
+    @property
+    def aggregate_id(self) -> str:
+        return self.data_id
 
 
 class DataProcessed(DomainEvent):
     """Event triggered when data has been processed"""
     
+    __slots__ = ("data_id", "partner_id", "result")
+    
     def __init__(self, data_id: str, partner_id: str, result: dict):
         super().__init__()
         self.data_id = data_id
         self.partner_id = partner_id
         self.result = result
+    
+    @property
+    def aggregate_id(self) -> str:
+        return self.data_id
 
 
 class DataValidated(DomainEvent):
     """Event triggered when data has been validated"""
     
+    __slots__ = ("data_id", "partner_id", "is_valid", "validation_errors")
+    
     def __init__(self, data_id: str, partner_id: str, is_valid: bool, validation_errors=None):
         super().__init__()
         self.data_id = data_id
         self.partner_id = partner_id
         self.is_valid = is_valid
-        self.validation_errors = validation_errors or []
\ No newline at end of file
+        self.validation_errors = validation_errors or []
+    
+    @property
+    def aggregate_id(self) -> str:
+        return self.data_id
@@ -2,16 +2,33 @@
 from .seedwork import Factory
 from .entities import IngestedData
 from .value_objects import PartnerId, Payload, Timestamp
+import json
 from typing import Dict, Any
 
 
 class IngestedDataFactory(Factory):
-    """Factory for creating IngestedData entities"""
+    """Factory for creating IngestedData entities
+    
+    With fat_event_max_bytes > 0, payloads whose JSON form fits in that many
+    bytes are embedded in the DataIngested event, so consumers need not read
+    them back from the repository.
+    """
+    
+    def __init__(self, fat_event_max_bytes: int = 0):
+        self.fat_event_max_bytes = fat_event_max_bytes
     
     def create(self, partner_id: str, payload: Dict[str, Any], timestamp=None) -> IngestedData:
         """Create a new IngestedData entity"""
+        partner_id = PartnerId(partner_id)
+        payload = Payload(payload)
         return IngestedData(
-            partner_id=PartnerId(partner_id),
-            payload=Payload(payload),
-            timestamp=Timestamp(timestamp) if timestamp else None
-        ) 
\ No newline at end of file
+            partner_id=partner_id,
+            payload=payload,
+            timestamp=Timestamp(timestamp) if timestamp else None,
+            embed_payload=self._fits_in_event(payload.value)
+        )
+    
+    def _fits_in_event(self, payload: Dict[str, Any]) -> bool:
+        if self.fat_event_max_bytes <= 0:
+            return False
+        return len(json.dumps(payload).encode('utf-8')) <= self.fat_event_max_bytes 
\ No newline at end of file
@@ -0,0 +1,94 @@
+# domain/ids.py
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Dict, Type, Union
+
+
+class IdGenerator(ABC):
+    """Base interface for entity and event id generators"""
+
+    @abstractmethod
+    def new_id(self) -> str:
+        pass
+
+
+class UUID4Generator(IdGenerator):
+    """Random UUIDs, the original id format"""
+
+    def new_id(self) -> str:
+        return str(uuid.uuid4())
+
+
+class UUID7Generator(IdGenerator):
+    """Time-ordered UUIDs following the UUIDv7 layout
+
+    The first 48 bits are the Unix time in milliseconds and the 12 bits after the
+    version are a counter, so ids made by one process are strictly increasing and
+    sort the same way as strings. The counter starts at a random value every
+    millisecond and the last 62 bits are random, which keeps ids from different
+    processes apart. If the clock goes backwards or the counter overflows, the
+    millisecond of the previous id is reused or advanced, never decreased.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_ms = 0
+        self._counter = 0
+
+    def new_id(self) -> str:
+        now_ms = time.time_ns() // 1_000_000
+        with self._lock:
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                # Leave half of the counter range for ids made within the same millisecond
+                self._counter = int.from_bytes(os.urandom(2), 'big') & 0x7FF
+            else:
+                self._counter += 1
+                if self._counter > 0xFFF:
+                    self._last_ms += 1
+                    self._counter = 0
+            timestamp_ms, counter = self._last_ms, self._counter
+        random_bits = int.from_bytes(os.urandom(8), 'big') & 0x3FFFFFFFFFFFFFFF
+        value = (timestamp_ms << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | random_bits
+        hex_value = '%032x' % value
+        return f"{hex_value[:8]}-{hex_value[8:12]}-{hex_value[12:16]}-{hex_value[16:20]}-{hex_value[20:]}"
+
+
+ID_GENERATORS: Dict[str, Type[IdGenerator]] = {
+    "uuid7": UUID7Generator,
+    "uuid4": UUID4Generator,
+}
+
+_generator: IdGenerator = UUID7Generator()
+
+
+def set_id_generator(generator: Union[str, IdGenerator]) -> None:
+    """Replace the generator used for new ids, by instance or by name ("uuid7", "uuid4")"""
+    global _generator
+    if isinstance(generator, str):
+        if generator not in ID_GENERATORS:
+            raise ValueError(f"Id generator must be one of {tuple(ID_GENERATORS)}")
+        generator = ID_GENERATORS[generator]()
+    _generator = generator
+
+
+def new_id() -> str:
+    """Generate an id with the configured generator"""
+    return _generator.new_id()
+
+
+# Namespace of the ids derived from other ids, see derived_id
+DERIVED_ID_NAMESPACE = uuid.UUID("6f1d3c2e-8b4a-5e7f-9a0b-1c2d3e4f5a6b")
+
+
+def derived_id(source_id: str, name: str) -> str:
+    """Id that is the same for every call with the same source id and name
+
+    Used for the events a consumer emits in reaction to another event, so a
+    redelivered event leads to the same reaction id.
+    """
+    return str(uuid.uuid5(DERIVED_ID_NAMESPACE, f"{name}:{source_id}"))
+
@@ -1,28 +1,115 @@
 # domain/repositories.py
-from .seedwork import Repository
-from .entities import IngestedData
-from typing import List, Optional
+from .seedwork import Repository, DomainEvent
+from .entities import IngestedData, IngestedDataSummary
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 
-class DataRepository(Repository):
+class DataReader:
+    """Read-only interface for IngestedData entities, implemented by write and read models alike"""
+    
+    def get_by_id(self, data_id: str) -> Optional[IngestedData]:
+        """Get an IngestedData entity by its ID"""
+        pass
+    
+    def get_by_ids(self, data_ids: Iterable[str]) -> Dict[str, IngestedData]:
+        """Get several IngestedData entities at once, keyed by ID; missing IDs are left out"""
+        pass
+    
+    def get_all(self) -> List[IngestedData]:
+        """Get all IngestedData entities"""
+        pass
+    
+    def get_by_partner_id(self, partner_id: str) -> List[IngestedData]:
+        """Get all IngestedData entities for a specific partner"""
+        pass
+    
+    def get_all_summaries(self) -> List[IngestedDataSummary]:
+        """Get id, partner and timestamp of all entities, without their payloads"""
+        pass
+    
+    def get_summaries_by_partner_id(self, partner_id: str, start: Optional[datetime] = None,
+                                    end: Optional[datetime] = None) -> List[IngestedDataSummary]:
+        """Get id, partner and timestamp of a partner's entities in (timestamp, id) order, without payloads
+        
+        When given, only entities with start <= timestamp < end are returned.
+        """
+        pass
+    
+    def get_summary_page(self, limit: int, after: Optional[Tuple[datetime, str]] = None) -> List[IngestedDataSummary]:
+        """Get up to `limit` summaries ordered by (timestamp, id), starting after the given key"""
+        pass
+    
+    def iter_summaries(self, batch_size: int = 1000) -> Iterator[IngestedDataSummary]:
+        """Stream all summaries ordered by (timestamp, id) without loading them at once"""
+        pass
+
+
+class DataRepository(DataReader, Repository):
     """Repository interface for IngestedData entities"""
     
+    # True when add()/add_many() also persist the entities' pending domain events
+    # (transactional outbox), so callers must not publish those events themselves
+    stores_events = False
+    
+    # True when add()/add_many() also append the entities' pending domain events to the
+    # event store in the same transaction, so callers must not append them themselves
+    appends_to_event_store = False
+    
     def add(self, data: IngestedData) -> None:
         """Add a new IngestedData entity to the repository"""
         pass
     
+    def add_many(self, data_list: List[IngestedData]) -> None:
+        """Add several IngestedData entities to the repository in one write"""
+        pass
+    
     def update(self, data: IngestedData) -> None:
         """Update an existing IngestedData entity in the repository"""
         pass
+
+
+class DataViewRepository(DataReader):
+    """Read-side interface that also serves denormalized views; read models are only updated from events"""
     
-    def get_by_id(self, data_id: str) -> Optional[IngestedData]:
-        """Get an IngestedData entity by its ID"""
+    def get_view(self, data_id: str) -> Optional[Dict[str, Any]]:
+        """Get the view of an entity, including its validation and processing results"""
         pass
+
+
+class EventStore:
+    """Append-only store of domain events, ordered by a global sequence number
     
-    def get_all(self) -> List[IngestedData]:
-        """Get all IngestedData entities"""
+    Every stored event gets the next sequence number and is also indexed by
+    the ID of its aggregate. The state of an aggregate can be snapshotted so
+    that loading it does not fold its whole history.
+    """
+    
+    def append(self, events: List[DomainEvent]) -> None:
+        """Append events in one write; events already stored (same ID) are skipped"""
         pass
     
-    def get_by_partner_id(self, partner_id: str) -> List[IngestedData]:
-        """Get all IngestedData entities for a specific partner"""
+    def last_sequence(self) -> int:
+        """Sequence number of the newest stored event, 0 when empty"""
+        pass
+    
+    def get_events(self, aggregate_id: str, after_sequence: int = 0) -> List[Tuple[int, DomainEvent]]:
+        """(sequence, event) pairs of one aggregate, oldest first"""
+        pass
+    
+    def iter_events(self, after_sequence: int = 0, batch_size: int = 1000,
+                    event_types: Optional[List[str]] = None) -> Iterator[Tuple[int, DomainEvent]]:
+        """Stream (sequence, event) pairs after a sequence number, reading batch_size at a time"""
+        pass
+    
+    def get_snapshot(self, aggregate_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """(sequence, state) of the latest snapshot of an aggregate"""
+        pass
+    
+    def save_snapshot(self, aggregate_id: str, sequence: int, state: Dict[str, Any]) -> None:
+        """Store the state of an aggregate as of the event with the given sequence number"""
+        pass
+    
+    def load_state(self, aggregate_id: str) -> Optional[Dict[str, Any]]:
+        """Current state of an aggregate: its latest snapshot plus the events stored after it"""
         pass
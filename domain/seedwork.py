@@ -1,15 +1,17 @@
 # domain/seedwork.py
-import uuid
 from abc import ABC, abstractmethod
 from datetime import datetime
 from typing import List, Any, Dict, Type
+from .ids import new_id
 
 
 class Entity(ABC):
     """Base class for all domain entities"""
     
+    __slots__ = ("_id", "_events")
+    
     def __init__(self):
-        self.id = str(uuid.uuid4())
+        self.id = new_id()
         self._events = []
     
     @property
@@ -33,6 +35,8 @@ class Entity(ABC):
 class ValueObject(ABC):
     """Base class for all value objects"""
     
+    __slots__ = ()
+    
     @abstractmethod
     def __eq__(self, other):
         pass
@@ -41,9 +45,16 @@ class ValueObject(ABC):
 class DomainEvent(ABC):
     """Base class for all domain events"""
     
+    __slots__ = ("id", "occurred_on")
+    
     def __init__(self):
-        self.id = str(uuid.uuid4())
+        self.id = new_id()
         self.occurred_on = datetime.utcnow()
+    
+    @property
+    def aggregate_id(self) -> str:
+        """ID of the aggregate the event belongs to, the event's own ID by default"""
+        return self.id
 
 
 class Repository(ABC):
@@ -68,7 +79,8 @@ class Repository(ABC):
 
 class Aggregate(Entity):
     """Base class for all aggregates"""
-    pass
+    
+    __slots__ = ()
 
 
 class Factory(ABC):
@@ -119,4 +131,13 @@ class EventBus(ABC):
     
     @abstractmethod
     def subscribe(self, event_type, handler):
-        pass 
\ No newline at end of file
+        pass
+    
+    def publish_batch(self, events):
+        """Publish several events; implementations may send them together"""
+        for event in events:
+            self.publish(event)
+    
+    def subscribe_batch(self, event_type, handler, **options):
+        """Subscribe a handler that takes a list of events; implementations may deliver larger batches"""
+        self.subscribe(event_type, lambda event: handler([event]))
@@ -0,0 +1,215 @@
+# domain/validation.py
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+ValidationResult = Tuple[bool, List[str]]
+Validator = Callable[[Any], ValidationResult]
+
+_MISSING = object()
+
+# Python types accepted by each declared "type"; bool is excluded from the numeric ones,
+# so unlike the original validator the default rules reject a boolean age
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "string": lambda value: isinstance(value, str),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "null": lambda value: value is None,
+}
+
+# Rules applied to partners without a rule set of their own; the checks of the original
+# validator, except that true/false is no longer taken for a number
+DEFAULT_RULE_SET = {
+    "version": 1,
+    "rules": [
+        {"path": "name", "not_empty": True, "messages": {"not_empty": "Name field is required"}},
+        {"path": "age", "type": "number", "min": 0, "max": 120, "messages": {
+            "type": "Age must be a number",
+            "range": "Age must be between 0 and 120",
+        }},
+    ],
+}
+
+
+class RuleDefinitionError(ValueError):
+    """Raised when a rule set cannot be compiled"""
+    pass
+
+
+def _resolve(payload: Dict[str, Any], path: Tuple[str, ...]) -> Any:
+    value = payload
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return _MISSING
+        value = value[key]
+    return value
+
+
+def _compile_rule(rule: Dict[str, Any]) -> Tuple[Tuple[str, ...], bool, str, List[Callable[[Any], Optional[str]]]]:
+    """Turn one rule definition into (path, required, missing message, value checks)"""
+    if not rule.get("path"):
+        raise RuleDefinitionError(f"Rule without path: {rule}")
+    path_text = rule["path"]
+    messages = rule.get("messages", {})
+    checks = []
+
+    if "type" in rule:
+        if rule["type"] not in _TYPE_CHECKS:
+            raise RuleDefinitionError(f"Unknown type {rule['type']!r} in rule for {path_text}")
+        is_type = _TYPE_CHECKS[rule["type"]]
+        type_message = messages.get("type", f"{path_text} must be of type {rule['type']}")
+        checks.append(lambda value: None if is_type(value) else type_message)
+
+    if rule.get("not_empty"):
+        empty_message = messages.get("not_empty", f"{path_text} must not be empty")
+        checks.append(lambda value: None if value else empty_message)
+
+    if "min" in rule or "max" in rule:
+        low, high = rule.get("min"), rule.get("max")
+        if low is not None and high is not None:
+            default = f"{path_text} must be between {low} and {high}"
+        elif low is not None:
+            default = f"{path_text} must be at least {low}"
+        else:
+            default = f"{path_text} must be at most {high}"
+        range_message = messages.get("range", default)
+        is_number = _TYPE_CHECKS["number"]
+
+        def check_range(value, low=low, high=high):
+            # Only numbers are range-checked, a wrong type is reported by the "type" rule
+            if not is_number(value):
+                return None
+            if (low is not None and value < low) or (high is not None and value > high):
+                return range_message
+            return None
+        checks.append(check_range)
+
+    if "min_length" in rule or "max_length" in rule:
+        min_length, max_length = rule.get("min_length", 0), rule.get("max_length")
+        length_message = messages.get("length", f"{path_text} has an invalid length")
+
+        def check_length(value):
+            if not isinstance(value, (str, list, dict)):
+                return None
+            if len(value) < min_length or (max_length is not None and len(value) > max_length):
+                return length_message
+            return None
+        checks.append(check_length)
+
+    if "pattern" in rule:
+        try:
+            pattern = re.compile(rule["pattern"])
+        except re.error as e:
+            raise RuleDefinitionError(f"Invalid pattern for {path_text}: {e}")
+        pattern_message = messages.get("pattern", f"{path_text} must match {rule['pattern']}")
+        checks.append(lambda value: None if isinstance(value, str) and pattern.search(value) else pattern_message)
+
+    if "enum" in rule:
+        allowed = list(rule["enum"])
+        try:
+            allowed_set = frozenset(allowed)
+        except TypeError:
+            allowed_set = None
+        enum_message = messages.get("enum", f"{path_text} must be one of {allowed}")
+
+        def check_enum(value):
+            try:
+                if allowed_set is not None:
+                    return None if value in allowed_set else enum_message
+            except TypeError:
+                pass
+            return None if value in allowed else enum_message
+        checks.append(check_enum)
+
+    required_message = messages.get("required", f"{path_text} is required")
+    return tuple(path_text.split(".")), bool(rule.get("required")), required_message, checks
+
+
+def compile_rule_set(rule_set: Dict[str, Any]) -> Validator:
+    """Compile a rule set once into a validator(payload) -> (is_valid, errors) callable
+
+    Rules on the same path share a single lookup of the value, so errors are
+    reported grouped by path, in the order the paths first appear.
+    """
+    by_path: Dict[Tuple[str, ...], List] = {}
+    for rule in rule_set.get("rules", []):
+        path, required, required_message, checks = _compile_rule(rule)
+        entry = by_path.setdefault(path, [False, None, []])
+        if required and not entry[0]:
+            entry[0], entry[1] = True, required_message
+        entry[2].extend(checks)
+    compiled = [(path, required, message, tuple(checks)) for path, (required, message, checks) in by_path.items()]
+
+    def validate(payload: Any) -> ValidationResult:
+        if not isinstance(payload, dict):
+            return False, ["Payload must be a JSON object"]
+        errors = []
+        for path, required, required_message, checks in compiled:
+            value = payload.get(path[0], _MISSING) if len(path) == 1 else _resolve(payload, path)
+            if value is _MISSING:
+                if required:
+                    errors.append(required_message)
+                continue
+            for check in checks:
+                error = check(value)
+                if error is not None:
+                    errors.append(error)
+        return not errors, errors
+
+    return validate
+
+
+class RuleEngine:
+    """Validates payloads against per-partner rule sets
+
+    `rule_sets` maps partner IDs to rule sets, each a dict with a "version" and
+    a list of "rules"; partners without one use `default`. Each rule names a
+    dotted `path` into the payload and any of: required, type, not_empty,
+    min/max, min_length/max_length, pattern, enum, and optional custom
+    `messages` per check. Compiled validators are cached by (partner, version),
+    so replacing a rule set with a new version recompiles it once.
+    """
+
+    def __init__(self, rule_sets: Dict[str, Dict[str, Any]] = None, default: Dict[str, Any] = None):
+        self.rule_sets = rule_sets or {}
+        self.default = default or DEFAULT_RULE_SET
+        self._compiled: Dict[Tuple[Optional[str], Any], Validator] = {}
+
+    def update(self, rule_sets: Dict[str, Dict[str, Any]], default: Dict[str, Any] = None):
+        """Replace the rule sets, compiling the new versions up front
+
+        Validators of unchanged versions are kept. A rule set that does not
+        compile raises RuleDefinitionError and leaves the previous rules in place.
+        """
+        default = default if default is not None else self.default
+        wanted = [((partner_id, rule_set.get("version")), rule_set) for partner_id, rule_set in rule_sets.items()]
+        wanted.append(((None, default.get("version")), default))
+        compiled = {key: self._compiled.get(key) or compile_rule_set(rule_set) for key, rule_set in wanted}
+        self.rule_sets = rule_sets
+        self.default = default
+        self._compiled = compiled
+
+    def validator_for(self, partner_id: str) -> Validator:
+        rule_set = self.rule_sets.get(partner_id)
+        key = (partner_id, rule_set.get("version")) if rule_set is not None else (None, self.default.get("version"))
+        validator = self._compiled.get(key)
+        if validator is None:
+            validator = compile_rule_set(rule_set if rule_set is not None else self.default)
+            self._compiled[key] = validator
+        return validator
+
+    def validate(self, partner_id: str, payload: Any) -> ValidationResult:
+        return self.validator_for(partner_id)(payload)
+
+    def validate_batch(self, items: Iterable[Tuple[str, Any]]) -> List[ValidationResult]:
+        """Validate (partner_id, payload) pairs, looking each partner's validator up once"""
+        validators: Dict[str, Validator] = {}
+        results = []
+        for partner_id, payload in items:
+            validator = validators.get(partner_id)
+            if validator is None:
+                validator = validators[partner_id] = self.validator_for(partner_id)
+            results.append(validator(payload))
+        return results
@@ -6,6 +6,8 @@ from typing import Dict, Any
 class Timestamp(ValueObject):
     """Value object representing a timestamp"""
     
+    __slots__ = ("value",)
+    
     def __init__(self, value: datetime = None):
         self.value = value or datetime.utcnow()
     
@@ -18,6 +20,8 @@ class Timestamp(ValueObject):
 class PartnerId(ValueObject):
     """Value object representing a partner identifier"""
     
+    __slots__ = ("value",)
+    
     def __init__(self, value: str):
         if not value or not isinstance(value, str):
             raise ValueError("Partner ID must be a non-empty string")
@@ -32,6 +36,8 @@ class PartnerId(ValueObject):
 class Payload(ValueObject):
     """Value object representing the data payload"""
     
+    __slots__ = ("value",)
+    
     def __init__(self, value: Dict[str, Any]):
         if not isinstance(value, dict):
             raise ValueError("Payload must be a dictionary")
@@ -1,9 +1,14 @@
 # infrastructure/api.py
-from flask import Flask, request, jsonify
+import os
+from flask import Flask, Response, request, jsonify
 from application.services import DataIngestionService, QueryService
 from infrastructure.repositories_impl import SQLAlchemyDataRepository
 from infrastructure.event_bus import SimpleEventBus
 from infrastructure.database import create_tables
+from infrastructure.metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from infrastructure.batch_ingest import iter_records, ingest_records, BatchBodyError
+from infrastructure.streaming import STREAM_MIMETYPES, stream_response
+from infrastructure.request_params import page_limit, time_param
 from domain.events import DataIngested
 
 app = Flask(__name__)
@@ -24,6 +29,11 @@ event_bus.subscribe(DataIngested, log_data_ingested)
 data_service = DataIngestionService(data_repo, event_bus)
 query_service = QueryService(data_repo)
 
+# Number of records written and published together by /ingest/batch
+batch_chunk_size = int(os.environ.get('INGEST_BATCH_CHUNK_SIZE', 500))
+# Largest single record accepted by /ingest/batch, so one record cannot exhaust memory
+max_record_bytes = int(os.environ.get('INGEST_MAX_RECORD_BYTES', 1024 * 1024))
+
 @app.route("/ingest", methods=["POST"])
 def ingest():
     """Endpoint to ingest new data"""
@@ -40,6 +50,22 @@ def ingest():
         "timestamp": data.timestamp.value.isoformat()
     }), 201
 
+@app.route("/ingest/batch", methods=["POST"])
+def ingest_batch():
+    """Endpoint to ingest a JSON array or an NDJSON stream of records"""
+    try:
+        results = ingest_records(data_service, iter_records(request.stream, request.mimetype, max_record_bytes),
+                                 chunk_size=batch_chunk_size)
+    except BatchBodyError as e:
+        return jsonify({"error": str(e)}), 400
+
+    rejected = sum(1 for result in results if "error" in result)
+    return jsonify({
+        "accepted": len(results) - rejected,
+        "rejected": rejected,
+        "results": results
+    }), 201 if rejected == 0 else 207
+
 @app.route("/ingest/<data_id>", methods=["GET"])
 def get_ingested_data(data_id):
     """Endpoint to get ingested data by ID"""
@@ -55,23 +81,47 @@ def get_ingested_data(data_id):
 
 @app.route("/ingest/partner/<partner_id>", methods=["GET"])
 def get_data_by_partner(partner_id):
-    """Endpoint to get all data for a specific partner"""
-    data_list = query_service.get_data_by_partner_id(partner_id)
-    return jsonify([{
-        "id": data.id,
-        "partner_id": data.partner_id.value,
-        "timestamp": data.timestamp.value.isoformat()
-    } for data in data_list])
+    """Endpoint to get all data for a specific partner, optionally within a time range (from, to)"""
+    try:
+        start = time_param(request.args.get("from"))
+        end = time_param(request.args.get("to"))
+    except ValueError:
+        return jsonify({"error": "'from' y 'to' deben ser fechas ISO 8601"}), 400
+    summaries = query_service.get_data_summaries(partner_id, start, end)
+    return jsonify([summary.to_dict() for summary in summaries])
 
 @app.route("/ingest/all", methods=["GET"])
 def get_all_data():
-    """Endpoint to get all ingested data"""
-    data_list = query_service.get_all_data()
-    return jsonify([{
-        "id": data.id,
-        "partner_id": data.partner_id.value,
-        "timestamp": data.timestamp.value.isoformat()
-    } for data in data_list])
+    """Endpoint to get all ingested data, optionally paginated (limit, cursor) or streamed (stream=json|ndjson)"""
+    stream_format = request.args.get("stream")
+    if stream_format:
+        if stream_format not in STREAM_MIMETYPES:
+            return jsonify({"error": "'stream' debe ser 'json' o 'ndjson'"}), 400
+        return stream_response(
+            (summary.to_dict() for summary in query_service.stream_all_data()), stream_format
+        )
+
+    if "limit" in request.args or "cursor" in request.args:
+        try:
+            limit = page_limit(request.args.get("limit"))
+        except ValueError:
+            return jsonify({"error": "'limit' debe ser un entero positivo"}), 400
+        try:
+            summaries, next_cursor = query_service.get_data_page(limit, request.args.get("cursor"))
+        except ValueError:
+            return jsonify({"error": "Cursor inválido"}), 400
+        return jsonify({
+            "items": [summary.to_dict() for summary in summaries],
+            "next_cursor": next_cursor
+        })
+
+    summaries = query_service.get_data_summaries()
+    return jsonify([summary.to_dict() for summary in summaries])
+
+@app.route("/metrics")
+def metrics():
+    """Prometheus metrics of this process"""
+    return Response(REGISTRY.render(), content_type=METRICS_CONTENT_TYPE)
 
 @app.route("/")
 def index():
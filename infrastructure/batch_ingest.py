@@ -0,0 +1,196 @@
+# infrastructure/batch_ingest.py
+import codecs
+import json
+from typing import Any, Dict, Iterator, List, Tuple
+
+NDJSON_MIMETYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines")
+READ_CHUNK_SIZE = 64 * 1024
+DEFAULT_CHUNK_SIZE = 500
+# Largest single record buffered while parsing a batch body, in bytes (NDJSON) or characters (JSON array)
+MAX_RECORD_BYTES = 1024 * 1024
+
+MISSING_FIELDS_ERROR = "Se requieren 'partner_id' y 'payload'"
+INVALID_JSON_ERROR = "JSON inválido"
+RECORD_TOO_LARGE_ERROR = "Registro demasiado grande"
+
+
+class BatchBodyError(ValueError):
+    """Raised when a batch body cannot be parsed as a JSON array or NDJSON"""
+    pass
+
+
+def is_ndjson(mimetype: str) -> bool:
+    """Check whether a request mimetype denotes newline-delimited JSON"""
+    return (mimetype or "").lower() in NDJSON_MIMETYPES
+
+
+def iter_ndjson(stream, max_record_bytes: int = MAX_RECORD_BYTES) -> Iterator[Tuple[Any, str]]:
+    """Yield (record, error) pairs from an NDJSON stream, one line at a time"""
+    buffer = b""
+    while True:
+        chunk = stream.read(READ_CHUNK_SIZE)
+        if chunk:
+            buffer += chunk
+            lines = buffer.split(b"\n")
+            buffer = lines.pop()
+        else:
+            lines = [buffer]
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            if len(line) > max_record_bytes:
+                yield None, RECORD_TOO_LARGE_ERROR
+                continue
+            try:
+                yield json.loads(line), None
+            except ValueError:
+                yield None, INVALID_JSON_ERROR
+        if not chunk:
+            return
+        if len(buffer) > max_record_bytes:
+            # The rest of the line cannot be parsed either, stop reading the body
+            raise BatchBodyError(RECORD_TOO_LARGE_ERROR)
+
+
+def iter_json_array(stream, max_record_bytes: int = MAX_RECORD_BYTES) -> Iterator[Tuple[Any, str]]:
+    """Yield (record, error) pairs from a JSON array without buffering the whole body
+
+    Only one record is held at a time, so a record longer than max_record_bytes
+    characters stops the parsing. A trailing comma or anything but whitespace
+    after the closing bracket makes the body invalid.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    pos = 0
+    eof = False
+    started = False
+    expect_value = True
+    # Right after "[" the array may end; after a "," a value is required
+    may_close = True
+
+    while True:
+        # Skip whitespace and separators, pulling more data when the buffer runs out
+        while pos < len(buffer) and buffer[pos] in " \t\r\n":
+            pos += 1
+        if pos >= len(buffer) and not eof:
+            chunk = stream.read(READ_CHUNK_SIZE)
+            eof = not chunk
+            buffer = buffer[pos:] + text_decoder.decode(chunk or b"", final=eof)
+            pos = 0
+            continue
+        if pos >= len(buffer):
+            raise BatchBodyError("Arreglo JSON incompleto" if started else "Cuerpo vacío")
+
+        char = buffer[pos]
+        if not started:
+            if char != "[":
+                raise BatchBodyError("El cuerpo debe ser un arreglo JSON o NDJSON")
+            started = True
+            pos += 1
+        elif char == "]":
+            if not may_close:
+                raise BatchBodyError(INVALID_JSON_ERROR)
+            _expect_end(stream, text_decoder, buffer[pos + 1:], eof)
+            return
+        elif char == "," and not expect_value:
+            expect_value = True
+            may_close = False
+            pos += 1
+        elif expect_value:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                if eof:
+                    raise BatchBodyError(INVALID_JSON_ERROR)
+                value, end = None, None
+            # A value touching the end of the buffer may be truncated (e.g. a number)
+            if end is None or (end == len(buffer) and not eof):
+                if len(buffer) - pos > max_record_bytes:
+                    raise BatchBodyError(RECORD_TOO_LARGE_ERROR)
+                chunk = stream.read(READ_CHUNK_SIZE)
+                eof = not chunk
+                buffer = buffer[pos:] + text_decoder.decode(chunk or b"", final=eof)
+                pos = 0
+                continue
+            if end - pos > max_record_bytes:
+                raise BatchBodyError(RECORD_TOO_LARGE_ERROR)
+            yield value, None
+            pos = end
+            expect_value = False
+            may_close = True
+            # Drop consumed text so memory stays bounded by the largest record
+            if pos > READ_CHUNK_SIZE:
+                buffer = buffer[pos:]
+                pos = 0
+        else:
+            raise BatchBodyError(INVALID_JSON_ERROR)
+
+
+def _expect_end(stream, text_decoder, rest: str, eof: bool) -> None:
+    """Read the body to its end, raising if anything but whitespace follows the array"""
+    while True:
+        if rest.strip():
+            raise BatchBodyError(INVALID_JSON_ERROR)
+        if eof:
+            return
+        chunk = stream.read(READ_CHUNK_SIZE)
+        eof = not chunk
+        rest = text_decoder.decode(chunk or b"", final=eof)
+
+
+def iter_records(stream, mimetype: str, max_record_bytes: int = MAX_RECORD_BYTES) -> Iterator[Tuple[Any, str]]:
+    """Yield (record, error) pairs from a JSON array or NDJSON request body"""
+    if is_ndjson(mimetype):
+        return iter_ndjson(stream, max_record_bytes)
+    return iter_json_array(stream, max_record_bytes)
+
+
+def ingest_records(data_service, records: Iterator[Tuple[Any, str]],
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Dict[str, Any]]:
+    """Ingest parsed records in chunks and return a result entry per record
+
+    If the body turns out invalid after some records, those already parsed are
+    still ingested and a last entry with "unprocessed": true reports the error
+    at the index from which nothing was read, so the client can resend the rest.
+    """
+    results = []
+    chunk = []
+    indexes = []
+
+    def flush():
+        for index, (data, error) in zip(indexes, data_service.ingest_batch(chunk)):
+            if error:
+                results[index] = {"index": index, "error": error}
+            else:
+                results[index] = {
+                    "index": index,
+                    "id": data.id,
+                    "partner_id": data.partner_id.value,
+                    "timestamp": data.timestamp.value.isoformat()
+                }
+        chunk.clear()
+        indexes.clear()
+
+    try:
+        for index, (record, error) in enumerate(records):
+            if error is None and (not isinstance(record, dict) or not record.get("partner_id")
+                                  or record.get("payload") is None):
+                error = MISSING_FIELDS_ERROR
+            if error:
+                results.append({"index": index, "error": error})
+                continue
+            results.append(None)
+            chunk.append(record)
+            indexes.append(index)
+            if len(chunk) >= chunk_size:
+                flush()
+    except BatchBodyError as e:
+        # Nothing parsed yet: let the caller reject the whole request
+        if not results:
+            raise
+        results.append({"index": len(results), "error": str(e), "unprocessed": True})
+    if chunk:
+        flush()
+    return results
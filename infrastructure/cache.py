@@ -0,0 +1,181 @@
+# infrastructure/cache.py
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from domain.entities import IngestedData, IngestedDataSummary
+from domain.repositories import DataReader, DataViewRepository
+from domain.seedwork import DomainEvent
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Stored in place of a value to remember that a lookup found nothing
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe LRU cache whose entries also expire after a time to live"""
+
+    def __init__(self, max_size: int = 10000, ttl: float = 60.0, negative_ttl: float = 5.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, see put()
+        self.generation = 0
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key) -> Any:
+        """Return the cached value, None for a cached miss, or _MISSING when not cached"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return _MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            if value is _MISSING:
+                self.negative_hits += 1
+                return None
+            self.hits += 1
+            return value
+
+    def put(self, key, value, generation: Optional[int] = None) -> None:
+        """Cache a value, or a miss when value is None
+
+        When `generation` is given the value is dropped if an invalidation
+        happened since, because it may have been loaded before that change.
+        """
+        ttl = self.negative_ttl if value is None else self.ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic() + ttl, _MISSING if value is None else value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, keys: Iterable) -> None:
+        with self._lock:
+            self.generation += 1
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+class CachingDataRepository(DataViewRepository):
+    """Read-side decorator that caches the get_by_id and get_view lookups of a repository
+
+    Entries are evicted least recently used once max_size is reached and expire
+    after `ttl` seconds. Lookups that find nothing are cached for `negative_ttl`
+    seconds. invalidate_events drops the entries of the records an event batch
+    refers to, so a record ingested, validated or processed elsewhere is read
+    again. get_view is only available when the wrapped repository provides it.
+    """
+
+    def __init__(self, repository: DataReader, max_size: int = 10000, ttl: float = 60.0,
+                 negative_ttl: float = 5.0):
+        self.repository = repository
+        self.cache = LRUCache(max_size, ttl, negative_ttl)
+
+    def invalidate(self, data_ids: Iterable[str]) -> None:
+        self.cache.invalidate(key for data_id in data_ids for key in (("entity", data_id), ("view", data_id)))
+
+    def invalidate_events(self, events: List[DomainEvent]) -> None:
+        """Batch event handler dropping the entries of the events' data ids"""
+        self.invalidate({event.data_id for event in events})
+
+    def stats(self) -> Dict[str, int]:
+        """Hit, miss and eviction counters of the cache"""
+        return self.cache.stats()
+
+    def get_by_id(self, data_id: str) -> Optional[IngestedData]:
+        return self._cached(("entity", data_id), self.repository.get_by_id, data_id)
+
+    def get_view(self, data_id: str) -> Optional[Dict[str, Any]]:
+        return self._cached(("view", data_id), self.repository.get_view, data_id)
+
+    def get_by_ids(self, data_ids: Iterable[str]) -> Dict[str, IngestedData]:
+        """Serve cached IDs from memory and fetch the rest with one get_by_ids call"""
+        generation = self.cache.generation
+        found = {}
+        missing = []
+        for data_id in dict.fromkeys(data_ids):
+            value = self.cache.get(("entity", data_id))
+            if value is _MISSING:
+                missing.append(data_id)
+            elif value is not None:
+                found[data_id] = value
+        if missing:
+            loaded = self.repository.get_by_ids(missing)
+            for data_id in missing:
+                self.cache.put(("entity", data_id), loaded.get(data_id), generation)
+            found.update(loaded)
+        return found
+
+    def _cached(self, key, load, data_id):
+        generation = self.cache.generation
+        value = self.cache.get(key)
+        if value is _MISSING:
+            value = load(data_id)
+            self.cache.put(key, value, generation)
+        return value
+
+    def get_all(self) -> List[IngestedData]:
+        return self.repository.get_all()
+
+    def get_by_partner_id(self, partner_id: str) -> List[IngestedData]:
+        return self.repository.get_by_partner_id(partner_id)
+
+    def get_all_summaries(self) -> List[IngestedDataSummary]:
+        return self.repository.get_all_summaries()
+
+    def get_summaries_by_partner_id(self, partner_id: str, start: Optional[datetime] = None,
+                                    end: Optional[datetime] = None) -> List[IngestedDataSummary]:
+        return self.repository.get_summaries_by_partner_id(partner_id, start, end)
+
+    def get_summary_page(self, limit: int, after: Optional[Tuple[datetime, str]] = None) -> List[IngestedDataSummary]:
+        return self.repository.get_summary_page(limit, after)
+
+    def iter_summaries(self, batch_size: int = 1000) -> Iterator[IngestedDataSummary]:
+        return self.repository.iter_summaries(batch_size)
+
+
+def cache_options_from_env() -> Dict[str, float]:
+    """CachingDataRepository settings from the CACHE_* environment variables"""
+    return {
+        "max_size": int(os.environ.get('CACHE_MAX_SIZE', 10000)),
+        "ttl": float(os.environ.get('CACHE_TTL_SECONDS', 60)),
+        "negative_ttl": float(os.environ.get('CACHE_NEGATIVE_TTL_SECONDS', 5)),
+    }
@@ -0,0 +1,208 @@
+# infrastructure/codecs.py
+import json
+import struct
+import zlib
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from domain.seedwork import DomainEvent
+from .serialization import EVENT_TYPES, serialize_event, deserialize_event
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+# Message property naming the codec a message was encoded with
+CODEC_PROPERTY = "codec"
+
+STRING = "string"
+DATETIME = "datetime"
+BOOL = "bool"
+JSON = "json"
+
+# Fields of each event type in encoding order, with the schema version written
+# to binary messages. New fields may only be appended, bumping the version and
+# naming it as a third element, e.g. ("source", STRING, 2): messages of older
+# versions decode without them (None), older consumers ignore them.
+EVENT_SCHEMAS: Dict[str, Tuple[int, List[Tuple]]] = {
+    "DataIngested": (1, [
+        ("id", STRING), ("occurred_on", DATETIME),
+        ("data_id", STRING), ("partner_id", STRING), ("timestamp", DATETIME), ("payload", JSON),
+    ]),
+    "DataValidated": (1, [
+        ("id", STRING), ("occurred_on", DATETIME),
+        ("data_id", STRING), ("partner_id", STRING), ("is_valid", BOOL), ("validation_errors", JSON),
+    ]),
+    "DataProcessed": (1, [
+        ("id", STRING), ("occurred_on", DATETIME),
+        ("data_id", STRING), ("partner_id", STRING), ("result", JSON),
+    ]),
+}
+
+
+def _to_datetime(value) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def _added_in(field: Tuple) -> int:
+    """Schema version that added a field, 1 for the original ones"""
+    return field[2] if len(field) > 2 else 1
+
+
+class EventCodec(ABC):
+    """Base interface for encoding events into message bodies"""
+
+    name: str
+
+    @abstractmethod
+    def encode(self, event: DomainEvent) -> bytes:
+        pass
+
+    @abstractmethod
+    def decode(self, data: bytes, event_types: Dict[str, Type[DomainEvent]] = None) -> Optional[DomainEvent]:
+        """Rebuild an event, or return None if its type is unknown"""
+        pass
+
+    def can_encode(self, event: DomainEvent) -> bool:
+        return True
+
+
+class JsonCodec(EventCodec):
+    """The original JSON encoding, with datetime fields restored on decode"""
+
+    name = "json"
+
+    def encode(self, event: DomainEvent) -> bytes:
+        return serialize_event(event)
+
+    def decode(self, data: bytes, event_types: Dict[str, Type[DomainEvent]] = None) -> Optional[DomainEvent]:
+        event = deserialize_event(data, event_types)
+        if event is None:
+            return None
+        schema = EVENT_SCHEMAS.get(type(event).__name__)
+        if schema is not None:
+            for name, kind, *_ in schema[1]:
+                value = getattr(event, name, None)
+                setattr(event, name, _to_datetime(value) if kind == DATETIME else value)
+        return event
+
+
+_EPOCH = datetime(1970, 1, 1)
+_NULL_LENGTH = 0xFFFFFFFF
+_NULL_TIME = -(1 << 63)
+_LENGTH = struct.Struct(">I")
+_TIME = struct.Struct(">q")
+_HEADER = struct.Struct(">BBBB")
+
+
+class BinaryCodec(EventCodec):
+    """Compact schema-per-type binary encoding
+
+    Layout: format version, flags, schema version, type name length (one byte
+    each), the type name, then the fields of the type's schema in order.
+    Strings and JSON are length-prefixed, datetimes are microseconds since the
+    epoch, booleans one byte. Timezone-aware datetimes are written in UTC and
+    decode as naive UTC, like the datetime.utcnow() values used elsewhere.
+    Bodies larger than compress_threshold bytes are zlib-compressed and
+    flagged as such.
+    """
+
+    name = "binary"
+    FORMAT_VERSION = 1
+    FLAG_ZLIB = 0x01
+
+    def __init__(self, compress_threshold: int = 1024, schemas: Dict[str, Tuple[int, List[Tuple]]] = None):
+        self.compress_threshold = compress_threshold
+        self.schemas = schemas or EVENT_SCHEMAS
+
+    def can_encode(self, event: DomainEvent) -> bool:
+        return type(event).__name__ in self.schemas
+
+    def encode(self, event: DomainEvent) -> bytes:
+        type_name = type(event).__name__
+        schema_version, fields = self.schemas[type_name]
+        parts = []
+        for name, kind, *_ in fields:
+            value = getattr(event, name, None)
+            if kind == DATETIME:
+                value = _to_datetime(value)
+                if value is not None and value.tzinfo is not None:
+                    value = value.astimezone(timezone.utc).replace(tzinfo=None)
+                micros = _NULL_TIME if value is None else (value - _EPOCH) // timedelta(microseconds=1)
+                parts.append(_TIME.pack(micros))
+            elif kind == BOOL:
+                parts.append(b"\x02" if value is None else (b"\x01" if value else b"\x00"))
+            else:
+                if value is None:
+                    parts.append(_LENGTH.pack(_NULL_LENGTH))
+                    continue
+                encoded = (value if kind == STRING else json.dumps(value)).encode('utf-8')
+                parts.append(_LENGTH.pack(len(encoded)))
+                parts.append(encoded)
+        body = b"".join(parts)
+
+        flags = 0
+        if len(body) > self.compress_threshold:
+            body = zlib.compress(body)
+            flags |= self.FLAG_ZLIB
+        name = type_name.encode('ascii')
+        return _HEADER.pack(self.FORMAT_VERSION, flags, schema_version, len(name)) + name + body
+
+    def decode(self, data: bytes, event_types: Dict[str, Type[DomainEvent]] = None) -> Optional[DomainEvent]:
+        format_version, flags, schema_version, name_length = _HEADER.unpack_from(data, 0)
+        if format_version != self.FORMAT_VERSION:
+            raise ValueError(f"Unsupported binary event format version {format_version}")
+        offset = _HEADER.size
+        type_name = bytes(data[offset:offset + name_length]).decode('ascii')
+        event_class = (event_types or EVENT_TYPES).get(type_name)
+        if event_class is None or type_name not in self.schemas:
+            return None
+
+        body = data[offset + name_length:]
+        if flags & self.FLAG_ZLIB:
+            body = zlib.decompress(body)
+
+        known_version, fields = self.schemas[type_name]
+        event = event_class.__new__(event_class)
+        offset = 0
+        for field in fields:
+            name, kind = field[0], field[1]
+            if _added_in(field) > schema_version:
+                # Field added after this message was written
+                setattr(event, name, None)
+                continue
+            if kind == DATETIME:
+                (micros,) = _TIME.unpack_from(body, offset)
+                offset += _TIME.size
+                value = None if micros == _NULL_TIME else _EPOCH + timedelta(microseconds=micros)
+            elif kind == BOOL:
+                flag = body[offset]
+                offset += 1
+                value = None if flag == 2 else bool(flag)
+            else:
+                (length,) = _LENGTH.unpack_from(body, offset)
+                offset += _LENGTH.size
+                if length == _NULL_LENGTH:
+                    value = None
+                else:
+                    raw = bytes(body[offset:offset + length]).decode('utf-8')
+                    offset += length
+                    value = raw if kind == STRING else json.loads(raw)
+            setattr(event, name, value)
+        # A newer producer may have appended fields this consumer does not know yet
+        if offset > len(body) or (schema_version <= known_version and offset != len(body)):
+            raise ValueError(f"Binary {type_name} event does not match schema version {schema_version}")
+        return event
+
+
+JSON_CODEC = JsonCodec()
+
+CODECS: Dict[str, Type[EventCodec]] = {
+    JsonCodec.name: JsonCodec,
+    BinaryCodec.name: BinaryCodec,
+}
+
+
+def get_codec(name: str, **options: Any) -> EventCodec:
+    """Build a codec by name ("json" or "binary")"""
+    if name not in CODECS:
+        raise ValueError(f"Event codec must be one of {tuple(CODECS)}")
+    return JSON_CODEC if name == JsonCodec.name else CODECS[name](**options)
@@ -1,9 +1,11 @@
 # infrastructure/database.py
 import os
-from sqlalchemy import create_engine, Column, String, JSON, DateTime
+from datetime import datetime
+from sqlalchemy import create_engine, Column, String, JSON, DateTime, Text, Integer, BigInteger, Index, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, deferred
 from dotenv import load_dotenv
+from .metrics import instrument_engine
 
 # Load environment variables
 load_dotenv()
@@ -11,8 +13,13 @@ load_dotenv()
 # Get database URL from environment or use a default SQLite URL
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///ingestion_service.db")
 
+# Optional monthly range partitioning of ingested_data, Postgres only
+PARTITION_BY_MONTH = os.getenv("DB_PARTITION_BY_MONTH", "false").lower() == "true"
+PARTITION_MONTHS_AHEAD = int(os.getenv("DB_PARTITION_MONTHS_AHEAD", 3))
+
 # Create SQLAlchemy engine
 engine = create_engine(DATABASE_URL)
+instrument_engine(engine, "ingestion")
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -27,13 +34,139 @@ class IngestedDataModel(Base):
 
     id = Column(String, primary_key=True, index=True)
     partner_id = Column(String, index=True)
-    payload = Column(JSON)
+    # Only loaded when accessed or explicitly undeferred, listings never need it
+    payload = deferred(Column(JSON))
     timestamp = Column(DateTime)
 
+    __table_args__ = (
+        # Keyset pagination and streaming walk the table in (timestamp, id) order
+        Index("ix_ingested_data_timestamp_id", "timestamp", "id"),
+        # Time-range queries of one partner only read that partner's window
+        Index("ix_ingested_data_partner_id_timestamp", "partner_id", "timestamp"),
+    )
+
+
+class OutboxModel(Base):
+    """SQLAlchemy model for domain events waiting to be relayed to the event bus"""
+    __tablename__ = "outbox"
+
+    id = Column(String, primary_key=True)
+    event_type = Column(String, nullable=False)
+    data = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False, index=True)
+    sent_at = Column(DateTime, nullable=True, index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    # Dead letter: set once the relay gives up on the event
+    failed_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+
+
+class StoredEventModel(Base):
+    """SQLAlchemy model for the append-only event store"""
+    __tablename__ = "event_store"
+
+    # Global order of the store; SQLite only autoincrements INTEGER primary keys
+    sequence = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    event_id = Column(String, nullable=False, unique=True)
+    aggregate_id = Column(String, nullable=False)
+    event_type = Column(String, nullable=False)
+    occurred_on = Column(DateTime, nullable=False)
+    data = Column(Text, nullable=False)
+
+    __table_args__ = (
+        # History of one aggregate, in order
+        Index("ix_event_store_aggregate_id_sequence", "aggregate_id", "sequence"),
+    )
+
+
+class SnapshotModel(Base):
+    """SQLAlchemy model for the latest snapshot of each aggregate in the event store"""
+    __tablename__ = "event_snapshots"
+
+    aggregate_id = Column(String, primary_key=True)
+    # Sequence number of the last event folded into the state
+    sequence = Column(BigInteger, nullable=False)
+    state = Column(JSON, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
+
+def _month_start(year: int, month: int) -> datetime:
+    # Normalizes month overflow, e.g. month 13 is January of the next year
+    return datetime(year + (month - 1) // 12, (month - 1) % 12 + 1, 1)
+
+
+def _create_partitioned_ingested_data():
+    """Create ingested_data as a table partitioned by month on timestamp
+
+    Postgres requires the partition key in the primary key, so it becomes
+    (id, timestamp). Rows outside every monthly partition go to a default one.
+    """
+    table = IngestedDataModel.__tablename__
+    with engine.begin() as connection:
+        connection.execute(text(
+            f"CREATE TABLE {table} ("
+            "id VARCHAR NOT NULL, partner_id VARCHAR, payload JSON, "
+            "timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL, "
+            "PRIMARY KEY (id, timestamp)"
+            ") PARTITION BY RANGE (timestamp)"
+        ))
+        connection.execute(text(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"))
+
+
+def ensure_month_partitions(months_ahead: int = PARTITION_MONTHS_AHEAD, start: datetime = None):
+    """Create the monthly partitions from the month of `start` (default: now) to `months_ahead` later"""
+    table = IngestedDataModel.__tablename__
+    start = start or datetime.utcnow()
+    for offset in range(months_ahead + 1):
+        lower = _month_start(start.year, start.month + offset)
+        upper = _month_start(start.year, start.month + offset + 1)
+        try:
+            with engine.begin() as connection:
+                connection.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {table}_p{lower:%Y_%m} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{lower:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}')"
+                ))
+        except Exception as e:
+            # Typically rows of that month already sit in the default partition
+            print(f"Could not create partition {table}_p{lower:%Y_%m}: {e}")
+
+
+def _is_partitioned(table: str) -> bool:
+    with engine.connect() as connection:
+        return connection.execute(text(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = :table"
+        ), {"table": table}).first() is not None
+
+
+def _add_missing_columns():
+    """Add nullable columns introduced after a table was created, which create_all skips"""
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing and column.nullable:
+                column_type = column.type.compile(dialect=engine.dialect)
+                with engine.begin() as connection:
+                    connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+
 
 # Create all tables
 def create_tables():
+    if PARTITION_BY_MONTH:
+        if engine.dialect.name != "postgresql":
+            print("DB_PARTITION_BY_MONTH is only supported on PostgreSQL, ignoring it")
+        elif not inspect(engine).has_table(IngestedDataModel.__tablename__):
+            _create_partitioned_ingested_data()
+        elif not _is_partitioned(IngestedDataModel.__tablename__):
+            print("ingested_data already exists without partitions, it has to be migrated manually")
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+    # create_all skips existing tables, so add indexes introduced after they were created
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    if PARTITION_BY_MONTH and engine.dialect.name == "postgresql" and _is_partitioned(IngestedDataModel.__tablename__):
+        ensure_month_partitions()
 
 
 # Get a database session
@@ -0,0 +1,131 @@
+# infrastructure/dispatch.py
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+from .metrics import DISPATCH_ACTIVE_WORKERS, DISPATCH_OVERFLOW, DISPATCH_QUEUE_DEPTH, attribute_reader
+
+BLOCK = "block"
+DROP = "drop"
+INLINE = "inline"
+OVERFLOW_POLICIES = (BLOCK, DROP, INLINE)
+
+
+class BoundedExecutor:
+    """Fixed-size thread pool for event handlers with a bounded backlog
+
+    At most max_workers handlers run at once and at most max_queue_size more
+    wait for a worker. When both are full, the overflow policy decides what
+    submit() does: "block" waits for a free slot, "drop" discards the task and
+    returns None, "inline" runs it on the calling thread. Tasks submitted from
+    a handler running on this executor, such as a nested publish, always run
+    inline: waiting for a slot only the caller's own workers can free would
+    deadlock.
+    """
+
+    def __init__(self, max_workers: int = 8, max_queue_size: int = 1000,
+                 overflow_policy: str = BLOCK, name: str = "event-dispatch"):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Overflow policy must be one of {OVERFLOW_POLICIES}")
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = overflow_policy
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue_size)
+        self._lock = threading.Lock()
+        # Held while one submit_all() takes several slots under "block", so two of them
+        # never end up each holding part of the slots the other waits for
+        self._acquire_lock = threading.Lock()
+        self._local = threading.local()
+        self._queued = 0
+        self._active = 0
+        self._dropped = DISPATCH_OVERFLOW.labels(name, "dropped")
+        self._inlined = DISPATCH_OVERFLOW.labels(name, "inlined")
+        # Read when /metrics is scraped, nothing is recorded per task
+        DISPATCH_QUEUE_DEPTH.labels(name).set_function(attribute_reader(self, "_queued"))
+        DISPATCH_ACTIVE_WORKERS.labels(name).set_function(attribute_reader(self, "_active"))
+
+    def submit(self, fn: Callable, *args) -> Optional[Future]:
+        """Schedule fn(*args), applying the overflow policy when the backlog is full"""
+        futures = self.submit_all([(fn, args)])
+        return futures[0] if futures is not None else None
+
+    def submit_all(self, calls: List[Tuple[Callable, tuple]]) -> Optional[List[Future]]:
+        """Schedule every (fn, args) call, or none of them
+
+        Slots for all calls are taken before any is submitted, so under "drop"
+        either every call is scheduled or None is returned and nothing runs.
+        """
+        if getattr(self._local, "in_worker", False):
+            self._inlined.inc(len(calls))
+            return [self._run_inline(fn, *args) for fn, args in calls]
+
+        # More calls than slots could never all be scheduled; the extra ones overflow
+        wanted = min(len(calls), self.max_workers + self.max_queue_size)
+        acquired = 0
+        if self.overflow_policy == BLOCK:
+            with self._acquire_lock:
+                for _ in range(wanted):
+                    self._slots.acquire()
+            acquired = wanted
+        else:
+            while acquired < wanted and self._slots.acquire(blocking=False):
+                acquired += 1
+        if acquired < len(calls) and self.overflow_policy == DROP:
+            for _ in range(acquired):
+                self._slots.release()
+            self._dropped.inc(len(calls))
+            return None
+
+        futures = []
+        with self._lock:
+            self._queued += acquired
+        try:
+            for fn, args in calls[:acquired]:
+                futures.append(self._executor.submit(self._run, fn, *args))
+        except Exception:
+            unsubmitted = acquired - len(futures)
+            with self._lock:
+                self._queued -= unsubmitted
+            for _ in range(unsubmitted):
+                self._slots.release()
+            raise
+        if acquired < len(calls):
+            self._inlined.inc(len(calls) - acquired)
+            futures.extend(self._run_inline(fn, *args) for fn, args in calls[acquired:])
+        return futures
+
+    def _run(self, fn: Callable, *args) -> Any:
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+        self._local.in_worker = True
+        try:
+            return fn(*args)
+        finally:
+            self._local.in_worker = False
+            with self._lock:
+                self._active -= 1
+            self._slots.release()
+
+    @staticmethod
+    def _run_inline(fn: Callable, *args) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+def executor_from_env(name: str = "event-dispatch") -> BoundedExecutor:
+    """Build the handler executor from the EVENT_DISPATCH_* environment variables"""
+    return BoundedExecutor(
+        max_workers=int(os.environ.get('EVENT_DISPATCH_WORKERS', 8)),
+        max_queue_size=int(os.environ.get('EVENT_DISPATCH_QUEUE_SIZE', 1000)),
+        overflow_policy=os.environ.get('EVENT_DISPATCH_OVERFLOW', BLOCK).lower(),
+        name=name
+    )
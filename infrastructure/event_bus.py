@@ -1,74 +1,284 @@
-import threading
+import os
 import json
+import threading
+import time
 import uuid
 import pulsar
+from concurrent.futures import wait
 from domain.seedwork import EventBus, DomainEvent
+from .codecs import CODECS, CODEC_PROPERTY, JSON_CODEC, EventCodec, get_codec
+from .dispatch import BoundedExecutor, executor_from_env
+from .metrics import HANDLER_SECONDS, MESSAGES_ACKED, MESSAGES_NACKED, MESSAGES_RECEIVED, PUBLISH_SECONDS, timed
 from typing import Dict, List, Type, Callable, Any
 
 
+def _log_handler_error(future):
+    if not future.cancelled() and future.exception() is not None:
+        print(f"Error in event handler: {future.exception()}")
+
+
 class SimpleEventBus(EventBus):
     """Simple in-memory implementation of EventBus"""
     
-    def __init__(self):
+    def __init__(self, executor: BoundedExecutor = None):
         self.subscribers: Dict[Type[DomainEvent], List[Callable]] = {}
+        self.batch_subscribers: Dict[Type[DomainEvent], List[Callable]] = {}
+        self.executor = executor or executor_from_env("simple-event-bus")
     
     def subscribe(self, event_type: Type[DomainEvent], handler: Callable[[DomainEvent], Any]):
         """Subscribe a handler to a specific event type"""
         if event_type not in self.subscribers:
             self.subscribers[event_type] = []
-        self.subscribers[event_type].append(handler)
+        self.subscribers[event_type].append(timed(HANDLER_SECONDS.labels(event_type.__name__))(handler))
+    
+    def subscribe_batch(self, event_type: Type[DomainEvent], handler: Callable[[List[DomainEvent]], Any], **options):
+        """Subscribe a handler that receives the events of each publish_batch call as one list"""
+        self.batch_subscribers.setdefault(event_type, []).append(timed(HANDLER_SECONDS.labels(event_type.__name__))(handler))
     
+    @timed(PUBLISH_SECONDS.labels("simple", "publish"))
     def publish(self, event: DomainEvent):
         """Publish an event to all subscribers"""
-        event_type = type(event)
-        handlers = self.subscribers.get(event_type, [])
-        for handler in handlers:
-            # Run handlers in separate threads to avoid blocking
-            threading.Thread(target=handler, args=(event,)).start()
+        self.publish_batch([event])
+    
+    @timed(PUBLISH_SECONDS.labels("simple", "publish_batch"))
+    def publish_batch(self, events: List[DomainEvent]):
+        """Publish several events, handing batch subscribers one list per event type"""
+        events_by_type: Dict[Type[DomainEvent], List[DomainEvent]] = {}
+        for event in events:
+            events_by_type.setdefault(type(event), []).append(event)
+        
+        for event_type, typed_events in events_by_type.items():
+            for handler in self.subscribers.get(event_type, []):
+                for event in typed_events:
+                    self._dispatch(handler, event)
+            for handler in self.batch_subscribers.get(event_type, []):
+                self._dispatch(handler, typed_events)
+    
+    def _dispatch(self, handler, arg):
+        # Run handlers on the bounded pool to avoid blocking the publisher
+        future = self.executor.submit(handler, arg)
+        if future is not None:
+            future.add_done_callback(_log_handler_error)
+
+
+COMPRESSION_TYPES = {
+    "none": pulsar.CompressionType.NONE,
+    "lz4": pulsar.CompressionType.LZ4,
+    "zlib": pulsar.CompressionType.ZLib,
+    "zstd": pulsar.CompressionType.ZSTD,
+    "snappy": pulsar.CompressionType.SNAPPY,
+}
+
+# Producer settings applied to every topic when publishing asynchronously
+ASYNC_PRODUCER_DEFAULTS = {
+    "batching_enabled": True,
+    "batching_max_messages": 1000,
+    "batching_max_allowed_size_in_bytes": 128 * 1024,
+    "batching_max_publish_delay_ms": 10,
+    "compression_type": "lz4",
+    "block_if_queue_full": True,
+}
+
+BATCHING_TYPES = {
+    "default": pulsar.BatchingType.Default,
+    "key_based": pulsar.BatchingType.KeyBased,
+}
+
+CONSUMER_TYPES = {
+    "exclusive": pulsar.ConsumerType.Exclusive,
+    "shared": pulsar.ConsumerType.Shared,
+    "failover": pulsar.ConsumerType.Failover,
+    "key_shared": pulsar.ConsumerType.KeyShared,
+}
+
+# Consumer types that deliver the messages of a key in order to a single consumer
+ORDERED_CONSUMER_TYPES = (pulsar.ConsumerType.Exclusive, pulsar.ConsumerType.Failover, pulsar.ConsumerType.KeyShared)
+
+
+def pulsar_options_from_env() -> Dict[str, Any]:
+    """Read the PulsarEventBus publishing options from environment variables"""
+    producer_config = os.environ.get('PULSAR_PRODUCER_CONFIG')
+    consumer_types = os.environ.get('PULSAR_CONSUMER_TYPE', 'shared')
+    return {
+        "async_publish": os.environ.get('PULSAR_ASYNC_PUBLISH', 'false').lower() == 'true',
+        "max_in_flight": int(os.environ.get('PULSAR_MAX_IN_FLIGHT', 10000)),
+        "producer_config": json.loads(producer_config) if producer_config else None,
+        "codec": get_codec(
+            os.environ.get('EVENT_CODEC', 'json'),
+            compress_threshold=int(os.environ.get('EVENT_CODEC_COMPRESS_THRESHOLD', 1024))
+        ),
+        "message_key": os.environ.get('PULSAR_MESSAGE_KEY', 'partner_id') or None,
+        # Either one consumer type for every subscription or a JSON object per event type
+        "consumer_types": (
+            json.loads(consumer_types) if consumer_types.lstrip().startswith("{") else {"default": consumer_types}
+        ),
+    }
+
+
+def batch_policy_from_env() -> Dict[str, int]:
+    """Read the subscribe_batch receive policy from environment variables"""
+    return {
+        "max_messages": int(os.environ.get('CONSUMER_BATCH_MAX_MESSAGES', 100)),
+        "max_bytes": int(os.environ.get('CONSUMER_BATCH_MAX_BYTES', 1024 * 1024)),
+        "timeout_ms": int(os.environ.get('CONSUMER_BATCH_TIMEOUT_MS', 100)),
+    }
 
 
 class PulsarEventBus(EventBus):
-    """Apache Pulsar implementation of EventBus"""
+    """Apache Pulsar implementation of EventBus
+    
+    With async_publish, publish() hands the message to send_async and returns
+    at once; messages are batched and compressed by the producer. At most
+    max_in_flight messages may await broker confirmation, publish() blocks
+    beyond that. Failed sends are reported to on_publish_error(event, result).
+    
+    producer_config maps an event type name, or "default", to extra keyword
+    arguments for create_producer, e.g. {"DataIngested": {"batching_max_messages": 500}}.
     
-    def __init__(self, service_url="pulsar://localhost:6650", client_id=None):
+    Events are encoded with `codec` ("json", "binary" or an EventCodec) and the
+    codec name is sent in the "codec" message property. Consumers decode every
+    message with the codec it names, JSON when absent, so consumers can be
+    upgraded before producers switch codec.
+    
+    Messages are keyed by the event attribute (or callable) `message_key`,
+    partner_id by default, so that Key_Shared subscriptions deliver all events
+    of a partner to the same consumer, in order; batching producers then batch
+    by key. consumer_types maps an event type name, or "default", to the
+    consumer type of its subscriptions ("shared", "key_shared", "failover" or
+    "exclusive"); subscribe calls may also pass one explicitly. On ordered
+    consumer types the next message or batch is only handed to the handlers
+    once the previous one has been handled.
+    """
+    
+    def __init__(self, service_url="pulsar://localhost:6650", client_id=None, async_publish=False,
+                 producer_config=None, max_in_flight=10000, on_publish_error=None, on_publish_success=None,
+                 executor: BoundedExecutor = None, codec="json", message_key="partner_id", consumer_types=None,
+                 redelivery_delay: float = 1.0):
         self.service_url = service_url
         self.client_id = client_id or f"producer-{uuid.uuid4()}"
         self.client = pulsar.Client(service_url)
         self.producers = {}
         self.consumers = {}
         self.subscribers = {}
+        self.batch_subscribers = {}
         self.event_type_mapping = {}
+        self.async_publish = async_publish
+        self.producer_config = producer_config or {}
+        self.max_in_flight = max_in_flight
+        self.on_publish_error = on_publish_error or self._log_publish_error
+        self.on_publish_success = on_publish_success
+        self._in_flight = 0
+        self._in_flight_changed = threading.Condition()
+        self.executor = executor or executor_from_env(f"{self.client_id}-dispatch")
+        self.codec: EventCodec = get_codec(codec) if isinstance(codec, str) else codec
+        self._decoders = {name: self.codec if name == self.codec.name else get_codec(name) for name in CODECS}
+        self.message_key = message_key
+        self.consumer_types = consumer_types or {}
+        self.redelivery_delay = redelivery_delay
     
     def _get_topic_name(self, event_type):
         """Convert event type to topic name"""
         return f"persistent://public/default/{event_type.__name__}"
     
-    def _serialize_event(self, event):
-        """Serialize event to JSON with type information"""
-        event_dict = event.__dict__.copy()
-        # Add type information
-        event_dict['_event_type'] = event.__class__.__name__
-        
-        # Convert datetime objects to ISO format strings
-        for key, value in event_dict.items():
-            if hasattr(value, 'isoformat'):
-                event_dict[key] = value.isoformat()
-        
-        return json.dumps(event_dict).encode('utf-8')
+    def _encode_event(self, event):
+        """Encode an event, returning the message body and its properties"""
+        # Event types without a binary schema still go out as JSON
+        codec = self.codec if self.codec.can_encode(event) else JSON_CODEC
+        return codec.encode(event), {CODEC_PROPERTY: codec.name}
+    
+    def _message_key(self, event):
+        """Partition key of an event's message, or None when it has none"""
+        if self.message_key is None:
+            return None
+        key = self.message_key(event) if callable(self.message_key) else getattr(event, self.message_key, None)
+        return None if key is None else str(key)
     
-    def _get_producer(self, topic):
-        """Get or create a producer for the topic"""
+    def _consumer_type(self, event_type, consumer_type=None):
+        """Consumer type of a subscription: the explicit one, else the configured one, else Shared"""
+        if consumer_type is None:
+            consumer_type = self.consumer_types.get(event_type.__name__, self.consumer_types.get("default"))
+        if consumer_type is None:
+            return pulsar.ConsumerType.Shared
+        if isinstance(consumer_type, str):
+            if consumer_type.lower() not in CONSUMER_TYPES:
+                raise ValueError(f"Consumer type must be one of {tuple(CONSUMER_TYPES)}")
+            return CONSUMER_TYPES[consumer_type.lower()]
+        return consumer_type
+    
+    def _decode_message(self, msg):
+        """Decode a message with the codec named in its properties"""
+        codec_name = msg.properties().get(CODEC_PROPERTY, JSON_CODEC.name)
+        codec = self._decoders.get(codec_name)
+        if codec is None:
+            raise ValueError(f"Unknown event codec {codec_name}")
+        return codec.decode(msg.data(), self.event_type_mapping)
+    
+    def _producer_settings(self, event_type_name):
+        """Build create_producer keyword arguments for an event type"""
+        settings = dict(ASYNC_PRODUCER_DEFAULTS) if self.async_publish else {}
+        settings.update(self.producer_config.get("default", {}))
+        settings.update(self.producer_config.get(event_type_name, {}))
+        compression = settings.get("compression_type")
+        if isinstance(compression, str):
+            settings["compression_type"] = COMPRESSION_TYPES[compression.lower()]
+        # A batch goes to a single consumer, so keyed messages must be batched by key
+        # for Key_Shared subscriptions to spread partners across consumers
+        if settings.get("batching_enabled") and self.message_key is not None:
+            settings.setdefault("batching_type", "key_based")
+        batching_type = settings.get("batching_type")
+        if isinstance(batching_type, str):
+            settings["batching_type"] = BATCHING_TYPES[batching_type.lower()]
+        return settings
+    
+    def _get_producer(self, topic, event_type=None):
+        """Get or create a producer for the topic, configured for its event type"""
         if topic not in self.producers:
-            self.producers[topic] = self.client.create_producer(topic)
+            event_type_name = event_type.__name__ if event_type else topic.rsplit("/", 1)[-1]
+            self.producers[topic] = self.client.create_producer(topic, **self._producer_settings(event_type_name))
         return self.producers[topic]
     
-    def subscribe(self, event_type: Type[DomainEvent], handler: Callable[[DomainEvent], Any]):
+    def _send_async(self, producer, event, callback):
+        """Send without waiting for the broker, blocking while max_in_flight sends are pending"""
+        with self._in_flight_changed:
+            while self._in_flight >= self.max_in_flight:
+                self._in_flight_changed.wait()
+            self._in_flight += 1
+        
+        def on_sent(result, msg_id):
+            with self._in_flight_changed:
+                self._in_flight -= 1
+                self._in_flight_changed.notify_all()
+            callback(event, result, msg_id)
+        
+        try:
+            content, properties = self._encode_event(event)
+            producer.send_async(content, on_sent, properties=properties, partition_key=self._message_key(event))
+        except Exception:
+            with self._in_flight_changed:
+                self._in_flight -= 1
+                self._in_flight_changed.notify_all()
+            raise
+    
+    def _report_send(self, event, result, msg_id):
+        if result != pulsar.Result.Ok:
+            self.on_publish_error(event, result)
+        elif self.on_publish_success is not None:
+            self.on_publish_success(event, msg_id)
+    
+    @staticmethod
+    def _log_publish_error(event, result):
+        print(f"Error publishing {type(event).__name__} event {event.id}: {result}")
+    
+    def subscribe(self, event_type: Type[DomainEvent], handler: Callable[[DomainEvent], Any], consumer_type=None):
         """Subscribe a handler to a specific event type"""
         topic = self._get_topic_name(event_type)
         
         # Store the mapping from event type name to class
         self.event_type_mapping[event_type.__name__] = event_type
         
+        if topic in self.batch_subscribers:
+            raise ValueError(f"Topic {topic} already has batch handlers")
+        
         if topic not in self.subscribers:
             self.subscribers[topic] = []
             
@@ -76,37 +286,22 @@ class PulsarEventBus(EventBus):
             subscription_name = f"{self.client_id}-{event_type.__name__}"
             
             # Create a consumer
+            consumer_type = self._consumer_type(event_type, consumer_type)
             consumer = self.client.subscribe(
                 topic,
                 subscription_name,
-                consumer_type=pulsar.ConsumerType.Shared
+                consumer_type=consumer_type
             )
+            ordered = consumer_type in ORDERED_CONSUMER_TYPES
+            received, acked, nacked = self._message_counters(event_type)
             
             # Start a thread to listen for messages
             def message_listener():
                 while True:
                     try:
                         msg = consumer.receive()
-                        try:
-                            # Deserialize the message
-                            event_data = json.loads(msg.data().decode('utf-8'))
-                            event_type_name = event_data.pop('_event_type', None)
-                            
-                            if event_type_name in self.event_type_mapping:
-                                # Recreate the event object
-                                event_class = self.event_type_mapping[event_type_name]
-                                event = event_class.__new__(event_class)
-                                event.__dict__.update(event_data)
-                                
-                                # Call all handlers
-                                for handler in self.subscribers[topic]:
-                                    threading.Thread(target=handler, args=(event,)).start()
-                            
-                            # Acknowledge the message
-                            consumer.acknowledge(msg)
-                        except Exception as e:
-                            print(f"Error processing message: {e}")
-                            consumer.negative_acknowledge(msg)
+                        received.inc()
+                        self._handle_message(consumer, topic, msg, ordered, acked, nacked)
                     except Exception as e:
                         print(f"Error receiving message: {e}")
             
@@ -114,25 +309,320 @@ class PulsarEventBus(EventBus):
             threading.Thread(target=message_listener, daemon=True).start()
             self.consumers[topic] = consumer
         
-        self.subscribers[topic].append(handler)
+        self.subscribers[topic].append(timed(HANDLER_SECONDS.labels(event_type.__name__))(handler))
+    
+    def _handle_message(self, consumer, topic, msg, ordered, acked, nacked):
+        """Decode, handle and acknowledge one received message
+        
+        Key_Shared and Failover consumers wait for the handlers before the next
+        receive and never move past a failed message: it is left unacknowledged
+        and the consumer is rewound with redeliver_unacknowledged_messages, so
+        it comes back before any later message of its key.
+        """
+        try:
+            # Deserialize the message and recreate the event object
+            event = self._decode_message(msg)
+            
+            if event is None:
+                # Nobody here handles this type, do not redeliver it
+                consumer.acknowledge(msg)
+                acked.inc()
+                return
+            
+            futures = self.executor.submit_all([(handler, (event,)) for handler in self.subscribers[topic]])
+            if not ordered:
+                # The message is acknowledged once the handlers finish
+                self._acknowledge_when_done(consumer, msg, futures, acked, nacked)
+                return
+            
+            # Keep the order of the key: finish this event before receiving the next
+            if futures is not None:
+                wait(futures)
+                errors = [future.exception() for future in futures if future.exception() is not None]
+                for error in errors:
+                    print(f"Error processing message: {error}")
+                if not errors:
+                    consumer.acknowledge(msg)
+                    acked.inc()
+                    return
+        except Exception as e:
+            print(f"Error processing message: {e}")
+            if not ordered:
+                consumer.negative_acknowledge(msg)
+                nacked.inc()
+                return
+        
+        nacked.inc()
+        time.sleep(self.redelivery_delay)
+        consumer.redeliver_unacknowledged_messages()
+    
+    @staticmethod
+    def _message_counters(event_type):
+        """Received, acked and nacked counters of an event type's topic"""
+        name = event_type.__name__
+        return MESSAGES_RECEIVED.labels(name), MESSAGES_ACKED.labels(name), MESSAGES_NACKED.labels(name)
+    
+    @staticmethod
+    def _acknowledge_when_done(consumer, msg, futures, acked, nacked):
+        """Ack the message(s) after all handlers succeed, nack if any fails
+        
+        futures is None when the executor dropped the handlers; none of them runs then.
+        """
+        messages = msg if isinstance(msg, list) else [msg]
+        
+        def settle(ok):
+            for message in messages:
+                if ok:
+                    consumer.acknowledge(message)
+                else:
+                    consumer.negative_acknowledge(message)
+            (acked if ok else nacked).inc(len(messages))
+        
+        if futures is None:
+            settle(False)
+            return
+        
+        remaining = [len(futures)]
+        failed = [False]
+        lock = threading.Lock()
+        
+        def on_done(future):
+            if future.exception() is not None:
+                print(f"Error processing message: {future.exception()}")
+            with lock:
+                failed[0] = failed[0] or future.exception() is not None
+                remaining[0] -= 1
+                if remaining[0] > 0:
+                    return
+            settle(not failed[0])
+        
+        if not futures:
+            settle(True)
+        for future in futures:
+            future.add_done_callback(on_done)
+    
+    def subscribe_batch(self, event_type: Type[DomainEvent], handler: Callable[[List[DomainEvent]], Any],
+                        max_messages: int = 100, max_bytes: int = 1024 * 1024, timeout_ms: int = 100,
+                        consumer_type=None, in_order: bool = False):
+        """Subscribe a handler that receives lists of events read with batch_receive
+        
+        A batch is delivered once max_messages or max_bytes is reached or timeout_ms
+        has elapsed. Batch and per-event handlers cannot be mixed on one topic since
+        they share the subscription. With Exclusive, Failover or Key_Shared consumers,
+        or any consumer when in_order is set, batches are handled one at a time and
+        after a failed batch the consumer is rewound so it is received again,
+        redelivery_delay seconds later, before any later message. Exclusive and
+        Failover acknowledge them cumulatively.
+        """
+        topic = self._get_topic_name(event_type)
+        self.event_type_mapping[event_type.__name__] = event_type
+        
+        if topic in self.subscribers:
+            raise ValueError(f"Topic {topic} already has per-event handlers")
+        
+        if topic not in self.batch_subscribers:
+            self.batch_subscribers[topic] = []
+            consumer_type = self._consumer_type(event_type, consumer_type)
+            consumer = self.client.subscribe(
+                topic,
+                f"{self.client_id}-{event_type.__name__}",
+                consumer_type=consumer_type,
+                batch_receive_policy=pulsar.ConsumerBatchReceivePolicy(max_messages, max_bytes, timeout_ms)
+            )
+            cumulative = consumer_type in (pulsar.ConsumerType.Exclusive, pulsar.ConsumerType.Failover)
+            ordered = in_order or consumer_type in ORDERED_CONSUMER_TYPES
+            threading.Thread(
+                target=self._batch_listener,
+                args=(consumer, topic, cumulative, ordered, self._message_counters(event_type)),
+                daemon=True
+            ).start()
+            self.consumers[topic] = consumer
+        
+        self.batch_subscribers[topic].append(timed(HANDLER_SECONDS.labels(event_type.__name__))(handler))
+    
+    def _batch_listener(self, consumer, topic, cumulative, ordered, counters):
+        """Receive batches, decode them once and hand the event list to every batch handler"""
+        while True:
+            try:
+                messages = consumer.batch_receive()
+            except Exception as e:
+                print(f"Error receiving messages: {e}")
+                continue
+            if not messages:
+                continue
+            try:
+                self._handle_batch(consumer, topic, messages, cumulative, ordered, counters)
+            except Exception as e:
+                # Keep the subscription alive; the batch comes back after the nack delay
+                print(f"Error processing messages: {e}")
+                nacked = counters[2]
+                for msg in messages:
+                    try:
+                        consumer.negative_acknowledge(msg)
+                    except Exception as nack_error:
+                        print(f"Error negatively acknowledging message: {nack_error}")
+                nacked.inc(len(messages))
+    
+    def _handle_batch(self, consumer, topic, messages, cumulative, ordered, counters):
+        """Decode, handle and acknowledge one received batch"""
+        received, acked, nacked = counters
+        received.inc(len(messages))
+        if cumulative:
+            self._handle_batch_in_order(consumer, topic, messages, acked, nacked)
+            return
+        
+        events = []
+        handled = []
+        for msg in messages:
+            try:
+                event = self._decode_message(msg)
+            except Exception as e:
+                print(f"Error decoding message: {e}")
+                consumer.negative_acknowledge(msg)
+                nacked.inc()
+                continue
+            if event is None:
+                consumer.acknowledge(msg)
+                acked.inc()
+                continue
+            events.append(event)
+            handled.append(msg)
+        if not handled:
+            return
+        
+        futures = self.executor.submit_all([(handler, (events,)) for handler in self.batch_subscribers[topic]])
+        if not ordered:
+            self._acknowledge_when_done(consumer, handled, futures, acked, nacked)
+            return
+        
+        # Key_Shared: finish this batch before handing over the next one of the same keys,
+        # and rewind to it on a failure instead of moving on
+        if futures is not None:
+            wait(futures)
+            errors = [future.exception() for future in futures if future.exception() is not None]
+            for error in errors:
+                print(f"Error processing messages: {error}")
+            if not errors:
+                for msg in handled:
+                    consumer.acknowledge(msg)
+                acked.inc(len(handled))
+                return
+        nacked.inc(len(handled))
+        time.sleep(self.redelivery_delay)
+        consumer.redeliver_unacknowledged_messages()
+    
+    def _handle_batch_in_order(self, consumer, topic, messages, acked, nacked):
+        """Exclusive and Failover: acknowledge cumulatively and never move past a failed message
+        
+        The batch is handled up to its first undecodable message. On any failure
+        nothing after the last acknowledged message is acknowledged and the
+        consumer is rewound with redeliver_unacknowledged_messages, so the next
+        batch_receive starts again at the failed message, in order.
+        """
+        events = []
+        handled = []
+        failed = False
+        for msg in messages:
+            try:
+                event = self._decode_message(msg)
+            except Exception as e:
+                print(f"Error decoding message {msg.message_id()}, stopping the subscription at it: {e}")
+                failed = True
+                break
+            handled.append(msg)
+            if event is not None:
+                events.append(event)
+        
+        if events:
+            futures = self.executor.submit_all([(handler, (events,)) for handler in self.batch_subscribers[topic]])
+            if futures is None or any(future.exception() for future in futures):
+                for future in futures or []:
+                    if future.exception() is not None:
+                        print(f"Error processing messages: {future.exception()}")
+                handled = []
+                failed = True
+        if handled:
+            consumer.acknowledge_cumulative(handled[-1])
+            acked.inc(len(handled))
+        if failed:
+            nacked.inc(len(messages) - len(handled))
+            time.sleep(self.redelivery_delay)
+            consumer.redeliver_unacknowledged_messages()
     
+    @timed(PUBLISH_SECONDS.labels("pulsar", "publish"))
     def publish(self, event: DomainEvent):
         """Publish an event to Pulsar"""
         topic = self._get_topic_name(type(event))
-        producer = self._get_producer(topic)
+        producer = self._get_producer(topic, type(event))
+        
+        if self.async_publish:
+            self._send_async(producer, event, self._report_send)
+            return
         
         # Serialize the event
-        message = self._serialize_event(event)
+        message, properties = self._encode_event(event)
         
         # Send the message
-        producer.send(message)
+        producer.send(message, properties=properties, partition_key=self._message_key(event))
+    
+    @timed(PUBLISH_SECONDS.labels("pulsar", "publish_batch"))
+    def publish_batch(self, events: List[DomainEvent]):
+        """Publish several events asynchronously and wait once for all of them"""
+        producers = {}
+        failures = []
+        
+        def on_sent(event, result, msg_id):
+            if result != pulsar.Result.Ok:
+                failures.append(result)
+            self._report_send(event, result, msg_id)
+        
+        for event in events:
+            topic = self._get_topic_name(type(event))
+            producer = producers.get(topic) or self._get_producer(topic, type(event))
+            producers[topic] = producer
+            self._send_async(producer, event, on_sent)
+        
+        # Wait until every buffered message has been persisted by the broker
+        for producer in producers.values():
+            producer.flush()
+        
+        if failures:
+            raise Exception(f"Failed to publish {len(failures)} of {len(events)} events: {failures[0]}")
+    
+    def flush(self, timeout=None):
+        """Send everything buffered by the producers and wait for all pending confirmations"""
+        for producer in list(self.producers.values()):
+            producer.flush()
+        with self._in_flight_changed:
+            return self._in_flight_changed.wait_for(lambda: self._in_flight == 0, timeout)
     
     def close(self):
-        """Close all producers and consumers"""
+        """Let running handlers finish, drain pending sends, then close all producers and consumers"""
+        self.executor.shutdown(wait=True)
+        self.flush()
         for producer in self.producers.values():
             producer.close()
         
         for consumer in self.consumers.values():
             consumer.close()
         
-        self.client.close()
\ No newline at end of file
+        self.client.close()
+
+
+def create_event_bus(client_id: str) -> EventBus:
+    """Build the services' event bus: a LocalLogEventBus when EVENT_LOG_DIR is set, Pulsar otherwise"""
+    options = pulsar_options_from_env()
+    log_dir = os.environ.get('EVENT_LOG_DIR')
+    if log_dir:
+        # Imported here so that the local log does not depend on this module's Pulsar setup
+        from .local_log import LocalLogEventBus, local_log_options_from_env
+        return LocalLogEventBus(
+            log_dir,
+            client_id=client_id,
+            codec=options["codec"],
+            message_key=options["message_key"],
+            consumer_types=options["consumer_types"],
+            **local_log_options_from_env()
+        )
+    pulsar_service_url = os.environ.get('PULSAR_SERVICE_URL', 'pulsar://localhost:6650')
+    return PulsarEventBus(service_url=pulsar_service_url, client_id=client_id, **options)
@@ -0,0 +1,162 @@
+# infrastructure/event_store.py
+from datetime import datetime
+from sqlalchemy import insert, select, func, text
+from sqlalchemy.dialects import postgresql, sqlite
+from domain.events import DataIngested, DataProcessed, DataValidated
+from domain.repositories import EventStore
+from domain.seedwork import DomainEvent
+from .database import StoredEventModel, SnapshotModel, SessionLocal
+from .serialization import serialize_event
+from .codecs import JSON_CODEC
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Postgres advisory lock serializing appends, so sequence order is commit order
+# and a reader streaming by sequence never skips an event committed late
+APPEND_LOCK_KEY = 0x6576656e74  # "event"
+
+Reducer = Callable[[Optional[Dict[str, Any]], DomainEvent], Dict[str, Any]]
+
+
+def _isoformat(value) -> Optional[str]:
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def data_state(state: Optional[Dict[str, Any]], event: DomainEvent) -> Dict[str, Any]:
+    """Fold one event into the JSON state of an ingested record"""
+    state = dict(state) if state else {"data_id": event.aggregate_id}
+    state["partner_id"] = getattr(event, "partner_id", state.get("partner_id"))
+    if isinstance(event, DataIngested):
+        state["timestamp"] = _isoformat(event.timestamp)
+        if event.payload is not None:
+            state["payload"] = event.payload
+    elif isinstance(event, DataValidated):
+        state["is_valid"] = event.is_valid
+        state["validation_errors"] = event.validation_errors
+    elif isinstance(event, DataProcessed):
+        state["processing_result"] = event.result
+    state["version"] = state.get("version", 0) + 1
+    return state
+
+
+class SQLAlchemyEventStore(EventStore):
+    """EventStore on the event_store and event_snapshots tables
+
+    Events are stored in their JSON encoding and appended with one multi-row
+    insert per batch; an event ID already in the store is skipped, so
+    redelivered events can be appended again safely. load_state folds the
+    events after the latest snapshot with `reducer` and saves a new snapshot
+    once snapshot_every or more events had to be folded.
+    """
+
+    def __init__(self, session_factory=SessionLocal, reducer: Reducer = data_state, snapshot_every: int = 100):
+        self.session_factory = session_factory
+        self.reducer = reducer
+        self.snapshot_every = snapshot_every
+
+    @staticmethod
+    def _to_row(event: DomainEvent) -> Dict[str, Any]:
+        occurred_on = event.occurred_on
+        return {
+            "event_id": event.id,
+            "aggregate_id": event.aggregate_id,
+            "event_type": type(event).__name__,
+            "occurred_on": occurred_on if isinstance(occurred_on, datetime) else datetime.fromisoformat(occurred_on),
+            "data": serialize_event(event).decode('utf-8'),
+        }
+
+    def append(self, events: List[DomainEvent]) -> None:
+        if not events:
+            return
+        with self.session_factory() as session:
+            self.append_in(session, events)
+            session.commit()
+
+    def append_in(self, session, events: List[DomainEvent]) -> None:
+        """Append events within the caller's transaction, which commits them along with its own writes
+
+        On Postgres the append lock is then held until that transaction ends.
+        """
+        if not events:
+            return
+        rows = [self._to_row(event) for event in events]
+        dialect = session.get_bind().dialect.name
+        if dialect == "postgresql":
+            session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": APPEND_LOCK_KEY})
+            statement = postgresql.insert(StoredEventModel).on_conflict_do_nothing(index_elements=["event_id"])
+        elif dialect == "sqlite":
+            statement = sqlite.insert(StoredEventModel).on_conflict_do_nothing(index_elements=["event_id"])
+        else:
+            statement = insert(StoredEventModel)
+        session.execute(statement, rows)
+
+    def last_sequence(self) -> int:
+        with self.session_factory() as session:
+            return session.scalar(select(func.max(StoredEventModel.sequence))) or 0
+
+    @staticmethod
+    def _decode(data: str) -> Optional[DomainEvent]:
+        return JSON_CODEC.decode(data)
+
+    def get_events(self, aggregate_id: str, after_sequence: int = 0) -> List[Tuple[int, DomainEvent]]:
+        with self.session_factory() as session:
+            rows = session.execute(
+                select(StoredEventModel.sequence, StoredEventModel.data)
+                .where(StoredEventModel.aggregate_id == aggregate_id, StoredEventModel.sequence > after_sequence)
+                .order_by(StoredEventModel.sequence)
+            ).all()
+        return [(sequence, event) for sequence, event in ((row.sequence, self._decode(row.data)) for row in rows)
+                if event is not None]
+
+    def iter_events(self, after_sequence: int = 0, batch_size: int = 1000,
+                    event_types: Optional[List[str]] = None) -> Iterator[Tuple[int, DomainEvent]]:
+        """Stream events by sequence, one short query per batch_size events
+
+        Each batch resumes after the last sequence of the previous one, so memory
+        stays constant and no transaction is held open across the whole replay.
+        """
+        while True:
+            query = (
+                select(StoredEventModel.sequence, StoredEventModel.data)
+                .where(StoredEventModel.sequence > after_sequence)
+                .order_by(StoredEventModel.sequence)
+                .limit(batch_size)
+            )
+            if event_types:
+                query = query.where(StoredEventModel.event_type.in_(event_types))
+            with self.session_factory() as session:
+                rows = session.execute(query).all()
+            for row in rows:
+                event = self._decode(row.data)
+                if event is not None:
+                    yield row.sequence, event
+            if len(rows) < batch_size:
+                return
+            after_sequence = rows[-1].sequence
+
+    def get_snapshot(self, aggregate_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        with self.session_factory() as session:
+            snapshot = session.get(SnapshotModel, aggregate_id)
+            return (snapshot.sequence, snapshot.state) if snapshot is not None else None
+
+    def save_snapshot(self, aggregate_id: str, sequence: int, state: Dict[str, Any]) -> None:
+        with self.session_factory() as session:
+            snapshot = session.get(SnapshotModel, aggregate_id)
+            if snapshot is None:
+                session.add(SnapshotModel(
+                    aggregate_id=aggregate_id, sequence=sequence, state=state, created_at=datetime.utcnow()
+                ))
+            elif sequence > snapshot.sequence:
+                snapshot.sequence = sequence
+                snapshot.state = state
+                snapshot.created_at = datetime.utcnow()
+            session.commit()
+
+    def load_state(self, aggregate_id: str) -> Optional[Dict[str, Any]]:
+        snapshot = self.get_snapshot(aggregate_id)
+        sequence, state = snapshot if snapshot is not None else (0, None)
+        events = self.get_events(aggregate_id, after_sequence=sequence)
+        for sequence, event in events:
+            state = self.reducer(state, event)
+        if len(events) >= self.snapshot_every:
+            self.save_snapshot(aggregate_id, sequence, state)
+        return state
@@ -0,0 +1,131 @@
+# infrastructure/group_commit.py
+import queue
+import threading
+import time
+from domain.entities import IngestedData, IngestedDataSummary
+from domain.repositories import DataRepository
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+_STOP = object()
+
+
+class _PendingWrite:
+    """An add() call waiting for the group transaction that contains it"""
+
+    __slots__ = ("data", "error", "done")
+
+    def __init__(self, data: IngestedData):
+        self.data = data
+        self.error = None
+        self.done = threading.Event()
+
+
+class GroupCommitDataRepository(DataRepository):
+    """DataRepository decorator that lets concurrent add() calls share one commit
+
+    Each add() is queued to a single writer thread, which collects the writes
+    that arrive within `window_ms` (or until `max_batch_size` is reached) and
+    persists them with one add_many() call on the wrapped repository. Callers
+    block until that transaction has committed, so a returned add() is as
+    durable as with the wrapped repository.
+    """
+
+    def __init__(self, repository: DataRepository, window_ms: float = 2, max_batch_size: int = 500):
+        self.repository = repository
+        self.stores_events = repository.stores_events
+        self.appends_to_event_store = repository.appends_to_event_store
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._queue = queue.Queue()
+        # Guards _closed, so nothing is queued after _STOP where the writer would never see it
+        self._lock = threading.Lock()
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name="group-commit-writer", daemon=True)
+        self._writer.start()
+
+    def add(self, data: IngestedData) -> None:
+        """Queue the entity and wait until its group transaction has committed"""
+        pending = _PendingWrite(data)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("GroupCommitDataRepository is closed")
+            self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+
+    def add_many(self, data_list: List[IngestedData]) -> None:
+        # Already a single transaction, no need to go through the writer
+        self.repository.add_many(data_list)
+
+    def update(self, data: IngestedData) -> None:
+        self.repository.update(data)
+
+    def get_by_id(self, data_id: str) -> Optional[IngestedData]:
+        return self.repository.get_by_id(data_id)
+
+    def get_by_ids(self, data_ids: Iterable[str]) -> Dict[str, IngestedData]:
+        return self.repository.get_by_ids(data_ids)
+
+    def get_all(self) -> List[IngestedData]:
+        return self.repository.get_all()
+
+    def get_by_partner_id(self, partner_id: str) -> List[IngestedData]:
+        return self.repository.get_by_partner_id(partner_id)
+
+    def get_all_summaries(self) -> List[IngestedDataSummary]:
+        return self.repository.get_all_summaries()
+
+    def get_summaries_by_partner_id(self, partner_id: str, start: Optional[datetime] = None,
+                                    end: Optional[datetime] = None) -> List[IngestedDataSummary]:
+        return self.repository.get_summaries_by_partner_id(partner_id, start, end)
+
+    def get_summary_page(self, limit: int, after: Optional[Tuple[datetime, str]] = None) -> List[IngestedDataSummary]:
+        return self.repository.get_summary_page(limit, after)
+
+    def iter_summaries(self, batch_size: int = 1000) -> Iterator[IngestedDataSummary]:
+        return self.repository.iter_summaries(batch_size)
+
+    def close(self):
+        """Commit what is still queued and stop the writer thread; later add() calls raise"""
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(_STOP)
+        self._writer.join()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    # Past the window, still take whatever is already queued
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+
+    def _commit(self, batch: List[_PendingWrite]):
+        try:
+            self.repository.add_many([pending.data for pending in batch])
+        except Exception:
+            # Retry one by one so a single bad row does not fail the whole group
+            for pending in batch:
+                try:
+                    self.repository.add(pending.data)
+                except Exception as e:
+                    pending.error = e
+        finally:
+            for pending in batch:
+                pending.done.set()
@@ -0,0 +1,598 @@
+# infrastructure/local_log.py
+import fcntl
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import wait
+from domain.seedwork import EventBus, DomainEvent
+from .codecs import CODECS, JSON_CODEC, EventCodec, get_codec
+from .dispatch import BoundedExecutor, executor_from_env
+from .metrics import HANDLER_SECONDS, MESSAGES_ACKED, MESSAGES_NACKED, MESSAGES_RECEIVED, PUBLISH_SECONDS, timed
+from .processing import lane_for
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+# Record layout: payload length, crc32 of the payload, key length, codec name length,
+# then the payload (codec name, key, encoded event), padded to a multiple of 8 bytes.
+# The length is written last, so a zero length marks the end of the written log.
+_HEADER = struct.Struct(">IIHB")
+_LENGTH = struct.Struct(">I")
+_OFFSET = struct.Struct(">Q")
+_ROLL = 0xFFFFFFFF
+_ALIGN = 8
+
+SHARED = "shared"
+KEY_SHARED = "key_shared"
+FAILOVER = "failover"
+EXCLUSIVE = "exclusive"
+LOCAL_CONSUMER_TYPES = (SHARED, KEY_SHARED, FAILOVER, EXCLUSIVE)
+
+EARLIEST = "earliest"
+LATEST = "latest"
+
+
+def _aligned(size: int) -> int:
+    return (size + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class Record:
+    """One decoded-on-demand entry of a topic log"""
+
+    __slots__ = ("offset", "next_offset", "codec", "key", "data")
+
+    def __init__(self, offset: int, next_offset: int, codec: str, key: Optional[str], data: bytes):
+        self.offset = offset
+        self.next_offset = next_offset
+        self.codec = codec
+        self.key = key
+        self.data = data
+
+
+class TopicLog:
+    """Append-only log of one topic, split into fixed-size memory-mapped segments
+
+    Offsets are byte positions in the log; segment n covers
+    [n * segment_bytes, (n + 1) * segment_bytes) and lives in a file named after
+    its first offset. Appends from any process are serialized with an flock on
+    the topic's lock file; readers need no lock and see a record as soon as
+    its length is written.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = 64 * 1024 * 1024):
+        if segment_bytes % _ALIGN:
+            raise ValueError(f"Segment size must be a multiple of {_ALIGN} bytes")
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._lock_fd = os.open(os.path.join(directory, "append.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        self._tail_fd = os.open(os.path.join(directory, "tail"), os.O_RDWR | os.O_CREAT, 0o644)
+        self._segments: Dict[int, mmap.mmap] = {}
+        self._segments_lock = threading.Lock()
+
+    def _segment_path(self, index: int) -> str:
+        return os.path.join(self.directory, f"{index * self.segment_bytes:020d}.log")
+
+    def _segment(self, index: int, create: bool = False) -> Optional[mmap.mmap]:
+        """Map segment `index`, creating it when appending; None if it does not exist yet"""
+        segment = self._segments.get(index)
+        if segment is not None:
+            return segment
+        with self._segments_lock:
+            segment = self._segments.get(index)
+            if segment is not None:
+                return segment
+            path = self._segment_path(index)
+            if not os.path.exists(path):
+                if not create:
+                    return None
+                # Size the file before it becomes visible, readers never see a short segment
+                temp_path = f"{path}.{os.getpid()}.tmp"
+                with open(temp_path, "wb") as temp:
+                    temp.truncate(self.segment_bytes)
+                os.replace(temp_path, path)
+            with open(path, "r+b") as segment_file:
+                segment = mmap.mmap(segment_file.fileno(), self.segment_bytes)
+            self._segments[index] = segment
+            return segment
+
+    def _read_header(self, offset: int) -> Tuple[Optional[mmap.mmap], int, int]:
+        """(segment, position, length) of the entry at offset; length 0 means nothing written there"""
+        segment = self._segment(offset // self.segment_bytes)
+        if segment is None:
+            return None, 0, 0
+        position = offset % self.segment_bytes
+        return segment, position, _LENGTH.unpack_from(segment, position)[0]
+
+    def _valid_at(self, offset: int) -> Optional[int]:
+        """Offset following a complete entry at offset, or None if there is none"""
+        segment, position, length = self._read_header(offset)
+        if length == 0:
+            return None
+        if length == _ROLL:
+            return (offset // self.segment_bytes + 1) * self.segment_bytes
+        _, crc, _, _ = _HEADER.unpack_from(segment, position)
+        start = position + _HEADER.size
+        if zlib.crc32(segment[start:start + length]) != crc:
+            return None
+        return offset + _aligned(_HEADER.size + length)
+
+    def _find_tail(self) -> int:
+        """Current end of the log; call with the append lock held"""
+        data = os.pread(self._tail_fd, _OFFSET.size, 0)
+        tail = _OFFSET.unpack(data)[0] if len(data) == _OFFSET.size else 0
+        # Skip entries written by an appender that died before recording the new tail
+        while True:
+            next_offset = self._valid_at(tail)
+            if next_offset is None:
+                return tail
+            tail = next_offset
+
+    def end_offset(self) -> int:
+        """Offset the next appended record will get"""
+        with self._lock:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            try:
+                return self._find_tail()
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def append(self, entries: List[Tuple[str, Optional[str], bytes]]) -> List[int]:
+        """Append (codec name, key, data) entries under one lock and return their offsets"""
+        encoded = []
+        for codec_name, key, data in entries:
+            codec_bytes = codec_name.encode('ascii')
+            key_bytes = key.encode('utf-8') if key is not None else b""
+            payload = codec_bytes + key_bytes + data
+            if _aligned(_HEADER.size + len(payload)) > self.segment_bytes:
+                raise ValueError(f"Record of {len(payload)} bytes does not fit in a {self.segment_bytes} byte segment")
+            encoded.append((len(key_bytes), len(codec_bytes), payload))
+
+        offsets = []
+        with self._lock:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            try:
+                tail = self._find_tail()
+                for key_length, codec_length, payload in encoded:
+                    size = _aligned(_HEADER.size + len(payload))
+                    index, position = divmod(tail, self.segment_bytes)
+                    if position + size > self.segment_bytes:
+                        # Not enough room left: mark the rest of the segment as skipped
+                        _LENGTH.pack_into(self._segment(index, create=True), position, _ROLL)
+                        index, position = index + 1, 0
+                        tail = index * self.segment_bytes
+                    segment = self._segment(index, create=True)
+                    start = position + _HEADER.size
+                    segment[start:start + len(payload)] = payload
+                    struct.pack_into(">IHB", segment, position + _LENGTH.size, zlib.crc32(payload), key_length, codec_length)
+                    _LENGTH.pack_into(segment, position, len(payload))
+                    offsets.append(tail)
+                    tail += size
+                os.pwrite(self._tail_fd, _OFFSET.pack(tail), 0)
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+        return offsets
+
+    def read(self, offset: int, max_records: int, max_bytes: int) -> List[Record]:
+        """Read up to max_records complete records (or max_bytes of data) from offset"""
+        records = []
+        size = 0
+        while len(records) < max_records and size < max_bytes:
+            segment, position, length = self._read_header(offset)
+            if length == 0:
+                break
+            if length == _ROLL:
+                offset = (offset // self.segment_bytes + 1) * self.segment_bytes
+                continue
+            _, crc, key_length, codec_length = _HEADER.unpack_from(segment, position)
+            start = position + _HEADER.size
+            payload = segment[start:start + length]
+            if zlib.crc32(payload) != crc:
+                # Not fully visible yet, read it on the next poll
+                break
+            key_end = codec_length + key_length
+            next_offset = offset + _aligned(_HEADER.size + length)
+            records.append(Record(
+                offset,
+                next_offset,
+                payload[:codec_length].decode('ascii'),
+                payload[codec_length:key_end].decode('utf-8') if key_length else None,
+                payload[key_end:]
+            ))
+            size += length
+            offset = next_offset
+        return records
+
+    def flush(self):
+        """Write the mapped segments back to disk"""
+        with self._segments_lock:
+            for segment in self._segments.values():
+                segment.flush()
+
+    def close(self):
+        self.flush()
+        with self._segments_lock:
+            for segment in self._segments.values():
+                segment.close()
+            self._segments.clear()
+        os.close(self._lock_fd)
+        os.close(self._tail_fd)
+
+
+class _LogSubscription:
+    """Named subscription on a topic log, consumed by any number of processes
+
+    The subscription is divided into lanes, each with its own persisted offset
+    and owned by one consumer at a time through an flock. Consumers register a
+    member file and periodically rebalance so that each owns its fair share of
+    lanes. Records are assigned to lanes by key (key_shared), by offset
+    (shared), or all to a single lane (failover and exclusive). Each lane hands
+    its batches to the handlers one at a time and only persists its offset once
+    they succeed, so delivery is at-least-once and in order per lane.
+    """
+
+    def __init__(self, bus: "LocalLogEventBus", log: TopicLog, directory: str, consumer_type: str,
+                 handlers: List[Callable[[List[DomainEvent]], Any]], max_messages: int, max_bytes: int,
+                 timeout_ms: int, topic: str, in_order: bool = False):
+        self.bus = bus
+        self.log = log
+        self.directory = directory
+        self.handlers = handlers
+        self.keyed = consumer_type == KEY_SHARED or in_order
+        self.lanes = bus.lanes if consumer_type in (SHARED, KEY_SHARED) else 1
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.timeout = timeout_ms / 1000.0
+        self._received = MESSAGES_RECEIVED.labels(topic)
+        self._acked = MESSAGES_ACKED.labels(topic)
+        self._nacked = MESSAGES_NACKED.labels(topic)
+        self._stop = threading.Event()
+        self._owned: Dict[int, Tuple[int, threading.Event, threading.Thread]] = {}
+        os.makedirs(os.path.join(directory, "members"), exist_ok=True)
+        # Lock the member file before it becomes visible, or it could be taken for a dead member
+        member_name = f"{os.getpid()}-{uuid.uuid4().hex}"
+        temp_path = os.path.join(directory, f"{member_name}.tmp")
+        self._member_path = os.path.join(directory, "members", member_name)
+        self._member_fd = os.open(temp_path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._member_fd, fcntl.LOCK_EX)
+        os.replace(temp_path, self._member_path)
+        self._coordinator = threading.Thread(target=self._coordinate, name=f"{os.path.basename(directory)}-coordinator", daemon=True)
+        self._coordinator.start()
+
+    def _live_members(self) -> int:
+        """Count members whose process still holds its member lock, removing the others"""
+        members_dir = os.path.join(self.directory, "members")
+        live = 0
+        for name in os.listdir(members_dir):
+            path = os.path.join(members_dir, name)
+            if path == self._member_path:
+                live += 1
+                continue
+            try:
+                fd = os.open(path, os.O_RDWR)
+            except FileNotFoundError:
+                continue
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                live += 1
+            else:
+                os.unlink(path)
+            finally:
+                os.close(fd)
+        return live
+
+    def _coordinate(self):
+        while not self._stop.is_set():
+            try:
+                self._rebalance()
+            except Exception as e:
+                print(f"Error rebalancing subscription {self.directory}: {e}")
+            self._stop.wait(self.bus.rebalance_interval)
+
+    def _rebalance(self):
+        # Lanes whose consumer thread stopped on an error are released and claimed again
+        for lane, (_, _, thread) in list(self._owned.items()):
+            if not thread.is_alive():
+                self._release(lane)
+        fair_share = math.ceil(self.lanes / self._live_members())
+        # Give up extra lanes first so that new members can pick them up
+        for lane in sorted(self._owned)[fair_share:]:
+            self._release(lane)
+        for lane in range(self.lanes):
+            if len(self._owned) >= fair_share or self._stop.is_set():
+                break
+            if lane not in self._owned:
+                self._claim(lane)
+
+    def _lane_path(self, lane: int, suffix: str) -> str:
+        return os.path.join(self.directory, f"lane-{lane}.{suffix}")
+
+    def _claim(self, lane: int):
+        lock_fd = os.open(self._lane_path(lane, "lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(lock_fd)
+            return
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=self._consume_lane, args=(lane, lock_fd, stop),
+            name=f"{os.path.basename(self.directory)}-lane-{lane}", daemon=True
+        )
+        self._owned[lane] = (lock_fd, stop, thread)
+        thread.start()
+
+    def _release(self, lane: int):
+        lock_fd, stop, thread = self._owned.pop(lane)
+        stop.set()
+        thread.join()
+        fcntl.flock(lock_fd, fcntl.LOCK_UN)
+        os.close(lock_fd)
+
+    def _lane_of(self, record: Record) -> int:
+        if self.lanes == 1:
+            return 0
+        if self.keyed and record.key is not None:
+            return lane_for(record.key, self.lanes)
+        return lane_for(str(record.offset), self.lanes)
+
+    def _consume_lane(self, lane: int, lock_fd: int, stop: threading.Event):
+        offset_fd = os.open(self._lane_path(lane, "offset"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            data = os.pread(offset_fd, _OFFSET.size, 0)
+            if len(data) == _OFFSET.size:
+                offset = _OFFSET.unpack(data)[0]
+            else:
+                offset = self.log.end_offset() if self.bus.initial_position == LATEST else 0
+                os.pwrite(offset_fd, _OFFSET.pack(offset), 0)
+
+            while not stop.is_set() and not self._stop.is_set():
+                events, next_offset = self._next_batch(lane, offset, stop)
+                if next_offset == offset:
+                    continue
+                self._received.inc(len(events))
+                if events and not self._handle(events):
+                    # Redeliver the same batch, like a negative acknowledgement
+                    self._nacked.inc(len(events))
+                    stop.wait(self.bus.redelivery_delay)
+                    continue
+                offset = next_offset
+                os.pwrite(offset_fd, _OFFSET.pack(offset), 0)
+                self._acked.inc(len(events))
+        except Exception as e:
+            print(f"Error consuming lane {lane} of {self.directory}: {e}")
+        finally:
+            os.close(offset_fd)
+
+    def _next_batch(self, lane: int, offset: int, stop: threading.Event) -> Tuple[List[DomainEvent], int]:
+        """Collect this lane's events from offset until the batch is full or timeout_ms has passed"""
+        events = []
+        size = 0
+        deadline = None
+        while not stop.is_set() and not self._stop.is_set():
+            records = self.log.read(offset, self.max_messages, self.max_bytes)
+            for record in records:
+                offset = record.next_offset
+                if self._lane_of(record) != lane:
+                    continue
+                try:
+                    event = self.bus._decode_record(record)
+                except Exception as e:
+                    print(f"Error decoding record at offset {record.offset}: {e}")
+                    continue
+                if event is None:
+                    continue
+                events.append(event)
+                size += len(record.data)
+                if len(events) >= self.max_messages or size >= self.max_bytes:
+                    return events, offset
+            if events and deadline is None:
+                deadline = time.monotonic() + self.timeout
+            if deadline is not None and time.monotonic() >= deadline:
+                return events, offset
+            if not records:
+                stop.wait(self.bus.poll_interval)
+            elif not events:
+                # Only other lanes' records so far: let the offset advance
+                return events, offset
+        return events, offset
+
+    def _handle(self, events: List[DomainEvent]) -> bool:
+        futures = self.bus.executor.submit_all([(handler, (events,)) for handler in self.handlers])
+        if futures is None:
+            return False
+        wait(futures)
+        failed = [future.exception() for future in futures if future.exception() is not None]
+        for error in failed:
+            print(f"Error processing messages: {error}")
+        return not failed
+
+    def owned_lanes(self) -> List[int]:
+        return sorted(self._owned)
+
+    def close(self):
+        self._stop.set()
+        self._coordinator.join()
+        for lane in list(self._owned):
+            self._release(lane)
+        fcntl.flock(self._member_fd, fcntl.LOCK_UN)
+        os.close(self._member_fd)
+        try:
+            os.unlink(self._member_path)
+        except FileNotFoundError:
+            pass
+
+
+class LocalLogEventBus(EventBus):
+    """EventBus backed by append-only memory-mapped log files on local disk
+
+    A broker-free stand-in for PulsarEventBus: every event type is a topic
+    directory under `path`, shared by all processes on the machine. Events are
+    encoded with `codec` and keyed by `message_key` as in PulsarEventBus.
+    Subscriptions are named "<client_id>-<EventType>" and keep their offsets on
+    disk, so a restarted service resumes where it stopped. consumer_types
+    selects, per event type name or "default", how replicas of a service share
+    a subscription: "shared" and "key_shared" spread records over `lanes` lanes
+    (by offset or by key), "failover" and "exclusive" deliver everything to
+    one consumer at a time. New subscriptions start at `initial_position`,
+    "earliest" or "latest".
+    """
+
+    def __init__(self, path: str, client_id: str = None, codec="json", message_key="partner_id",
+                 consumer_types: Dict[str, str] = None, segment_bytes: int = 64 * 1024 * 1024,
+                 lanes: int = 8, poll_interval_ms: int = 5, initial_position: str = EARLIEST,
+                 executor: BoundedExecutor = None, rebalance_interval: float = 1.0,
+                 redelivery_delay: float = 1.0):
+        if initial_position not in (EARLIEST, LATEST):
+            raise ValueError(f"Initial position must be one of {(EARLIEST, LATEST)}")
+        self.path = path
+        self.client_id = client_id or f"client-{uuid.uuid4()}"
+        self.codec: EventCodec = get_codec(codec) if isinstance(codec, str) else codec
+        self._decoders = {name: self.codec if name == self.codec.name else get_codec(name) for name in CODECS}
+        self.message_key = message_key
+        self.consumer_types = consumer_types or {}
+        self.segment_bytes = segment_bytes
+        self.lanes = lanes
+        self.poll_interval = poll_interval_ms / 1000.0
+        self.initial_position = initial_position
+        self.rebalance_interval = rebalance_interval
+        self.redelivery_delay = redelivery_delay
+        self.executor = executor or executor_from_env(f"{self.client_id}-dispatch")
+        self.event_type_mapping: Dict[str, Type[DomainEvent]] = {}
+        self.logs: Dict[str, TopicLog] = {}
+        self.subscriptions: Dict[str, _LogSubscription] = {}
+        self._handlers: Dict[str, List[Callable]] = {}
+        self._per_event_topics = set()
+        self._logs_lock = threading.Lock()
+        self._closed = False
+
+    def _log(self, event_type_name: str) -> TopicLog:
+        log = self.logs.get(event_type_name)
+        if log is None:
+            with self._logs_lock:
+                log = self.logs.get(event_type_name)
+                if log is None:
+                    log = TopicLog(os.path.join(self.path, event_type_name, "log"), self.segment_bytes)
+                    self.logs[event_type_name] = log
+        return log
+
+    def _message_key(self, event) -> Optional[str]:
+        if self.message_key is None:
+            return None
+        key = self.message_key(event) if callable(self.message_key) else getattr(event, self.message_key, None)
+        return None if key is None else str(key)
+
+    def _decode_record(self, record: Record) -> Optional[DomainEvent]:
+        codec = self._decoders.get(record.codec)
+        if codec is None:
+            raise ValueError(f"Unknown event codec {record.codec}")
+        return codec.decode(record.data, self.event_type_mapping)
+
+    @timed(PUBLISH_SECONDS.labels("local_log", "publish"))
+    def publish(self, event: DomainEvent):
+        """Append an event to its topic log"""
+        self.publish_batch([event])
+
+    @timed(PUBLISH_SECONDS.labels("local_log", "publish_batch"))
+    def publish_batch(self, events: List[DomainEvent]):
+        """Append several events, taking each topic's append lock once"""
+        entries_by_type: Dict[str, List[Tuple[str, Optional[str], bytes]]] = {}
+        for event in events:
+            # Event types without a binary schema still go out as JSON
+            codec = self.codec if self.codec.can_encode(event) else JSON_CODEC
+            entries_by_type.setdefault(type(event).__name__, []).append(
+                (codec.name, self._message_key(event), codec.encode(event))
+            )
+        for event_type_name, entries in entries_by_type.items():
+            self._log(event_type_name).append(entries)
+
+    def _consumer_type(self, event_type, consumer_type=None) -> str:
+        if consumer_type is None:
+            consumer_type = self.consumer_types.get(event_type.__name__, self.consumer_types.get("default", SHARED))
+        consumer_type = consumer_type.lower()
+        if consumer_type not in LOCAL_CONSUMER_TYPES:
+            raise ValueError(f"Consumer type must be one of {LOCAL_CONSUMER_TYPES}")
+        return consumer_type
+
+    def subscribe(self, event_type: Type[DomainEvent], handler: Callable[[DomainEvent], Any], consumer_type=None):
+        """Subscribe a handler to a specific event type, called once per event in log order"""
+        topic = event_type.__name__
+        if topic in self._handlers and topic not in self._per_event_topics:
+            raise ValueError(f"Topic {topic} already has batch handlers")
+        self._per_event_topics.add(topic)
+        handler = timed(HANDLER_SECONDS.labels(topic))(handler)
+
+        def handle_each(events):
+            for event in events:
+                handler(event)
+
+        self._subscribe(event_type, handle_each, consumer_type, max_messages=100, max_bytes=1024 * 1024, timeout_ms=0)
+
+    def subscribe_batch(self, event_type: Type[DomainEvent], handler: Callable[[List[DomainEvent]], Any],
+                        max_messages: int = 100, max_bytes: int = 1024 * 1024, timeout_ms: int = 100,
+                        consumer_type=None, in_order: bool = False):
+        """Subscribe a handler that receives lists of up to max_messages events (or max_bytes)
+
+        A batch is handed over once it is full or timeout_ms after its first event
+        was read. Batch and per-event handlers cannot be mixed on one topic since
+        they share the subscription. in_order spreads a "shared" subscription over
+        its lanes by key, like "key_shared", so the events of a key stay in order.
+        """
+        if event_type.__name__ in self._per_event_topics:
+            raise ValueError(f"Topic {event_type.__name__} already has per-event handlers")
+        handler = timed(HANDLER_SECONDS.labels(event_type.__name__))(handler)
+        self._subscribe(event_type, handler, consumer_type, max_messages, max_bytes, timeout_ms, in_order)
+
+    def _subscribe(self, event_type, handler, consumer_type, max_messages, max_bytes, timeout_ms, in_order=False):
+        topic = event_type.__name__
+        self.event_type_mapping[topic] = event_type
+        if topic not in self._handlers:
+            # Register the handler before the lanes start reading
+            self._handlers[topic] = [handler]
+            subscription_name = f"{self.client_id}-{topic}"
+            self.subscriptions[topic] = _LogSubscription(
+                self,
+                self._log(topic),
+                os.path.join(self.path, topic, "subscriptions", subscription_name),
+                self._consumer_type(event_type, consumer_type),
+                self._handlers[topic],
+                max_messages,
+                max_bytes,
+                timeout_ms,
+                topic,
+                in_order
+            )
+        else:
+            self._handlers[topic].append(handler)
+
+    def flush(self, timeout=None):
+        """Write every mapped segment back to disk"""
+        for log in list(self.logs.values()):
+            log.flush()
+        return True
+
+    def close(self):
+        """Stop the subscriptions after their current batch, then let handlers finish and unmap the logs"""
+        if self._closed:
+            return
+        self._closed = True
+        for subscription in self.subscriptions.values():
+            subscription.close()
+        self.executor.shutdown(wait=True)
+        for log in self.logs.values():
+            log.close()
+
+
+def local_log_options_from_env() -> Dict[str, Any]:
+    """Read the LocalLogEventBus options from environment variables"""
+    return {
+        "segment_bytes": int(os.environ.get('EVENT_LOG_SEGMENT_BYTES', 64 * 1024 * 1024)),
+        "lanes": int(os.environ.get('EVENT_LOG_LANES', 8)),
+        "poll_interval_ms": int(os.environ.get('EVENT_LOG_POLL_INTERVAL_MS', 5)),
+        "initial_position": os.environ.get('EVENT_LOG_INITIAL_POSITION', EARLIEST).lower(),
+    }
@@ -0,0 +1,370 @@
+# infrastructure/metrics.py
+"""Counters, gauges and latency histograms exposed in the Prometheus text format
+
+Every metric is created once, at import, and each labelled series is resolved
+once by the code that updates it (labels() is a dict lookup, not free), so
+recording a value only takes a lock and a few additions.
+"""
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from inspect import isgeneratorfunction
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds in seconds, from half a millisecond to ten seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        if value == float("inf"):
+            return "+Inf"
+        return repr(value)
+    return str(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _CounterValue:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeValue:
+    __slots__ = ("_lock", "value", "function")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+        self.function: Optional[Callable[[], Any]] = None
+
+    def set(self, value):
+        with self._lock:
+            self.value = value
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self.value -= amount
+
+    def set_function(self, function: Callable[[], Any]):
+        """Read the value from function() at scrape time instead, at no cost on the hot path"""
+        self.function = function
+
+    def get(self):
+        return self.function() if self.function is not None else self.value
+
+
+class _HistogramValue:
+    __slots__ = ("_lock", "_bounds", "_counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._lock = threading.Lock()
+        self._bounds = bounds
+        # One count per bucket plus +Inf, not cumulative until rendered
+        self._counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        index = bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> Tuple[list, float, int]:
+        with self._lock:
+            return list(self._counts), self.sum, self.count
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Series for the label values; resolve it once and keep it rather than per call"""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _series(self):
+        with self._lock:
+            return sorted(self._children.items())
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self._series():
+            lines.extend(self._render_child(values, child))
+        return "\n".join(lines)
+
+    def _render_child(self, values, child):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic count, e.g. of messages received"""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterValue()
+
+    def inc(self, amount=1):
+        self._children[()].inc(amount)
+
+    def _render_child(self, values, child):
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, set directly or read from a function at scrape time"""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeValue()
+
+    def set(self, value):
+        self._children[()].set(value)
+
+    def set_function(self, function: Callable[[], Any]):
+        self._children[()].set_function(function)
+
+    def _render_child(self, values, child):
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.get())}"]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values, in seconds for latencies, over fixed buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self._children[()].observe(value)
+
+    def _render_child(self, values, child):
+        counts, total, count = child.snapshot()
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.labelnames, values, f'le="{_format_value(float(bound))}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Set of metrics rendered together by /metrics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+REPOSITORY_SECONDS = Histogram(
+    "ingestion_repository_seconds", "Duration of SQLAlchemyDataRepository calls", ("method",)
+)
+PUBLISH_SECONDS = Histogram(
+    "ingestion_event_publish_seconds", "Duration of EventBus publish and publish_batch calls", ("bus", "operation")
+)
+HANDLER_SECONDS = Histogram(
+    "ingestion_event_handler_seconds", "Duration of event handler calls", ("topic",)
+)
+MESSAGES_RECEIVED = Counter(
+    "ingestion_messages_received_total", "Messages received by the event bus consumers", ("topic",)
+)
+MESSAGES_ACKED = Counter(
+    "ingestion_messages_acked_total", "Messages acknowledged after their handlers succeeded", ("topic",)
+)
+MESSAGES_NACKED = Counter(
+    "ingestion_messages_nacked_total", "Messages negatively acknowledged, to be redelivered", ("topic",)
+)
+DISPATCH_QUEUE_DEPTH = Gauge(
+    "ingestion_dispatch_queue_depth", "Handler tasks waiting for a worker of the dispatch executor", ("executor",)
+)
+DISPATCH_ACTIVE_WORKERS = Gauge(
+    "ingestion_dispatch_active_workers", "Handler tasks running on the dispatch executor", ("executor",)
+)
+DISPATCH_OVERFLOW = Counter(
+    "ingestion_dispatch_overflow_total",
+    "Handler tasks the dispatch executor dropped or ran on the calling thread instead of a worker", ("executor", "outcome")
+)
+PROCESSING_IN_FLIGHT = Gauge(
+    "ingestion_processing_in_flight", "Tasks queued or running on the partitioned processing executor", ("executor",)
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "ingestion_db_pool_checkout_seconds",
+    "Time to get a connection from the pool, including waiting for a free one or opening it", ("database",)
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "ingestion_db_pool_checked_out", "Connections currently checked out of the pool", ("database",)
+)
+
+
+def timed(histogram) -> Callable[[Callable], Callable]:
+    """Decorator observing the duration of each call in a histogram series
+
+    For generator functions only the time spent producing items is observed,
+    not the time the caller spends between them.
+    """
+    observe = histogram.observe
+    perf_counter = time.perf_counter
+
+    def decorate(fn):
+        if isgeneratorfunction(fn):
+            @wraps(fn)
+            def timed_generator(*args, **kwargs):
+                generator = fn(*args, **kwargs)
+                elapsed = 0.0
+                try:
+                    while True:
+                        started = perf_counter()
+                        try:
+                            item = next(generator)
+                        except StopIteration:
+                            return
+                        finally:
+                            elapsed += perf_counter() - started
+                        yield item
+                finally:
+                    generator.close()
+                    observe(elapsed)
+            return timed_generator
+
+        @wraps(fn)
+        def timed_call(*args, **kwargs):
+            started = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(perf_counter() - started)
+        return timed_call
+    return decorate
+
+
+def attribute_reader(obj, attribute: str) -> Callable[[], Any]:
+    """Function reading obj.attribute for Gauge.set_function, without keeping obj alive"""
+    reference = weakref.ref(obj)
+
+    def read():
+        target = reference()
+        return getattr(target, attribute) if target is not None else 0
+    return read
+
+
+def instrument_engine(engine, database: str):
+    """Record the pool checkout time and checked-out connections of a SQLAlchemy engine
+
+    SQLAlchemy has no event before a checkout, so the pool's _do_get, which
+    waits for or opens a connection, is wrapped; the pools created by
+    engine.dispose() are wrapped as well.
+    """
+    from sqlalchemy import event
+    checked_out = DB_POOL_CHECKED_OUT.labels(database)
+    _instrument_pool(engine.pool, DB_POOL_CHECKOUT_SECONDS.labels(database))
+    # Pool event listeners are carried over to recreated pools
+    event.listen(engine, "checkout", lambda *args: checked_out.inc())
+    event.listen(engine, "checkin", lambda *args: checked_out.dec())
+
+
+def _instrument_pool(pool, checkout_seconds):
+    pool._do_get = timed(checkout_seconds)(pool._do_get)
+    recreate = pool.recreate
+
+    def instrumented_recreate():
+        return _instrument_pool(recreate(), checkout_seconds)
+    pool.recreate = instrumented_recreate
+    return pool
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serve /metrics on a daemon thread, for the services without an HTTP API"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    print(f"Serving metrics on port {server.server_port}")
+    return server
@@ -0,0 +1,153 @@
+# infrastructure/outbox.py
+import threading
+from datetime import datetime
+from sqlalchemy import select, update
+from domain.seedwork import EventBus
+from .database import OutboxModel, SessionLocal
+from .codecs import JSON_CODEC
+from typing import Optional, Tuple
+
+# Events failing one after another before the relay stops looking for one that publishes
+FAILURES_IN_A_ROW = 3
+
+
+class OutboxRelay:
+    """Background relay that drains the outbox table to an EventBus in batches
+
+    Rows are read in creation order, published with EventBus.publish_batch and
+    then marked as sent. Delivery is at-least-once: if the process dies after
+    publishing but before marking, the batch is published again on restart.
+    An event that keeps failing while the events after it publish fine is
+    dead-lettered after max_attempts; when nothing can be published, as in a
+    broker outage, the relay backs off without counting attempts. Dead-lettered
+    rows are requeued by clearing their failed_at.
+    """
+
+    def __init__(self, event_bus: EventBus, session_factory=SessionLocal, batch_size: int = 500,
+                 poll_interval: float = 0.1, max_backoff: float = 30.0, max_attempts: int = 10):
+        self.event_bus = event_bus
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start relaying in a background thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="outbox-relay", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background thread after its current batch"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def relay_once(self) -> int:
+        """Publish one batch of pending events and return how many were sent
+
+        A batch that fails is split in halves to publish everything before the
+        failing event, then the events after it are tried, skipping up to
+        FAILURES_IN_A_ROW failing ones. A failure is only put down to the event
+        itself when a later event goes out: its attempts are counted and, after
+        max_attempts, it is moved to the dead letters (failed_at set) so it no
+        longer blocks the rows behind it; held back events are thus published
+        after later ones. When nothing after a failure can be published the bus
+        is assumed down, no attempt is counted, and if nothing was sent at all
+        the error is raised so the relay backs off. Rows whose event type is
+        unknown are dead-lettered right away.
+        """
+        with self.session_factory() as session:
+            query = (
+                select(OutboxModel)
+                .where(OutboxModel.sent_at.is_(None), OutboxModel.failed_at.is_(None))
+                .order_by(OutboxModel.created_at)
+                .limit(self.batch_size)
+            )
+            if session.get_bind().dialect.name == "postgresql":
+                # Let several relays share the table without sending the same rows
+                query = query.with_for_update(skip_locked=True)
+            rows = session.scalars(query).all()
+            if not rows:
+                return 0
+
+            pending = []
+            for row in rows:
+                event = JSON_CODEC.decode(row.data)
+                if event is None:
+                    self._dead_letter(row, f"Unknown event type {row.event_type}")
+                else:
+                    pending.append((row, event))
+
+            sent_rows = []
+            # Failures followed by a published event are the events' own, the others may be an outage
+            attributed = []
+            unproven = []
+            while pending:
+                sent, error = self._publish(pending)
+                if sent:
+                    sent_rows.extend(row for row, _ in pending[:sent])
+                    attributed.extend(unproven)
+                    unproven = []
+                if error is None:
+                    break
+                unproven.append((pending[sent][0], error))
+                if len(unproven) >= FAILURES_IN_A_ROW:
+                    break
+                pending = pending[sent + 1:]
+
+            if sent_rows:
+                session.execute(
+                    update(OutboxModel)
+                    .where(OutboxModel.id.in_([row.id for row in sent_rows]))
+                    .values(sent_at=datetime.utcnow())
+                )
+            for failed_row, error in attributed:
+                failed_row.attempts = (failed_row.attempts or 0) + 1
+                failed_row.last_error = str(error)
+                if failed_row.attempts >= self.max_attempts:
+                    self._dead_letter(failed_row, str(error))
+            session.commit()
+            if unproven and not sent_rows:
+                raise unproven[-1][1]
+            return len(sent_rows)
+
+    def _publish(self, pending) -> Tuple[int, Optional[Exception]]:
+        """Publish (row, event) pairs in order, returning how many were published and the error that stopped it"""
+        try:
+            self.event_bus.publish_batch([event for _, event in pending])
+            return len(pending), None
+        except Exception as e:
+            if len(pending) <= 1:
+                return 0, e
+        middle = len(pending) // 2
+        sent, error = self._publish(pending[:middle])
+        if error is None:
+            rest, error = self._publish(pending[middle:])
+            sent += rest
+        return sent, error
+
+    @staticmethod
+    def _dead_letter(row: OutboxModel, reason: str):
+        print(f"Moving outbox event {row.id} ({row.event_type}) to the dead letters: {reason}")
+        row.failed_at = datetime.utcnow()
+        row.last_error = reason
+
+    def _run(self):
+        backoff = self.poll_interval
+        while not self._stop.is_set():
+            try:
+                sent = self.relay_once()
+                backoff = self.poll_interval
+            except Exception as e:
+                print(f"Error relaying outbox events: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+            # A full batch means more rows are probably waiting
+            if sent < self.batch_size:
+                self._stop.wait(self.poll_interval)
@@ -0,0 +1,126 @@
+# infrastructure/processing.py
+import os
+import queue
+import threading
+import zlib
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List
+from .metrics import PROCESSING_IN_FLIGHT, attribute_reader
+
+THREAD = "thread"
+PROCESS = "process"
+POOL_MODES = (THREAD, PROCESS)
+
+_STOP = object()
+
+
+def lane_for(key: str, lanes: int) -> int:
+    """Lane of a key; stable across processes, unlike hash() on str"""
+    return zlib.crc32(key.encode('utf-8')) % lanes
+
+
+class PartitionedExecutor:
+    """Runs tasks in parallel across keys and strictly in order within a key
+
+    Tasks are routed by key (the partner ID) to one of `workers` lanes, each
+    served by a single thread, so tasks of one key run one after another in
+    submission order while different lanes run concurrently. In "thread" mode a
+    lane runs its tasks itself; in "process" mode it hands each one to a
+    process pool of the same size, for CPU-bound steps, and waits for it before
+    starting the next. At most max_in_flight tasks may be queued or running,
+    submit() blocks beyond that. Keys sharing a lane also share its order.
+    """
+
+    def __init__(self, workers: int = 8, max_in_flight: int = 1000, mode: str = THREAD,
+                 name: str = "processing"):
+        if mode not in POOL_MODES:
+            raise ValueError(f"Processing pool mode must be one of {POOL_MODES}")
+        self.workers = workers
+        self.max_in_flight = max_in_flight
+        self.mode = mode
+        self._pool = ProcessPoolExecutor(max_workers=workers) if mode == PROCESS else None
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._shutdown = False
+        PROCESSING_IN_FLIGHT.labels(name).set_function(attribute_reader(self, "_in_flight"))
+        self._queues: List[queue.Queue] = [queue.Queue() for _ in range(workers)]
+        self._lanes = [
+            threading.Thread(target=self._run_lane, args=(lane_queue,), name=f"{name}-lane-{index}", daemon=True)
+            for index, lane_queue in enumerate(self._queues)
+        ]
+        for lane in self._lanes:
+            lane.start()
+
+    def submit(self, key: str, fn: Callable, *args) -> Future:
+        """Schedule fn(*args) after every task already submitted for key"""
+        self._slots.acquire()
+        with self._lock:
+            if self._shutdown:
+                self._slots.release()
+                raise RuntimeError("Cannot submit tasks after shutdown")
+            self._in_flight += 1
+        future = Future()
+        self._queues[lane_for(key, self.workers)].put((future, fn, args))
+        return future
+
+    def _run_lane(self, lane_queue: queue.Queue):
+        while True:
+            task = lane_queue.get()
+            if task is _STOP:
+                return
+            future, fn, args = task
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        result = self._pool.submit(fn, *args).result() if self._pool else fn(*args)
+                    except BaseException as e:
+                        future.set_exception(e)
+                    else:
+                        future.set_result(result)
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+                    if future.cancelled() or future.exception() is not None:
+                        self._failed += 1
+                    else:
+                        self._completed += 1
+                self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "workers": self.workers,
+                "in_flight": self._in_flight,
+                "max_in_flight": self.max_in_flight,
+                "lane_depths": [lane_queue.qsize() for lane_queue in self._queues],
+                "completed": self._completed,
+                "failed": self._failed,
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting tasks and let the lanes finish the ones already submitted"""
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+        for lane_queue in self._queues:
+            lane_queue.put(_STOP)
+        if wait:
+            for lane in self._lanes:
+                lane.join()
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+
+
+def processing_executor_from_env(name: str = "processing") -> PartitionedExecutor:
+    """Build the processing executor from the PROCESSING_* environment variables"""
+    return PartitionedExecutor(
+        workers=int(os.environ.get('PROCESSING_WORKERS', 8)),
+        max_in_flight=int(os.environ.get('PROCESSING_MAX_IN_FLIGHT', 1000)),
+        mode=os.environ.get('PROCESSING_POOL', THREAD).lower(),
+        name=name
+    )
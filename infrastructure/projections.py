@@ -0,0 +1,250 @@
+# infrastructure/projections.py
+import os
+from datetime import datetime
+from sqlalchemy import create_engine, Column, String, JSON, DateTime, Boolean, Index, insert, select, or_, and_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker, deferred, undefer
+from domain.entities import IngestedData, IngestedDataSummary
+from domain.value_objects import PartnerId, Payload, Timestamp
+from domain.events import DataIngested, DataProcessed, DataValidated
+from domain.repositories import DataViewRepository
+from domain.seedwork import DomainEvent
+from .metrics import instrument_engine
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# The read model lives in its own database so queries never touch the ingestion primary
+QUERY_DATABASE_URL = os.getenv("QUERY_DATABASE_URL", "sqlite:///query_model.db")
+
+ProjectionBase = declarative_base()
+
+
+class DataViewModel(ProjectionBase):
+    """Denormalized row combining ingestion, validation and processing results"""
+    __tablename__ = "data_view"
+
+    id = Column(String, primary_key=True)
+    partner_id = Column(String, index=True)
+    timestamp = Column(DateTime)
+    # Listings only need id, partner and timestamp
+    payload = deferred(Column(JSON))
+    is_valid = Column(Boolean, nullable=True)
+    validation_errors = Column(JSON, nullable=True)
+    validated_at = Column(DateTime, nullable=True)
+    processing_result = Column(JSON, nullable=True)
+    processed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_data_view_timestamp_id", "timestamp", "id"),
+        Index("ix_data_view_partner_id_timestamp", "partner_id", "timestamp"),
+    )
+
+
+def _to_datetime(value) -> Optional[datetime]:
+    """Events decoded from JSON carry ISO strings instead of datetimes"""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+class DataViewProjection:
+    """Keeps the data_view table up to date from DataIngested/DataValidated/DataProcessed
+
+    Events are applied in batches, one transaction per batch. Applying the same
+    event twice leaves the row unchanged, and events may arrive in any order:
+    a DataValidated seen before its DataIngested creates the row, which the
+    DataIngested later completes. Rows are created with an upsert and updated
+    under a row lock, so several subscriptions may apply batches concurrently.
+    Validation and processing results only replace older ones, compared by
+    the event's occurred_on.
+
+    payload_loader(ids) returns {data_id: payload} for ingested records whose
+    payload is not carried by the event (see FAT_EVENT_MAX_BYTES).
+    """
+
+    def __init__(self, payload_loader: Callable[[List[str]], Dict[str, Any]], database_url: str = QUERY_DATABASE_URL):
+        self.payload_loader = payload_loader
+        self.engine = create_engine(database_url)
+        instrument_engine(self.engine, "query")
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+    def create_tables(self):
+        ProjectionBase.metadata.create_all(bind=self.engine)
+
+    def drop_tables(self):
+        """Drop the read model, to rebuild it from scratch with create_tables and a replay"""
+        ProjectionBase.metadata.drop_all(bind=self.engine)
+
+    def apply(self, events: Iterable[DomainEvent]) -> None:
+        """Apply a batch of events in a single transaction"""
+        events = list(events)
+        if not events:
+            return
+        ids = sorted({event.data_id for event in events})
+        with self.session_factory() as session:
+            self._insert_missing_rows(session, events)
+            statement = (
+                select(DataViewModel).options(undefer(DataViewModel.payload))
+                .where(DataViewModel.id.in_(ids)).order_by(DataViewModel.id)
+            )
+            if session.get_bind().dialect.name == "postgresql":
+                # Batches touching the same rows apply one after the other
+                statement = statement.with_for_update()
+            rows = {row.id: row for row in session.scalars(statement)}
+            missing_payloads = [
+                event.data_id for event in events
+                if isinstance(event, DataIngested) and getattr(event, "payload", None) is None
+                and (event.data_id not in rows or rows[event.data_id].payload is None)
+            ]
+            payloads = self.payload_loader(missing_payloads) if missing_payloads else {}
+
+            for event in events:
+                row = rows[event.data_id]
+                occurred_on = _to_datetime(event.occurred_on)
+
+                if isinstance(event, DataIngested):
+                    if row.timestamp is None:
+                        row.timestamp = _to_datetime(event.timestamp)
+                    if row.payload is None:
+                        # Fat events carry the payload, thin ones need the loader
+                        embedded = getattr(event, "payload", None)
+                        row.payload = embedded if embedded is not None else payloads.get(event.data_id)
+                elif isinstance(event, DataValidated):
+                    if row.validated_at is None or occurred_on >= row.validated_at:
+                        row.is_valid = event.is_valid
+                        row.validation_errors = event.validation_errors
+                        row.validated_at = occurred_on
+                elif isinstance(event, DataProcessed):
+                    if row.processed_at is None or occurred_on >= row.processed_at:
+                        row.processing_result = event.result
+                        row.processed_at = occurred_on
+            session.commit()
+
+    @staticmethod
+    def _insert_missing_rows(session, events: List[DomainEvent]) -> None:
+        """Create the rows of the batch that do not exist yet
+
+        An upsert, so a row created meanwhile by a concurrent batch is left
+        alone instead of failing the whole batch with a duplicate key.
+        """
+        rows = {event.data_id: {"id": event.data_id, "partner_id": event.partner_id} for event in events}
+        # Sorted so concurrent batches take their row locks in the same order
+        rows = [rows[data_id] for data_id in sorted(rows)]
+        dialect = session.get_bind().dialect.name
+        if dialect == "postgresql":
+            statement = postgresql.insert(DataViewModel).on_conflict_do_nothing(index_elements=["id"])
+        elif dialect == "sqlite":
+            statement = sqlite.insert(DataViewModel).on_conflict_do_nothing(index_elements=["id"])
+        else:
+            existing = set(session.scalars(
+                select(DataViewModel.id).where(DataViewModel.id.in_([row["id"] for row in rows]))
+            ))
+            rows = [row for row in rows if row["id"] not in existing]
+            statement = insert(DataViewModel)
+        if rows:
+            session.execute(statement, rows)
+
+
+class ProjectionDataRepository(DataViewRepository):
+    """Read-only repository served from the data_view projection"""
+
+    def __init__(self, projection: DataViewProjection, in_chunk_size: int = 500):
+        self.session_factory = projection.session_factory
+        # Keeps IN lists of get_by_ids under the drivers' bound parameter limits
+        self.in_chunk_size = in_chunk_size
+
+    def _ingested(self, *columns):
+        # Rows created by an early DataValidated/DataProcessed are not visible until ingested
+        query = select(*columns) if columns else select(DataViewModel).options(undefer(DataViewModel.payload))
+        return query.where(DataViewModel.timestamp.is_not(None))
+    
+    def _summaries(self):
+        return self._ingested(DataViewModel.id, DataViewModel.partner_id, DataViewModel.timestamp)
+    
+    @staticmethod
+    def _keyset(query, after: Optional[Tuple[datetime, str]] = None):
+        """Order by (timestamp, id) and keep only rows after the given key"""
+        query = query.order_by(DataViewModel.timestamp, DataViewModel.id)
+        if after is not None:
+            after_timestamp, after_id = after
+            query = query.where(or_(
+                DataViewModel.timestamp > after_timestamp,
+                and_(DataViewModel.timestamp == after_timestamp, DataViewModel.id > after_id)
+            ))
+        return query
+
+    def get_by_id(self, data_id: str) -> Optional[IngestedData]:
+        with self.session_factory() as session:
+            row = session.scalars(self._ingested().where(DataViewModel.id == data_id)).first()
+            return self._to_entity(row) if row else None
+
+    def get_by_ids(self, data_ids: Iterable[str]) -> Dict[str, IngestedData]:
+        """Get several entities with one IN query per `in_chunk_size` IDs"""
+        data_ids = list(dict.fromkeys(data_ids))
+        found = {}
+        with self.session_factory() as session:
+            for start in range(0, len(data_ids), self.in_chunk_size):
+                chunk = data_ids[start:start + self.in_chunk_size]
+                for row in session.scalars(self._ingested().where(DataViewModel.id.in_(chunk))):
+                    found[row.id] = self._to_entity(row)
+        return found
+    
+    def get_view(self, data_id: str) -> Optional[Dict[str, Any]]:
+        with self.session_factory() as session:
+            row = session.scalars(self._ingested().where(DataViewModel.id == data_id)).first()
+            if row is None:
+                return None
+            return {
+                "id": row.id,
+                "partner_id": row.partner_id,
+                "timestamp": row.timestamp.isoformat(),
+                "payload": row.payload,
+                "validation": None if row.validated_at is None else {
+                    "is_valid": row.is_valid,
+                    "errors": row.validation_errors or []
+                },
+                "processing": row.processing_result
+            }
+
+    def get_all(self) -> List[IngestedData]:
+        with self.session_factory() as session:
+            return [self._to_entity(row) for row in session.scalars(self._ingested())]
+
+    def get_by_partner_id(self, partner_id: str) -> List[IngestedData]:
+        with self.session_factory() as session:
+            rows = session.scalars(self._ingested().where(DataViewModel.partner_id == partner_id))
+            return [self._to_entity(row) for row in rows]
+
+    def get_all_summaries(self) -> List[IngestedDataSummary]:
+        with self.session_factory() as session:
+            return [IngestedDataSummary(*row) for row in session.execute(self._summaries())]
+    
+    def get_summaries_by_partner_id(self, partner_id: str, start: Optional[datetime] = None,
+                                    end: Optional[datetime] = None) -> List[IngestedDataSummary]:
+        query = self._keyset(self._summaries()).where(DataViewModel.partner_id == partner_id)
+        if start is not None:
+            query = query.where(DataViewModel.timestamp >= start)
+        if end is not None:
+            query = query.where(DataViewModel.timestamp < end)
+        with self.session_factory() as session:
+            return [IngestedDataSummary(*row) for row in session.execute(query)]
+    
+    def get_summary_page(self, limit: int, after: Optional[Tuple[datetime, str]] = None) -> List[IngestedDataSummary]:
+        with self.session_factory() as session:
+            rows = session.execute(self._keyset(self._summaries(), after).limit(limit))
+            return [IngestedDataSummary(*row) for row in rows]
+    
+    def iter_summaries(self, batch_size: int = 1000) -> Iterator[IngestedDataSummary]:
+        query = self._keyset(self._summaries()).execution_options(yield_per=batch_size)
+        with self.session_factory() as session:
+            for row in session.execute(query):
+                yield IngestedDataSummary(*row)
+    
+    @staticmethod
+    def _to_entity(row: DataViewModel) -> IngestedData:
+        return IngestedData.rehydrate(
+            row.id,
+            PartnerId(row.partner_id),
+            Payload(row.payload or {}),
+            Timestamp(row.timestamp)
+        )
@@ -1,9 +1,17 @@
-from domain.entities import IngestedData
+from domain.entities import IngestedData, IngestedDataSummary
 from domain.repositories import DataRepository
 from domain.value_objects import PartnerId, Payload, Timestamp
-from .database import IngestedDataModel, SessionLocal
-from typing import List, Optional
+from .database import IngestedDataModel, OutboxModel, SessionLocal, engine
+from .event_store import SQLAlchemyEventStore
+from .serialization import serialize_event
+from .metrics import REPOSITORY_SECONDS, timed
+from sqlalchemy import insert, select, or_, and_
+from sqlalchemy.orm import undefer
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
+import csv
+import io
+import json
 
 
 class InMemoryDataRepository(DataRepository):
@@ -15,25 +23,72 @@ class InMemoryDataRepository(DataRepository):
     def add(self, data: IngestedData) -> None:
         self.data_store[data.id] = data
     
+    def add_many(self, data_list: List[IngestedData]) -> None:
+        self.data_store.update((data.id, data) for data in data_list)
+    
     def update(self, data: IngestedData) -> None:
         self.data_store[data.id] = data
     
     def get_by_id(self, data_id: str) -> Optional[IngestedData]:
         return self.data_store.get(data_id)
     
+    def get_by_ids(self, data_ids: Iterable[str]) -> Dict[str, IngestedData]:
+        return {data_id: self.data_store[data_id] for data_id in data_ids if data_id in self.data_store}
+    
     def get_all(self) -> List[IngestedData]:
         return list(self.data_store.values())
     
     def get_by_partner_id(self, partner_id: str) -> List[IngestedData]:
         return [data for data in self.data_store.values() if data.partner_id.value == partner_id]
+    
+    def get_all_summaries(self) -> List[IngestedDataSummary]:
+        return [self._to_summary(data) for data in self.data_store.values()]
+    
+    def get_summaries_by_partner_id(self, partner_id: str, start: Optional[datetime] = None,
+                                    end: Optional[datetime] = None) -> List[IngestedDataSummary]:
+        summaries = [
+            self._to_summary(data) for data in self.get_by_partner_id(partner_id)
+            if (start is None or data.timestamp.value >= start) and (end is None or data.timestamp.value < end)
+        ]
+        return sorted(summaries, key=lambda summary: (summary.timestamp, summary.id))
+    
+    def get_summary_page(self, limit: int, after: Optional[Tuple[datetime, str]] = None) -> List[IngestedDataSummary]:
+        summaries = self._ordered_summaries()
+        if after is not None:
+            summaries = [summary for summary in summaries if (summary.timestamp, summary.id) > after]
+        return summaries[:limit]
+    
+    def iter_summaries(self, batch_size: int = 1000) -> Iterator[IngestedDataSummary]:
+        return iter(self._ordered_summaries())
+    
+    def _ordered_summaries(self) -> List[IngestedDataSummary]:
+        return sorted(map(self._to_summary, self.data_store.values()), key=lambda summary: (summary.timestamp, summary.id))
+    
+    @staticmethod
+    def _to_summary(data: IngestedData) -> IngestedDataSummary:
+        return IngestedDataSummary(data.id, data.partner_id.value, data.timestamp.value)
 
 
 class SQLAlchemyDataRepository(DataRepository):
     """SQLAlchemy implementation of DataRepository"""
     
-    def __init__(self):
+    def __init__(self, copy_threshold: int = 1000, outbox: bool = False, in_chunk_size: int = 500,
+                 event_store: Optional[SQLAlchemyEventStore] = None):
         self.session_factory = SessionLocal
+        self.engine = engine
+        # COPY is only worth its setup cost for large batches on psycopg2
+        self.copy_threshold = copy_threshold
+        self.use_copy = engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2"
+        # With the outbox, pending domain events are written in the same transaction as the data
+        self.outbox = outbox
+        self.stores_events = outbox
+        # Likewise appended to the event store, when given, instead of in a separate transaction
+        self.event_store = event_store
+        self.appends_to_event_store = event_store is not None
+        # Keeps IN lists of get_by_ids under the drivers' bound parameter limits
+        self.in_chunk_size = in_chunk_size
     
+    @timed(REPOSITORY_SECONDS.labels("add"))
     def add(self, data: IngestedData) -> None:
         """Add a new IngestedData entity to the repository"""
         with self.session_factory() as session:
@@ -44,8 +99,80 @@ class SQLAlchemyDataRepository(DataRepository):
                 timestamp=data.timestamp.value
             )
             session.add(db_data)
+            self._write_events(session, [data])
+            session.commit()
+    
+    @timed(REPOSITORY_SECONDS.labels("add_many"))
+    def add_many(self, data_list: List[IngestedData]) -> None:
+        """Add several IngestedData entities in a single transaction"""
+        if not data_list:
+            return
+        rows = [self._to_row(data) for data in data_list]
+        with self.session_factory() as session:
+            if self.use_copy and len(rows) >= self.copy_threshold:
+                self._copy_rows(session, rows)
+            else:
+                # A list of parameter sets makes SQLAlchemy issue an executemany-style bulk insert
+                session.execute(insert(IngestedDataModel), rows)
+            self._write_events(session, data_list)
             session.commit()
     
+    def _write_events(self, session, data_list: List[IngestedData]) -> None:
+        """Write the pending domain events to the outbox and event store in the entities' transaction"""
+        if self.outbox:
+            session.execute(insert(OutboxModel), self._to_outbox_rows(data_list))
+        if self.event_store is not None:
+            self.event_store.append_in(session, [event for data in data_list for event in data.get_events()])
+    
+    @staticmethod
+    def _to_row(data: IngestedData) -> dict:
+        return {
+            "id": data.id,
+            "partner_id": data.partner_id.value,
+            "payload": data.payload.value,
+            "timestamp": data.timestamp.value
+        }
+    
+    @staticmethod
+    def _to_outbox_rows(data_list: List[IngestedData]) -> List[dict]:
+        return [
+            {
+                "id": event.id,
+                "event_type": type(event).__name__,
+                "data": serialize_event(event).decode('utf-8'),
+                "created_at": event.occurred_on,
+                "attempts": 0
+            }
+            for data in data_list
+            for event in data.get_events()
+        ]
+    
+    @staticmethod
+    def _copy_rows(session, rows: List[dict]) -> None:
+        """Stream rows into Postgres with COPY ... FROM STDIN (psycopg2 only), in the session's transaction"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([
+                row["id"],
+                row["partner_id"],
+                json.dumps(row["payload"]),
+                row["timestamp"].isoformat()
+            ])
+        buffer.seek(0)
+        
+        # The DBAPI connection of the session, so the COPY commits or rolls back with it
+        cursor = session.connection().connection.dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {IngestedDataModel.__tablename__} (id, partner_id, payload, timestamp) "
+                "FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+        finally:
+            cursor.close()
+    
+    @timed(REPOSITORY_SECONDS.labels("update"))
     def update(self, data: IngestedData) -> None:
         """Update an existing IngestedData entity in the repository"""
         with self.session_factory() as session:
@@ -56,46 +183,100 @@ class SQLAlchemyDataRepository(DataRepository):
                 db_data.timestamp = data.timestamp.value
                 session.commit()
     
+    @timed(REPOSITORY_SECONDS.labels("get_by_id"))
     def get_by_id(self, data_id: str) -> Optional[IngestedData]:
         """Get an IngestedData entity by its ID"""
         with self.session_factory() as session:
-            db_data = session.query(IngestedDataModel).filter(IngestedDataModel.id == data_id).first()
+            db_data = session.scalars(self._entities().where(IngestedDataModel.id == data_id)).first()
             if db_data:
-                return IngestedData.from_dict({
-                    "id": db_data.id,
-                    "partner_id": db_data.partner_id,
-                    "payload": db_data.payload,
-                    "timestamp": db_data.timestamp.isoformat()
-                })
+                return self._to_entity(db_data)
             return None
     
+    @timed(REPOSITORY_SECONDS.labels("get_by_ids"))
+    def get_by_ids(self, data_ids: Iterable[str]) -> Dict[str, IngestedData]:
+        """Get several entities with one IN query per `in_chunk_size` IDs"""
+        data_ids = list(dict.fromkeys(data_ids))
+        found = {}
+        with self.session_factory() as session:
+            for start in range(0, len(data_ids), self.in_chunk_size):
+                chunk = data_ids[start:start + self.in_chunk_size]
+                for db_data in session.scalars(self._entities().where(IngestedDataModel.id.in_(chunk))):
+                    found[db_data.id] = self._to_entity(db_data)
+        return found
+    
+    @timed(REPOSITORY_SECONDS.labels("get_all"))
     def get_all(self) -> List[IngestedData]:
         """Get all IngestedData entities"""
         with self.session_factory() as session:
-            db_data_list = session.query(IngestedDataModel).all()
-            return [
-                IngestedData.from_dict({
-                    "id": db_data.id,
-                    "partner_id": db_data.partner_id,
-                    "payload": db_data.payload,
-                    "timestamp": db_data.timestamp.isoformat()
-                })
-                for db_data in db_data_list
-            ]
+            return [self._to_entity(db_data) for db_data in session.scalars(self._entities())]
     
+    @timed(REPOSITORY_SECONDS.labels("get_by_partner_id"))
     def get_by_partner_id(self, partner_id: str) -> List[IngestedData]:
         """Get all IngestedData entities for a specific partner"""
         with self.session_factory() as session:
-            db_data_list = session.query(IngestedDataModel).filter(
-                IngestedDataModel.partner_id == partner_id
-            ).all()
-            return [
-                IngestedData.from_dict({
-                    "id": db_data.id,
-                    "partner_id": db_data.partner_id,
-                    "payload": db_data.payload,
-                    "timestamp": db_data.timestamp.isoformat()
-                })
-                for db_data in db_data_list
-            ]
-    
\ No newline at end of file
+            db_data_list = session.scalars(self._entities().where(IngestedDataModel.partner_id == partner_id))
+            return [self._to_entity(db_data) for db_data in db_data_list]
+    
+    @timed(REPOSITORY_SECONDS.labels("get_all_summaries"))
+    def get_all_summaries(self) -> List[IngestedDataSummary]:
+        """Get all summaries, reading only the id, partner_id and timestamp columns"""
+        with self.session_factory() as session:
+            return [IngestedDataSummary(*row) for row in session.execute(self._summaries())]
+    
+    @timed(REPOSITORY_SECONDS.labels("get_summaries_by_partner_id"))
+    def get_summaries_by_partner_id(self, partner_id: str, start: Optional[datetime] = None,
+                                    end: Optional[datetime] = None) -> List[IngestedDataSummary]:
+        """Get the summaries of a partner, optionally within [start, end), from the (partner_id, timestamp) index"""
+        query = self._keyset(self._summaries()).where(IngestedDataModel.partner_id == partner_id)
+        if start is not None:
+            query = query.where(IngestedDataModel.timestamp >= start)
+        if end is not None:
+            query = query.where(IngestedDataModel.timestamp < end)
+        with self.session_factory() as session:
+            return [IngestedDataSummary(*row) for row in session.execute(query)]
+    
+    @timed(REPOSITORY_SECONDS.labels("get_summary_page"))
+    def get_summary_page(self, limit: int, after: Optional[Tuple[datetime, str]] = None) -> List[IngestedDataSummary]:
+        """Get up to `limit` summaries ordered by (timestamp, id), starting after the given key"""
+        with self.session_factory() as session:
+            rows = session.execute(self._keyset(self._summaries(), after).limit(limit))
+            return [IngestedDataSummary(*row) for row in rows]
+    
+    @timed(REPOSITORY_SECONDS.labels("iter_summaries"))
+    def iter_summaries(self, batch_size: int = 1000) -> Iterator[IngestedDataSummary]:
+        """Stream all summaries in (timestamp, id) order through a server-side cursor"""
+        with self.session_factory() as session:
+            rows = session.execute(self._keyset(self._summaries()).execution_options(yield_per=batch_size))
+            for row in rows:
+                yield IngestedDataSummary(*row)
+    
+    @staticmethod
+    def _entities():
+        # The payload column is deferred on the model, load it in the same query
+        return select(IngestedDataModel).options(undefer(IngestedDataModel.payload))
+    
+    @staticmethod
+    def _summaries():
+        return select(IngestedDataModel.id, IngestedDataModel.partner_id, IngestedDataModel.timestamp)
+    
+    @staticmethod
+    def _keyset(query, after: Optional[Tuple[datetime, str]] = None):
+        """Order by (timestamp, id) and keep only rows after the given key"""
+        query = query.order_by(IngestedDataModel.timestamp, IngestedDataModel.id)
+        if after is not None:
+            after_timestamp, after_id = after
+            query = query.where(or_(
+                IngestedDataModel.timestamp > after_timestamp,
+                and_(IngestedDataModel.timestamp == after_timestamp, IngestedDataModel.id > after_id)
+            ))
+        return query
+    
+    @staticmethod
+    def _to_entity(db_data: IngestedDataModel) -> IngestedData:
+        # Build the value objects straight from the row, no isoformat/fromisoformat round trip
+        return IngestedData.rehydrate(
+            db_data.id,
+            PartnerId(db_data.partner_id),
+            Payload(db_data.payload),
+            Timestamp(db_data.timestamp)
+        )
@@ -0,0 +1,34 @@
+# infrastructure/request_params.py
+import re
+from datetime import datetime, timezone
+from typing import Optional
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+_UTC_SUFFIX = re.compile(r"[Zz]$")
+# A time of day followed by a space and an HH:MM offset
+_SPACED_OFFSET = re.compile(r"([T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?) (\d{2}:\d{2})$")
+
+
+def page_limit(value) -> int:
+    """Parse the `limit` query parameter, clamped to MAX_PAGE_SIZE"""
+    if value is None:
+        return DEFAULT_PAGE_SIZE
+    limit = int(value)
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def time_param(value) -> Optional[datetime]:
+    """Parse an ISO 8601 `from`/`to` query parameter into the naive UTC datetimes stored in the database"""
+    if value is None:
+        return None
+    # datetime.fromisoformat before Python 3.11 rejects "Z", and an unencoded "+01:00" arrives as " 01:00"
+    value = _UTC_SUFFIX.sub("+00:00", value.strip())
+    value = _SPACED_OFFSET.sub(r"\1+\2", value)
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
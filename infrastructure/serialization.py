@@ -0,0 +1,53 @@
+# infrastructure/serialization.py
+import json
+from functools import lru_cache
+from domain.seedwork import DomainEvent
+from domain.events import DataIngested, DataProcessed, DataValidated
+from typing import Dict, Optional, Tuple, Type
+
+# Event classes that can be rebuilt from their serialized form
+EVENT_TYPES: Dict[str, Type[DomainEvent]] = {
+    event_type.__name__: event_type
+    for event_type in (DataIngested, DataProcessed, DataValidated)
+}
+
+
+@lru_cache(maxsize=None)
+def event_fields(event_class: Type[DomainEvent]) -> Tuple[str, ...]:
+    """Names of the attributes of an event class, collected from the __slots__ of its hierarchy"""
+    fields = []
+    for klass in reversed(event_class.__mro__):
+        for name in klass.__dict__.get('__slots__', ()):
+            if name not in fields:
+                fields.append(name)
+    return tuple(fields)
+
+
+def serialize_event(event: DomainEvent) -> bytes:
+    """Serialize event to JSON with type information"""
+    event_dict = {name: getattr(event, name) for name in event_fields(type(event))}
+    # Add type information
+    event_dict['_event_type'] = event.__class__.__name__
+    
+    # Convert datetime objects to ISO format strings
+    for key, value in event_dict.items():
+        if hasattr(value, 'isoformat'):
+            event_dict[key] = value.isoformat()
+    
+    return json.dumps(event_dict).encode('utf-8')
+
+
+def deserialize_event(data: bytes, event_types: Dict[str, Type[DomainEvent]] = None) -> Optional[DomainEvent]:
+    """Rebuild an event from its JSON form, or return None if its type is unknown"""
+    event_data = json.loads(data.decode('utf-8') if isinstance(data, bytes) else data)
+    event_type_name = event_data.pop('_event_type', None)
+    event_class = (event_types or EVENT_TYPES).get(event_type_name)
+    if event_class is None:
+        return None
+    
+    event = event_class.__new__(event_class)
+    for name in event_fields(event_class):
+        # Fields missing from older messages are left unset rather than guessed
+        if name in event_data:
+            setattr(event, name, event_data[name])
+    return event
@@ -0,0 +1,42 @@
+# infrastructure/streaming.py
+import json
+from flask import Response, stream_with_context
+from typing import Any, Dict, Iterable, Iterator
+
+STREAM_MIMETYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+# Items serialized per chunk handed to the WSGI server
+ITEMS_PER_CHUNK = 200
+
+
+def _json_array_chunks(items: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    yield "["
+    buffer = []
+    first = True
+    for item in items:
+        buffer.append(json.dumps(item) if first else "," + json.dumps(item))
+        first = False
+        if len(buffer) >= ITEMS_PER_CHUNK:
+            yield "".join(buffer)
+            buffer = []
+    buffer.append("]")
+    yield "".join(buffer)
+
+
+def _ndjson_chunks(items: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    buffer = []
+    for item in items:
+        buffer.append(json.dumps(item) + "\n")
+        if len(buffer) >= ITEMS_PER_CHUNK:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+
+def stream_response(items: Iterable[Dict[str, Any]], stream_format: str) -> Response:
+    """Stream items as a JSON array or NDJSON without materializing the list"""
+    chunks = _ndjson_chunks(items) if stream_format == "ndjson" else _json_array_chunks(items)
+    return Response(stream_with_context(chunks), mimetype=STREAM_MIMETYPES[stream_format])
@@ -0,0 +1,29 @@
+# infrastructure/validation_rules.py
+import json
+import os
+from domain.validation import RuleEngine
+
+
+class RulesFileWatcher:
+    """Loads a RuleEngine's rule sets from a JSON file and reloads them when it changes
+
+    The file has the form {"default": {rule set}, "partners": {partner_id: {rule set}}},
+    both keys being optional.
+    """
+
+    def __init__(self, engine: RuleEngine, path: str):
+        self.engine = engine
+        self.path = path
+        self._mtime = None
+
+    def refresh(self) -> bool:
+        """Reload the file if it changed since the last call; returns whether it was reloaded"""
+        mtime = os.stat(self.path).st_mtime
+        if mtime == self._mtime:
+            return False
+        with open(self.path) as rules_file:
+            config = json.load(rules_file)
+        # update() compiles everything before replacing the rules, so a broken file changes nothing
+        self.engine.update(config.get("partners", {}), config.get("default"))
+        self._mtime = mtime
+        return True
@@ -1,29 +1,60 @@
 #!/usr/bin/env python
 # microservices/ingestion_service/main.py
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 import os
 import sys
+import atexit
 
 # Add the root directory to the path so we can import from the main project
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from application.services import DataIngestionService
 from infrastructure.repositories_impl import SQLAlchemyDataRepository
-from infrastructure.event_bus import PulsarEventBus
+from infrastructure.group_commit import GroupCommitDataRepository
+from infrastructure.outbox import OutboxRelay
+from infrastructure.event_store import SQLAlchemyEventStore
+from infrastructure.event_bus import create_event_bus
+from infrastructure.metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE
 from infrastructure.database import create_tables
+from infrastructure.batch_ingest import iter_records, ingest_records, BatchBodyError
 from domain.events import DataIngested
+from domain.ids import set_id_generator
 
 app = Flask(__name__)
 
+# Time-ordered ids by default (uuid7); uuid4 keeps the original random ids
+set_id_generator(os.environ.get('ID_GENERATOR', 'uuid7'))
+
 # Initialize database
 create_tables()
 
 # Initialize repositories and services
-data_repo = SQLAlchemyDataRepository()
+# With the outbox, /ingest only waits for the DB commit; a relay publishes the events
+outbox_enabled = os.environ.get('OUTBOX_ENABLED', 'false').lower() == 'true'
+
+# Optional append-only event store keeping every DataIngested event, written in the data's transaction
+event_store = None
+if os.environ.get('EVENT_STORE_ENABLED', 'false').lower() == 'true':
+    event_store = SQLAlchemyEventStore(snapshot_every=int(os.environ.get('EVENT_STORE_SNAPSHOT_EVERY', 100)))
+
+data_repo = SQLAlchemyDataRepository(outbox=outbox_enabled, event_store=event_store)
 
-# Initialize Pulsar event bus
-pulsar_service_url = os.environ.get('PULSAR_SERVICE_URL', 'pulsar://localhost:6650')
-event_bus = PulsarEventBus(service_url=pulsar_service_url, client_id="ingestion-service")
+# Optional group commit: concurrent /ingest requests share one transaction
+if os.environ.get('GROUP_COMMIT_ENABLED', 'false').lower() == 'true':
+    data_repo = GroupCommitDataRepository(
+        data_repo,
+        window_ms=float(os.environ.get('GROUP_COMMIT_WINDOW_MS', 2)),
+        max_batch_size=int(os.environ.get('GROUP_COMMIT_MAX_BATCH', 500))
+    )
+
+# Pulsar event bus, or the local log event bus when EVENT_LOG_DIR is set
+event_bus = create_event_bus("ingestion-service")
+
+# On exit (atexit runs in reverse order): the outbox relay stops, the group commit writer
+# commits what is still queued, then the event bus drains its pending asynchronous sends
+atexit.register(event_bus.close)
+if isinstance(data_repo, GroupCommitDataRepository):
+    atexit.register(data_repo.close)
 
 def log_data_ingested(event):
     print(f"Event received: DataIngested - ID: {event.data_id}, Partner: {event.partner_id}")
@@ -31,8 +62,25 @@ def log_data_ingested(event):
 # Subscribe to events (for local testing/debugging)
 event_bus.subscribe(DataIngested, log_data_ingested)
 
-# Initialize services
-data_service = DataIngestionService(data_repo, event_bus)
+if outbox_enabled:
+    outbox_relay = OutboxRelay(
+        event_bus,
+        batch_size=int(os.environ.get('OUTBOX_BATCH_SIZE', 500)),
+        poll_interval=float(os.environ.get('OUTBOX_POLL_INTERVAL_MS', 100)) / 1000.0,
+        max_attempts=int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 10))
+    )
+    outbox_relay.start()
+    atexit.register(outbox_relay.stop)
+
+# Initialize services; payloads up to FAT_EVENT_MAX_BYTES are embedded in DataIngested
+data_service = DataIngestionService(
+    data_repo, event_bus, fat_event_max_bytes=int(os.environ.get('FAT_EVENT_MAX_BYTES', 0))
+)
+
+# Number of records written and published together by /ingest/batch
+batch_chunk_size = int(os.environ.get('INGEST_BATCH_CHUNK_SIZE', 500))
+# Largest single record accepted by /ingest/batch, so one record cannot exhaust memory
+max_record_bytes = int(os.environ.get('INGEST_MAX_RECORD_BYTES', 1024 * 1024))
 
 @app.route("/ingest", methods=["POST"])
 def ingest():
@@ -50,6 +98,27 @@ def ingest():
         "timestamp": data.timestamp.value.isoformat()
     }), 201
 
+@app.route("/ingest/batch", methods=["POST"])
+def ingest_batch():
+    """Endpoint to ingest a JSON array or an NDJSON stream of records"""
+    try:
+        results = ingest_records(data_service, iter_records(request.stream, request.mimetype, max_record_bytes),
+                                 chunk_size=batch_chunk_size)
+    except BatchBodyError as e:
+        return jsonify({"error": str(e)}), 400
+
+    rejected = sum(1 for result in results if "error" in result)
+    return jsonify({
+        "accepted": len(results) - rejected,
+        "rejected": rejected,
+        "results": results
+    }), 201 if rejected == 0 else 207
+
+@app.route("/metrics")
+def metrics():
+    """Prometheus metrics of this process"""
+    return Response(REGISTRY.render(), content_type=METRICS_CONTENT_TYPE)
+
 @app.route("/")
 def index():
     """Root endpoint"""
@@ -5,13 +5,19 @@ import sys
 import time
 import signal
 import threading
+from collections import OrderedDict
 
 # Add the root directory to the path so we can import from the main project
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from infrastructure.event_bus import PulsarEventBus
+from infrastructure.event_bus import create_event_bus, batch_policy_from_env
+from infrastructure.metrics import start_metrics_server
 from domain.events import DataIngested, DataProcessed
+from domain.ids import derived_id, set_id_generator
 from infrastructure.repositories_impl import SQLAlchemyDataRepository
+from infrastructure.event_store import SQLAlchemyEventStore
+from infrastructure.processing import processing_executor_from_env
+from application.processing import process_data
 
 # Flag to control the main loop
 running = True
@@ -26,54 +32,111 @@ def signal_handler(sig, frame):
 signal.signal(signal.SIGINT, signal_handler)
 signal.signal(signal.SIGTERM, signal_handler)
 
-def process_data(data_id, partner_id, timestamp):
-    """
-    Simulate data processing
-    In a real application, this would perform actual processing on the data
-    """
-    print(f"Processing data: {data_id} from partner {partner_id}")
-    
-    # Simulate processing time
-    time.sleep(2)
-    
-    # Return a simulated result
-    return {
-        "processed": True,
-        "data_id": data_id,
-        "partner_id": partner_id,
-        "processing_timestamp": time.time(),
-        "result": f"Processed data {data_id} successfully"
-    }
-
 def main():
     """Main function for the processing service"""
     print("Starting data processing service...")
     
-    # Initialize repository to access data if needed
+    # Ids of the published events, time-ordered by default
+    set_id_generator(os.environ.get('ID_GENERATOR', 'uuid7'))
+    
+    # No HTTP API here, so /metrics is served on its own port when METRICS_PORT is set
+    metrics_port = os.environ.get('METRICS_PORT')
+    if metrics_port:
+        start_metrics_server(int(metrics_port))
+    
+    # Repository to read payloads that did not fit in the DataIngested event
     data_repo = SQLAlchemyDataRepository()
     
-    # Initialize Pulsar event bus
-    pulsar_service_url = os.environ.get('PULSAR_SERVICE_URL', 'pulsar://localhost:6650')
-    event_bus = PulsarEventBus(service_url=pulsar_service_url, client_id="processing-service")
+    def load_payloads(events):
+        """Payload of each event, fetching those not carried by the events with one query"""
+        missing = [event.data_id for event in events if event.payload is None]
+        stored = data_repo.get_by_ids(missing) if missing else {}
+        return [
+            event.payload if event.payload is not None
+            else (stored[event.data_id].payload.value if event.data_id in stored else None)
+            for event in events
+        ]
+    
+    # Optional append-only event store keeping every DataProcessed event
+    event_store = None
+    if os.environ.get('EVENT_STORE_ENABLED', 'false').lower() == 'true':
+        event_store = SQLAlchemyEventStore(snapshot_every=int(os.environ.get('EVENT_STORE_SNAPSHOT_EVERY', 100)))
     
-    # Handler for DataIngested events
-    def handle_data_ingested(event):
-        print(f"Processing service received DataIngested event - ID: {event.data_id}, Partner: {event.partner_id}")
+    # Pulsar event bus, or the local log event bus when EVENT_LOG_DIR is set
+    event_bus = create_event_bus("processing-service")
+    
+    # Events of different partners are processed in parallel, those of one partner in order
+    processing_executor = processing_executor_from_env()
+    
+    # Results of events whose batch failed on another event, so its redelivery does not process them again
+    finished = OrderedDict()
+    finished_lock = threading.Lock()
+    max_finished = processing_executor.max_in_flight
+    
+    # Handler for batches of DataIngested events
+    def handle_data_ingested_batch(events):
+        print(f"Processing service received {len(events)} DataIngested events")
+        
+        with finished_lock:
+            reused = {event.id: finished.pop(event.id) for event in events if event.id in finished}
+        pending = [event for event in events if event.id not in reused]
         
         # Process the data
-        result = process_data(event.data_id, event.partner_id, event.timestamp)
+        payloads = dict(zip((event.id for event in pending), load_payloads(pending)))
+        futures = {
+            event.id: processing_executor.submit(
+                event.partner_id, process_data, event.data_id, event.partner_id, event.timestamp, payloads[event.id]
+            )
+            for event in pending
+        }
+        
+        # Wait for every step of the batch; a failure leaves the whole batch unacknowledged
+        results = []
+        failure = None
+        failed = set()
+        for event in events:
+            if event.id in reused:
+                results.append(reused[event.id])
+                continue
+            try:
+                results.append(futures[event.id].result())
+            except Exception as e:
+                failure = failure or e
+                failed.add(event.id)
+                results.append(None)
+        if failure is not None:
+            # Keep the results that precede the first failure of their partner, so they are not
+            # processed again and the later events of that partner are, in order
+            with finished_lock:
+                seen_failed = set()
+                for event, result in zip(events, results):
+                    if event.id in failed:
+                        seen_failed.add(event.partner_id)
+                    elif event.partner_id not in seen_failed:
+                        finished[event.id] = result
+                while len(finished) > max_finished:
+                    finished.popitem(last=False)
+            raise failure
         
-        # Publish a DataProcessed event
-        processed_event = DataProcessed(
-            data_id=event.data_id,
-            partner_id=event.partner_id,
-            result=result
-        )
-        event_bus.publish(processed_event)
-        print(f"Published DataProcessed event for data ID: {event.data_id}")
+        # Publish the DataProcessed events of the whole batch together
+        processed_events = []
+        for event, result in zip(events, results):
+            processed_event = DataProcessed(
+                data_id=event.data_id,
+                partner_id=event.partner_id,
+                result=result
+            )
+            # Keyed by the DataIngested event, so the event store skips the result of a redelivery
+            processed_event.id = derived_id(event.id, "DataProcessed")
+            processed_events.append(processed_event)
+        if event_store is not None:
+            event_store.append(processed_events)
+        event_bus.publish_batch(processed_events)
+        print(f"Published {len(processed_events)} DataProcessed events")
     
-    # Subscribe to DataIngested events
-    event_bus.subscribe(DataIngested, handle_data_ingested)
+    # Subscribe to DataIngested events in batches, handled one at a time so that the events
+    # of a partner reach the processing lanes in the order they arrived
+    event_bus.subscribe_batch(DataIngested, handle_data_ingested_batch, in_order=True, **batch_policy_from_env())
     
     print("Processing service is running. Press Ctrl+C to exit.")
     
@@ -84,8 +147,11 @@ def main():
     except KeyboardInterrupt:
         pass
     finally:
-        # Clean up resources
+        # Drain: stop taking new events (their batches are negatively acknowledged and
+        # redelivered), finish the ones already accepted, then publish their results and close
+        processing_executor.shutdown(wait=True)
         event_bus.close()
+        print(f"Processing stats: {processing_executor.stats()}")
         print("Processing service has been shut down.")
 
 if __name__ == "__main__":
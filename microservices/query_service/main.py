@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 # microservices/query_service/main.py
-from flask import Flask, jsonify
+from flask import Flask, Response, request, jsonify
 import os
 import sys
 
@@ -9,60 +9,100 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')
 
 from application.services import QueryService
 from infrastructure.repositories_impl import SQLAlchemyDataRepository
-from infrastructure.event_bus import PulsarEventBus
-from domain.events import DataIngested
+from infrastructure.event_bus import create_event_bus, batch_policy_from_env
+from infrastructure.metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from infrastructure.projections import DataViewProjection, ProjectionDataRepository
+from infrastructure.cache import CachingDataRepository, cache_options_from_env
+from infrastructure.streaming import STREAM_MIMETYPES, stream_response
+from infrastructure.request_params import page_limit, time_param
+from domain.events import DataIngested, DataValidated, DataProcessed
 
 app = Flask(__name__)
 
-# Initialize repositories and services
-data_repo = SQLAlchemyDataRepository()
+# Source repository, only read to fetch payloads the events do not carry
+source_repo = SQLAlchemyDataRepository()
 
-# Initialize Pulsar event bus
-pulsar_service_url = os.environ.get('PULSAR_SERVICE_URL', 'pulsar://localhost:6650')
-event_bus = PulsarEventBus(service_url=pulsar_service_url, client_id="query-service")
+def load_payloads(data_ids):
+    return {data_id: data.payload.value for data_id, data in source_repo.get_by_ids(data_ids).items()}
+
+# Materialized read model, kept in its own database (QUERY_DATABASE_URL)
+projection = DataViewProjection(load_payloads)
+projection.create_tables()
+# Hot records are read many times right after ingestion, keep them in memory
+data_repo = CachingDataRepository(ProjectionDataRepository(projection), **cache_options_from_env())
+
+# Pulsar event bus, or the local log event bus when EVENT_LOG_DIR is set
+event_bus = create_event_bus("query-service")
 
 # Initialize services
 query_service = QueryService(data_repo)
 
-# Subscribe to events from the ingestion service
-def handle_data_ingested(event):
-    print(f"Query service received DataIngested event - ID: {event.data_id}, Partner: {event.partner_id}")
-    # You could update a cache or perform other actions when new data is ingested
+# Keep the read model up to date from the events of the other services
+def apply_events(events):
+    projection.apply(events)
+    # Only invalidate once the new rows are committed, or a stale view could be cached again
+    data_repo.invalidate_events(events)
 
-event_bus.subscribe(DataIngested, handle_data_ingested)
+batch_policy = batch_policy_from_env()
+for event_type in (DataIngested, DataValidated, DataProcessed):
+    event_bus.subscribe_batch(event_type, apply_events, **batch_policy)
 
 @app.route("/query/<data_id>", methods=["GET"])
 def get_ingested_data(data_id):
     """Endpoint to get ingested data by ID"""
-    data = query_service.get_data_by_id(data_id)
+    data = query_service.get_data_view(data_id)
     if not data:
         return jsonify({"error": "Datos no encontrados"}), 404
-    return jsonify({
-        "id": data.id,
-        "partner_id": data.partner_id.value,
-        "timestamp": data.timestamp.value.isoformat(),
-        "payload": data.payload.value
-    })
+    return jsonify(data)
 
 @app.route("/query/partner/<partner_id>", methods=["GET"])
 def get_data_by_partner(partner_id):
-    """Endpoint to get all data for a specific partner"""
-    data_list = query_service.get_data_by_partner_id(partner_id)
-    return jsonify([{
-        "id": data.id,
-        "partner_id": data.partner_id.value,
-        "timestamp": data.timestamp.value.isoformat()
-    } for data in data_list])
+    """Endpoint to get all data for a specific partner, optionally within a time range (from, to)"""
+    try:
+        start = time_param(request.args.get("from"))
+        end = time_param(request.args.get("to"))
+    except ValueError:
+        return jsonify({"error": "'from' y 'to' deben ser fechas ISO 8601"}), 400
+    summaries = query_service.get_data_summaries(partner_id, start, end)
+    return jsonify([summary.to_dict() for summary in summaries])
 
 @app.route("/query/all", methods=["GET"])
 def get_all_data():
-    """Endpoint to get all ingested data"""
-    data_list = query_service.get_all_data()
-    return jsonify([{
-        "id": data.id,
-        "partner_id": data.partner_id.value,
-        "timestamp": data.timestamp.value.isoformat()
-    } for data in data_list])
+    """Endpoint to get all ingested data, optionally paginated (limit, cursor) or streamed (stream=json|ndjson)"""
+    stream_format = request.args.get("stream")
+    if stream_format:
+        if stream_format not in STREAM_MIMETYPES:
+            return jsonify({"error": "'stream' debe ser 'json' o 'ndjson'"}), 400
+        return stream_response(
+            (summary.to_dict() for summary in query_service.stream_all_data()), stream_format
+        )
+
+    if "limit" in request.args or "cursor" in request.args:
+        try:
+            limit = page_limit(request.args.get("limit"))
+        except ValueError:
+            return jsonify({"error": "'limit' debe ser un entero positivo"}), 400
+        try:
+            summaries, next_cursor = query_service.get_data_page(limit, request.args.get("cursor"))
+        except ValueError:
+            return jsonify({"error": "Cursor inválido"}), 400
+        return jsonify({
+            "items": [summary.to_dict() for summary in summaries],
+            "next_cursor": next_cursor
+        })
+
+    summaries = query_service.get_data_summaries()
+    return jsonify([summary.to_dict() for summary in summaries])
+
+@app.route("/query/cache/stats", methods=["GET"])
+def get_cache_stats():
+    """Endpoint to get the hit/miss/eviction counters of the lookup cache"""
+    return jsonify(data_repo.stats())
+
+@app.route("/metrics")
+def metrics():
+    """Prometheus metrics of this process"""
+    return Response(REGISTRY.render(), content_type=METRICS_CONTENT_TYPE)
 
 @app.route("/")
 def index():
@@ -9,9 +9,14 @@ import json
 # Add the root directory to the path so we can import from the main project
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from infrastructure.event_bus import PulsarEventBus
+from infrastructure.event_bus import create_event_bus, batch_policy_from_env
+from infrastructure.metrics import start_metrics_server
 from domain.events import DataIngested, DataValidated
+from domain.ids import derived_id, set_id_generator
 from infrastructure.repositories_impl import SQLAlchemyDataRepository
+from infrastructure.event_store import SQLAlchemyEventStore
+from infrastructure.validation_rules import RulesFileWatcher
+from domain.validation import RuleEngine
 
 # Flag to control the main loop
 running = True
@@ -26,76 +31,98 @@ def signal_handler(sig, frame):
 signal.signal(signal.SIGINT, signal_handler)
 signal.signal(signal.SIGTERM, signal_handler)
 
-def validate_data(data_id, partner_id, data_repo):
+def validate_batch(rule_engine, events, payloads):
     """
-    Validate the data by retrieving it from the repository
-    In a real application, this would perform actual validation on the data
+    Validate the payloads of a window of events with the partners' rule sets
+    A payload is None when the data was not found in the repository
     """
-    print(f"Validating data: {data_id} from partner {partner_id}")
-    
-    # Get the data from the repository
-    data = data_repo.get_by_id(data_id)
-    if not data:
-        return False, ["Data not found in repository"]
-    
-    # Simulate validation
-    payload = data.payload.value
-    errors = []
-    
-    # Example validation rules (customize based on your data structure)
-    if isinstance(payload, dict):
-        # Check for required fields
-        if 'name' in payload and not payload['name']:
-            errors.append("Name field is required")
-        
-        # Check for data types
-        if 'age' in payload and not isinstance(payload['age'], (int, float)):
-            errors.append("Age must be a number")
-        
-        # Check for value ranges
-        if 'age' in payload and isinstance(payload['age'], (int, float)) and (payload['age'] < 0 or payload['age'] > 120):
-            errors.append("Age must be between 0 and 120")
-    else:
-        errors.append("Payload must be a JSON object")
-    
-    # Return validation result
-    is_valid = len(errors) == 0
-    return is_valid, errors
+    results = [(False, ["Data not found in repository"])] * len(events)
+    found = [index for index, payload in enumerate(payloads) if payload is not None]
+    validated = rule_engine.validate_batch((events[index].partner_id, payloads[index]) for index in found)
+    for index, result in zip(found, validated):
+        results[index] = result
+    return results
 
 def main():
     """Main function for the validation service"""
     print("Starting data validation service...")
     
-    # Initialize repository to access data
+    # Ids of the published events, time-ordered by default
+    set_id_generator(os.environ.get('ID_GENERATOR', 'uuid7'))
+    
+    # No HTTP API here, so /metrics is served on its own port when METRICS_PORT is set
+    metrics_port = os.environ.get('METRICS_PORT')
+    if metrics_port:
+        start_metrics_server(int(metrics_port))
+    
+    # Initialize repository to access data. No cache: each record is validated about once,
+    # and a remembered miss would fail records read before their insert is visible
     data_repo = SQLAlchemyDataRepository()
     
-    # Initialize Pulsar event bus
-    pulsar_service_url = os.environ.get('PULSAR_SERVICE_URL', 'pulsar://localhost:6650')
-    event_bus = PulsarEventBus(service_url=pulsar_service_url, client_id="validation-service")
+    # Per-partner rule sets from VALIDATION_RULES_PATH, the built-in rules otherwise
+    rules_path = os.environ.get('VALIDATION_RULES_PATH')
+    rule_engine = RuleEngine()
+    rules_watcher = RulesFileWatcher(rule_engine, rules_path) if rules_path else None
+    if rules_watcher is not None:
+        rules_watcher.refresh()
+    
+    # Optional append-only event store keeping every DataValidated event
+    event_store = None
+    if os.environ.get('EVENT_STORE_ENABLED', 'false').lower() == 'true':
+        event_store = SQLAlchemyEventStore(snapshot_every=int(os.environ.get('EVENT_STORE_SNAPSHOT_EVERY', 100)))
+    
+    # Pulsar event bus, or the local log event bus when EVENT_LOG_DIR is set
+    event_bus = create_event_bus("validation-service")
     
-    # Handler for DataIngested events
-    def handle_data_ingested(event):
-        print(f"Validation service received DataIngested event - ID: {event.data_id}, Partner: {event.partner_id}")
+    # Handler for batches (windows) of DataIngested events
+    def handle_data_ingested_batch(events):
+        print(f"Validation service received {len(events)} DataIngested events")
+        
+        # One query for every payload of the window that did not travel in its event
+        missing = [event.data_id for event in events if event.payload is None]
+        stored = data_repo.get_by_ids(missing) if missing else {}
+        
+        payloads = [
+            event.payload if event.payload is not None
+            else (stored[event.data_id].payload.value if event.data_id in stored else None)
+            for event in events
+        ]
+        
+        if rules_watcher is not None:
+            try:
+                rules_watcher.refresh()
+            except Exception as e:
+                print(f"Keeping previous validation rules, could not reload {rules_path}: {e}")
         
-        # Validate the data
-        is_valid, errors = validate_data(event.data_id, event.partner_id, data_repo)
+        # Validate the whole window at once
+        validated_events = []
+        for event, (is_valid, errors) in zip(events, validate_batch(rule_engine, events, payloads)):
+            validated_event = DataValidated(
+                data_id=event.data_id,
+                partner_id=event.partner_id,
+                is_valid=is_valid,
+                validation_errors=errors
+            )
+            # Keyed by the DataIngested event, so the event store skips the result of a redelivery
+            validated_event.id = derived_id(event.id, "DataValidated")
+            validated_events.append(validated_event)
+            if not is_valid:
+                print(f"Validation errors for data ID {event.data_id}: {errors}")
         
-        # Publish a DataValidated event
-        validated_event = DataValidated(
-            data_id=event.data_id,
-            partner_id=event.partner_id,
-            is_valid=is_valid,
-            validation_errors=errors
-        )
-        event_bus.publish(validated_event)
+        # Publish the DataValidated events of the whole batch together
+        if event_store is not None:
+            event_store.append(validated_events)
+        event_bus.publish_batch(validated_events)
         
-        validation_status = "valid" if is_valid else "invalid"
-        print(f"Published DataValidated event for data ID: {event.data_id} - Status: {validation_status}")
-        if not is_valid:
-            print(f"Validation errors: {errors}")
+        invalid = sum(1 for validated_event in validated_events if not validated_event.is_valid)
+        print(f"Published {len(validated_events)} DataValidated events - {invalid} invalid")
     
-    # Subscribe to DataIngested events
-    event_bus.subscribe(DataIngested, handle_data_ingested)
+    # Subscribe to DataIngested events in windows of up to VALIDATION_WINDOW_MAX_EVENTS events
+    # or VALIDATION_WINDOW_MS milliseconds, whichever comes first
+    window = batch_policy_from_env()
+    window["max_messages"] = int(os.environ.get('VALIDATION_WINDOW_MAX_EVENTS', window["max_messages"]))
+    window["timeout_ms"] = int(os.environ.get('VALIDATION_WINDOW_MS', window["timeout_ms"]))
+    event_bus.subscribe_batch(DataIngested, handle_data_ingested_batch, **window)
     
     print("Validation service is running. Press Ctrl+C to exit.")
     
@@ -0,0 +1,11 @@
+# tests/conftest.py
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# The database URLs are read when the infrastructure modules are imported
+_database_dir = tempfile.mkdtemp(prefix="ingestion-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_database_dir}/ingestion.db"
+os.environ["QUERY_DATABASE_URL"] = f"sqlite:///{_database_dir}/query_model.db"
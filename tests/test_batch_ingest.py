@@ -0,0 +1,62 @@
+# tests/test_batch_ingest.py
+import io
+
+import pytest
+
+from application.services import DataIngestionService
+from infrastructure.batch_ingest import (
+    BatchBodyError, iter_json_array, iter_ndjson, iter_records, ingest_records, RECORD_TOO_LARGE_ERROR
+)
+from infrastructure.event_bus import SimpleEventBus
+from infrastructure.repositories_impl import InMemoryDataRepository
+
+
+def parse(body: bytes, **options):
+    return [record for record, _ in iter_json_array(io.BytesIO(body), **options)]
+
+
+@pytest.mark.parametrize("body, expected", [
+    (b"[]", []),
+    (b" [1, {\"a\": 2}] \n", [1, {"a": 2}]),
+])
+def test_valid_arrays(body, expected):
+    assert parse(body) == expected
+
+
+@pytest.mark.parametrize("body", [b"[1,]", b"[,1]", b"[1] garbage", b"[1]]", b"[1 2]", b"[1"])
+def test_invalid_arrays(body):
+    with pytest.raises(BatchBodyError):
+        parse(body)
+
+
+def test_record_larger_than_the_limit_stops_parsing():
+    body = b'[1, "' + b"x" * 300000 + b'"]'
+    records = iter_json_array(io.BytesIO(body), max_record_bytes=100000)
+
+    assert next(records) == (1, None)
+    with pytest.raises(BatchBodyError, match=RECORD_TOO_LARGE_ERROR):
+        next(records)
+
+
+def test_ndjson_line_larger_than_the_limit_is_rejected():
+    body = b'{"a": 1}\n"' + b"x" * 200 + b'"\n{"a": 2}\n'
+    results = list(iter_ndjson(io.BytesIO(body), max_record_bytes=100))
+
+    assert results == [({"a": 1}, None), (None, RECORD_TOO_LARGE_ERROR), ({"a": 2}, None)]
+
+
+def test_body_invalid_partway_reports_the_unprocessed_tail():
+    repository = InMemoryDataRepository()
+    service = DataIngestionService(repository, SimpleEventBus())
+    body = b'[{"partner_id": "p1", "payload": {"n": 1}}, {"payload": {}}, {"partner_id": "p1", "payload": {"n": 3}} x'
+
+    results = ingest_records(service, iter_records(io.BytesIO(body), "application/json"), chunk_size=1)
+
+    assert [sorted(result) for result in results] == [
+        ["id", "index", "partner_id", "timestamp"],
+        ["error", "index"],
+        ["id", "index", "partner_id", "timestamp"],
+        ["error", "index", "unprocessed"],
+    ]
+    assert results[3]["index"] == 3 and results[3]["unprocessed"] is True
+    assert len(repository.get_all()) == 2
@@ -0,0 +1,115 @@
+# tests/test_cache.py
+import pytest
+
+import infrastructure.cache
+from domain.events import DataValidated
+from infrastructure.cache import CachingDataRepository, LRUCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(infrastructure.cache, "time", clock)
+    return clock
+
+
+class CountingRepository:
+    """Read repository returning the ids it is asked for, except those in `missing`"""
+
+    def __init__(self, missing=()):
+        self.missing = set(missing)
+        self.loads = []
+        self.on_load = None
+
+    def get_by_id(self, data_id):
+        self.loads.append(data_id)
+        if self.on_load is not None:
+            self.on_load(data_id)
+        return None if data_id in self.missing else {"id": data_id, "version": len(self.loads)}
+
+    def get_by_ids(self, data_ids):
+        self.loads.extend(data_ids)
+        return {data_id: {"id": data_id} for data_id in data_ids if data_id not in self.missing}
+
+
+def test_entries_expire_after_their_ttl(clock):
+    cache = LRUCache(max_size=10, ttl=60, negative_ttl=5)
+    cache.put("a", 1)
+    cache.put("b", None)
+
+    clock.now += 5
+    assert cache.get("a") == 1
+    assert cache.get("b") is infrastructure.cache._MISSING
+
+    clock.now += 55
+    assert cache.get("a") is infrastructure.cache._MISSING
+    assert cache.stats()["expirations"] == 2
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = LRUCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is infrastructure.cache._MISSING
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_missing_record_is_remembered_for_the_negative_ttl(clock):
+    source = CountingRepository(missing={"gone"})
+    repository = CachingDataRepository(source, ttl=60, negative_ttl=5)
+
+    assert repository.get_by_id("gone") is None
+    assert repository.get_by_id("gone") is None
+    assert source.loads == ["gone"]
+
+    clock.now += 6
+    assert repository.get_by_id("gone") is None
+    assert source.loads == ["gone", "gone"]
+
+
+def test_get_by_ids_only_loads_uncached_ids(clock):
+    source = CountingRepository(missing={"gone"})
+    repository = CachingDataRepository(source)
+    repository.get_by_id("a")
+
+    found = repository.get_by_ids(["a", "b", "gone", "b"])
+
+    assert sorted(found) == ["a", "b"]
+    assert source.loads == ["a", "b", "gone"]
+    assert repository.get_by_ids(["b", "gone"]) == {"b": {"id": "b"}}
+    assert source.loads == ["a", "b", "gone"]
+
+
+def test_events_invalidate_cached_records(clock):
+    source = CountingRepository()
+    repository = CachingDataRepository(source)
+    repository.get_by_id("a")
+
+    repository.invalidate_events([DataValidated("a", "partner-1", True)])
+
+    assert repository.get_by_id("a")["version"] == 2
+
+
+def test_value_loaded_before_an_invalidation_is_not_cached(clock):
+    source = CountingRepository()
+    repository = CachingDataRepository(source)
+    # The record changes while its old version is being read
+    source.on_load = lambda data_id: repository.invalidate([data_id])
+
+    assert repository.get_by_id("a")["version"] == 1
+    source.on_load = None
+
+    assert repository.get_by_id("a")["version"] == 2
+    assert repository.get_by_id("a")["version"] == 2
@@ -0,0 +1,99 @@
+# tests/test_codecs.py
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from domain import events
+from domain.events import DataIngested, DataProcessed, DataValidated
+from infrastructure.codecs import BOOL, EVENT_SCHEMAS, STRING, BinaryCodec, JsonCodec, get_codec
+
+
+def fields(event):
+    return {name: getattr(event, name) for name, *_ in EVENT_SCHEMAS[type(event).__name__][1]}
+
+
+def sample_events():
+    return [
+        DataIngested("data-1", "partner-1", datetime(2024, 1, 1, 12, 30, 0, 123456), {"name": "Ann", "age": 30}),
+        DataValidated("data-1", "partner-1", False, ["Name field is required"]),
+        DataProcessed("data-1", "partner-1", {"processed": True, "field_count": 2}),
+    ]
+
+
+@pytest.mark.parametrize("codec", [JsonCodec(), BinaryCodec()], ids=["json", "binary"])
+@pytest.mark.parametrize("event", sample_events(), ids=lambda event: type(event).__name__)
+def test_round_trip(codec, event):
+    decoded = codec.decode(codec.encode(event))
+
+    assert type(decoded) is type(event)
+    assert fields(decoded) == fields(event)
+
+
+@pytest.mark.parametrize("event", sample_events(), ids=lambda event: type(event).__name__)
+def test_large_bodies_are_compressed(event):
+    codec = BinaryCodec(compress_threshold=0)
+    encoded = codec.encode(event)
+
+    assert encoded[1] & BinaryCodec.FLAG_ZLIB
+    assert fields(codec.decode(encoded)) == fields(event)
+
+
+def test_none_fields_round_trip():
+    event = DataIngested("data-1", "partner-1", None, None)
+    validated = DataValidated("data-1", None, None)
+    codec = BinaryCodec()
+
+    assert fields(codec.decode(codec.encode(event))) == fields(event)
+    assert fields(codec.decode(codec.encode(validated))) == fields(validated)
+
+
+def test_aware_datetimes_are_written_in_utc():
+    event = DataIngested("data-1", "partner-1", datetime(2024, 1, 1, 14, 0, tzinfo=timezone(timedelta(hours=2))))
+    codec = BinaryCodec()
+
+    assert codec.decode(codec.encode(event)).timestamp == datetime(2024, 1, 1, 12, 0)
+
+
+# The next version of DataValidated, with a field appended
+DataValidatedWithSource = type("DataValidated", (DataValidated,), {"__slots__": ("source",)})
+
+
+def test_appended_field_is_read_by_both_versions():
+    old_codec = BinaryCodec()
+    version, old_fields = EVENT_SCHEMAS["DataValidated"]
+    new_codec = BinaryCodec(schemas={"DataValidated": (version + 1, old_fields + [("source", STRING, version + 1)])})
+    event_types = {"DataValidated": DataValidatedWithSource}
+    new_event = DataValidatedWithSource("data-1", "partner-1", True)
+    new_event.source = "replay"
+
+    # A new consumer reads old messages without the field, an old consumer ignores it
+    assert new_codec.decode(old_codec.encode(DataValidated("data-1", "partner-1", True)), event_types).source is None
+    assert new_codec.decode(new_codec.encode(new_event), event_types).source == "replay"
+    assert fields(old_codec.decode(new_codec.encode(new_event))) == fields(new_event)
+
+
+def test_message_that_does_not_match_its_schema_version_is_rejected():
+    codec = BinaryCodec()
+    encoded = codec.encode(DataProcessed("data-1", "partner-1", {}))
+
+    with pytest.raises(ValueError):
+        codec.decode(encoded + b"\x00")
+
+
+def test_unknown_event_type_decodes_to_none():
+    codec = BinaryCodec(schemas={"DataFlagged": (1, [("id", STRING), ("flag", BOOL)])})
+
+    class DataFlagged(events.DomainEvent):
+        __slots__ = ("flag",)
+
+    event = DataFlagged()
+    event.flag = True
+
+    assert codec.decode(codec.encode(event)) is None
+    assert codec.decode(codec.encode(event), {"DataFlagged": DataFlagged}).flag is True
+
+
+def test_unknown_codec_is_rejected():
+    with pytest.raises(ValueError):
+        get_codec("avro")
+    assert isinstance(get_codec("binary", compress_threshold=10), BinaryCodec)
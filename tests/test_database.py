@@ -0,0 +1,30 @@
+# tests/test_database.py
+from sqlalchemy import create_engine, inspect, text
+
+import infrastructure.database as database
+
+
+def test_missing_nullable_columns_are_added_to_existing_tables(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path}/old.db")
+    monkeypatch.setattr(database, "engine", engine)
+    database.Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        # The outbox as created before the dead-letter columns existed
+        connection.execute(text("DROP TABLE outbox"))
+        connection.execute(text(
+            "CREATE TABLE outbox (id VARCHAR PRIMARY KEY, event_type VARCHAR NOT NULL, data TEXT NOT NULL, "
+            "created_at DATETIME NOT NULL, sent_at DATETIME, attempts INTEGER NOT NULL)"
+        ))
+        connection.execute(text(
+            "INSERT INTO outbox VALUES ('e1', 'DataIngested', '{}', '2024-01-01 00:00:00', NULL, 0)"
+        ))
+
+    database._add_missing_columns()
+    # Running it again finds nothing to add
+    database._add_missing_columns()
+
+    columns = {column["name"] for column in inspect(engine).get_columns("outbox")}
+    assert {"failed_at", "last_error"} <= columns
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT id, failed_at, last_error FROM outbox")).all() == [("e1", None, None)]
+    engine.dispose()
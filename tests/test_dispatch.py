@@ -0,0 +1,41 @@
+# tests/test_dispatch.py
+import threading
+
+from domain.events import DataIngested, DataValidated
+from infrastructure.dispatch import BLOCK, DROP, BoundedExecutor
+from infrastructure.event_bus import SimpleEventBus
+from infrastructure.metrics import DISPATCH_OVERFLOW
+
+
+def occupy(executor):
+    release = threading.Event()
+    executor.submit(release.wait)
+    return release
+
+
+def test_drop_schedules_all_handlers_or_none():
+    executor = BoundedExecutor(max_workers=1, max_queue_size=1, overflow_policy=DROP, name="test-drop")
+    release = occupy(executor)
+    ran = []
+
+    assert executor.submit_all([(ran.append, (1,)), (ran.append, (2,))]) is None
+    # The slot taken for the first call was given back
+    queued = executor.submit(ran.append, 3)
+    release.set()
+    queued.result(timeout=5)
+    executor.shutdown()
+
+    assert ran == [3]
+    assert DISPATCH_OVERFLOW.labels("test-drop", "dropped").value == 2
+
+
+def test_nested_publish_on_a_full_blocking_executor_runs_inline():
+    bus = SimpleEventBus(BoundedExecutor(max_workers=1, max_queue_size=0, overflow_policy=BLOCK))
+    validated = threading.Event()
+    bus.subscribe(DataIngested, lambda event: bus.publish(DataValidated(event.data_id, event.partner_id, True)))
+    bus.subscribe(DataValidated, lambda event: validated.set())
+
+    bus.publish(DataIngested("data-1", "p1", None))
+
+    assert validated.wait(timeout=5)
+    bus.executor.shutdown()
@@ -0,0 +1,202 @@
+# tests/test_event_bus.py
+from datetime import datetime
+
+import pytest
+
+from domain.events import DataIngested
+from infrastructure.codecs import CODEC_PROPERTY, JSON_CODEC
+from infrastructure.dispatch import BoundedExecutor
+from infrastructure.event_bus import PulsarEventBus
+
+
+class FakeMessage:
+    def __init__(self, index, data, codec="json"):
+        self.index = index
+        self._data = data
+        self._properties = {CODEC_PROPERTY: codec}
+
+    def data(self):
+        return self._data
+
+    def properties(self):
+        return self._properties
+
+    def message_id(self):
+        return self.index
+
+
+class FakeExclusiveConsumer:
+    """Replays a topic from the last cumulative ack when told to redeliver, like an Exclusive consumer"""
+
+    def __init__(self, messages, batch_size):
+        self.messages = messages
+        self.batch_size = batch_size
+        self.acked_up_to = 0
+        self.position = 0
+        self.nacked = []
+
+    def batch_receive(self):
+        batch = self.messages[self.position:self.position + self.batch_size]
+        self.position += len(batch)
+        return batch
+
+    def acknowledge(self, msg):
+        pass
+
+    def negative_acknowledge(self, msg):
+        self.nacked.append(msg.index)
+
+    def acknowledge_cumulative(self, msg):
+        self.acked_up_to = msg.index + 1
+
+    def redeliver_unacknowledged_messages(self):
+        self.position = self.acked_up_to
+
+
+@pytest.fixture
+def bus():
+    bus = PulsarEventBus(executor=BoundedExecutor(max_workers=2, max_queue_size=10), redelivery_delay=0)
+    bus.event_type_mapping["DataIngested"] = DataIngested
+    yield bus
+    bus.executor.shutdown()
+    bus.client.close()
+
+
+def _message(index):
+    return FakeMessage(index, JSON_CODEC.encode(DataIngested(f"data-{index}", "partner-1", datetime(2024, 1, 1))))
+
+
+def _consume(bus, consumer, rounds):
+    topic = bus._get_topic_name(DataIngested)
+    counters = bus._message_counters(DataIngested)
+    for _ in range(rounds):
+        messages = consumer.batch_receive()
+        if messages:
+            bus._handle_batch(consumer, topic, messages, True, True, counters)
+
+
+def test_failed_batch_is_redelivered_before_later_messages(bus):
+    calls = []
+
+    def handler(events):
+        calls.append([event.data_id for event in events])
+        if len(calls) == 1:
+            raise RuntimeError("handler failure")
+
+    bus.batch_subscribers[bus._get_topic_name(DataIngested)] = [handler]
+    consumer = FakeExclusiveConsumer([_message(index) for index in range(4)], batch_size=2)
+    _consume(bus, consumer, rounds=4)
+
+    assert calls == [["data-0", "data-1"], ["data-0", "data-1"], ["data-2", "data-3"]]
+    assert consumer.acked_up_to == 4
+
+
+def test_undecodable_message_stops_the_cumulative_ack(bus):
+    calls = []
+    bus.batch_subscribers[bus._get_topic_name(DataIngested)] = [
+        lambda events: calls.append([event.data_id for event in events])
+    ]
+    messages = [_message(0), FakeMessage(1, b"\x00", codec="unknown"), _message(2)]
+    consumer = FakeExclusiveConsumer(messages, batch_size=3)
+    _consume(bus, consumer, rounds=3)
+
+    # data-0 is handled once and acknowledged; data-2 is never acknowledged past the bad message
+    assert calls == [["data-0"]]
+    assert consumer.acked_up_to == 1
+
+
+class ListenerStopped(BaseException):
+    """Ends a listener loop once the fake topic is drained"""
+
+
+class FlakyAckConsumer(FakeExclusiveConsumer):
+    """Fails its first cumulative ack and stops the listener once drained"""
+
+    def __init__(self, messages, batch_size):
+        super().__init__(messages, batch_size)
+        self.ack_failures = 1
+
+    def batch_receive(self):
+        batch = super().batch_receive()
+        if not batch:
+            raise ListenerStopped()
+        return batch
+
+    def acknowledge_cumulative(self, msg):
+        if self.ack_failures:
+            self.ack_failures -= 1
+            raise RuntimeError("connection lost")
+        super().acknowledge_cumulative(msg)
+
+
+def test_batch_listener_survives_a_failing_acknowledgement(bus):
+    calls = []
+    topic = bus._get_topic_name(DataIngested)
+    bus.batch_subscribers[topic] = [lambda events: calls.append([event.data_id for event in events])]
+    consumer = FlakyAckConsumer([_message(index) for index in range(4)], batch_size=2)
+
+    with pytest.raises(ListenerStopped):
+        bus._batch_listener(consumer, topic, True, True, bus._message_counters(DataIngested))
+
+    # The listener kept consuming after the error and nacked the batch it could not acknowledge
+    assert calls == [["data-0", "data-1"], ["data-2", "data-3"]]
+    assert consumer.nacked == [0, 1]
+    assert consumer.acked_up_to == 4
+
+
+class FakeKeySharedConsumer(FakeExclusiveConsumer):
+    """Acknowledges one message at a time and redelivers from the first unacknowledged one"""
+
+    def __init__(self, messages):
+        super().__init__(messages, batch_size=1)
+        self.acked = []
+
+    def receive(self):
+        return self.batch_receive()[0]
+
+    def acknowledge(self, msg):
+        self.acked.append(msg.index)
+
+    def redeliver_unacknowledged_messages(self):
+        self.position = min(index for index in range(len(self.messages)) if index not in self.acked)
+
+
+def test_ordered_consumer_does_not_move_past_a_failed_message(bus):
+    calls = []
+
+    def handler(event):
+        calls.append(event.data_id)
+        if calls == ["data-0", "data-1"]:
+            raise RuntimeError("handler failure")
+
+    topic = bus._get_topic_name(DataIngested)
+    bus.subscribers[topic] = [handler]
+    consumer = FakeKeySharedConsumer([_message(index) for index in range(3)])
+    received, acked, nacked = bus._message_counters(DataIngested)
+    for _ in range(4):
+        bus._handle_message(consumer, topic, consumer.receive(), True, acked, nacked)
+
+    assert calls == ["data-0", "data-1", "data-1", "data-2"]
+    assert consumer.acked == [0, 1, 2]
+    assert consumer.nacked == []
+
+
+def test_in_order_batch_is_rewound_after_a_failure(bus):
+    calls = []
+
+    def handler(events):
+        calls.append([event.data_id for event in events])
+        if len(calls) == 1:
+            raise RuntimeError("handler failure")
+
+    topic = bus._get_topic_name(DataIngested)
+    bus.batch_subscribers[topic] = [handler]
+    consumer = FakeKeySharedConsumer([_message(index) for index in range(4)])
+    consumer.batch_size = 2
+    counters = bus._message_counters(DataIngested)
+    for _ in range(3):
+        bus._handle_batch(consumer, topic, consumer.batch_receive(), False, True, counters)
+
+    assert calls == [["data-0", "data-1"], ["data-0", "data-1"], ["data-2", "data-3"]]
+    assert consumer.acked == [0, 1, 2, 3]
+    assert consumer.nacked == []
@@ -0,0 +1,53 @@
+# tests/test_event_store.py
+import pytest
+
+from application.commands import IngestDataBatchCommand, IngestDataBatchCommandHandler
+from domain.events import DataValidated
+from domain.ids import derived_id
+from infrastructure.database import IngestedDataModel, SessionLocal, create_tables
+from infrastructure.event_bus import SimpleEventBus
+from infrastructure.event_store import SQLAlchemyEventStore
+from infrastructure.repositories_impl import SQLAlchemyDataRepository
+
+
+class FailingEventStore(SQLAlchemyEventStore):
+    def append_in(self, session, events):
+        super().append_in(session, events)
+        raise RuntimeError("event store unavailable")
+
+
+@pytest.fixture(autouse=True)
+def tables():
+    create_tables()
+
+
+def test_data_and_events_are_written_in_one_transaction():
+    store = SQLAlchemyEventStore()
+    repository = SQLAlchemyDataRepository(event_store=store)
+    handler = IngestDataBatchCommandHandler(repository, SimpleEventBus(), event_store=store)
+
+    results = handler.handle(IngestDataBatchCommand([{"partner_id": "p1", "payload": {"n": 1}}]))
+    data_id = results[0][0].id
+
+    assert [type(event).__name__ for _, event in store.get_events(data_id)] == ["DataIngested"]
+
+
+def test_failed_event_store_write_rolls_back_the_data():
+    repository = SQLAlchemyDataRepository(event_store=FailingEventStore())
+    handler = IngestDataBatchCommandHandler(repository, SimpleEventBus())
+
+    with pytest.raises(RuntimeError):
+        handler.handle(IngestDataBatchCommand([{"partner_id": "p-rollback", "payload": {"n": 1}}]))
+
+    with SessionLocal() as session:
+        assert session.query(IngestedDataModel).filter_by(partner_id="p-rollback").count() == 0
+
+
+def test_reaction_to_a_redelivered_event_is_stored_once():
+    store = SQLAlchemyEventStore()
+    for _ in range(2):
+        validated = DataValidated("data-1", "p1", True, [])
+        validated.id = derived_id("ingested-1", "DataValidated")
+        store.append([validated])
+
+    assert len(store.get_events("data-1")) == 1
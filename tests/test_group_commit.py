@@ -0,0 +1,95 @@
+# tests/test_group_commit.py
+import threading
+
+import pytest
+
+from domain.factories import IngestedDataFactory
+from infrastructure.group_commit import GroupCommitDataRepository
+from infrastructure.repositories_impl import InMemoryDataRepository
+
+
+def test_add_after_close_raises_instead_of_blocking():
+    repository = GroupCommitDataRepository(InMemoryDataRepository())
+    factory = IngestedDataFactory()
+    repository.add(factory.create("p1", {"n": 1}))
+    repository.close()
+
+    with pytest.raises(RuntimeError):
+        repository.add(factory.create("p1", {"n": 2}))
+    repository.close()
+
+
+
+class RecordingRepository(InMemoryDataRepository):
+    """Records each add_many call and fails the ones containing a rejected partner"""
+
+    def __init__(self, rejected=None):
+        super().__init__()
+        self.rejected = rejected
+        self.batches = []
+        self.added = []
+
+    def add_many(self, data_list):
+        self.batches.append([data.id for data in data_list])
+        if any(data.partner_id.value == self.rejected for data in data_list):
+            raise ValueError("constraint violated")
+        super().add_many(data_list)
+
+    def add(self, data):
+        self.added.append(data.id)
+        if data.partner_id.value == self.rejected:
+            raise ValueError("constraint violated")
+        super().add(data)
+
+
+def _add_concurrently(repository, records):
+    errors = {}
+    start = threading.Barrier(len(records))
+
+    def add(data):
+        start.wait()
+        try:
+            repository.add(data)
+        except Exception as e:
+            errors[data.id] = e
+
+    threads = [threading.Thread(target=add, args=(data,)) for data in records]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+def test_concurrent_adds_share_one_transaction():
+    source = RecordingRepository()
+    # A window long enough for every thread to queue its write
+    repository = GroupCommitDataRepository(source, window_ms=500)
+    factory = IngestedDataFactory()
+    records = [factory.create(f"p{index}", {"n": index}) for index in range(8)]
+
+    errors = _add_concurrently(repository, records)
+    repository.close()
+
+    assert errors == {}
+    assert len(source.batches) == 1
+    assert sorted(source.batches[0]) == sorted(data.id for data in records)
+    assert source.get_by_ids(data.id for data in records).keys() == {data.id for data in records}
+
+
+def test_failed_group_is_retried_row_by_row():
+    source = RecordingRepository(rejected="bad")
+    repository = GroupCommitDataRepository(source, window_ms=500)
+    factory = IngestedDataFactory()
+    good = [factory.create(f"p{index}", {"n": index}) for index in range(3)]
+    bad = factory.create("bad", {"n": 3})
+
+    errors = _add_concurrently(repository, good + [bad])
+    repository.close()
+
+    assert len(source.batches) == 1
+    assert sorted(source.added) == sorted(data.id for data in good + [bad])
+    # Only the bad row's caller sees the error, the others are committed
+    assert list(errors) == [bad.id] and isinstance(errors[bad.id], ValueError)
+    assert source.get_by_ids(data.id for data in good).keys() == {data.id for data in good}
+    assert source.get_by_id(bad.id) is None
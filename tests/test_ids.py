@@ -0,0 +1,51 @@
+# tests/test_ids.py
+import uuid
+
+import pytest
+
+import domain.ids
+from domain.ids import UUID4Generator, UUID7Generator, derived_id
+
+
+@pytest.fixture
+def frozen_clock(monkeypatch):
+    now = [1_700_000_000_000 * 1_000_000]
+    monkeypatch.setattr(domain.ids.time, "time_ns", lambda: now[0])
+    return now
+
+
+def test_uuid7_ids_are_increasing_within_one_millisecond(frozen_clock):
+    generator = UUID7Generator()
+
+    ids = [generator.new_id() for _ in range(5000)]
+
+    # More ids than the counter holds: the millisecond is advanced, never reused backwards
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert [uuid.UUID(value) for value in ids] == sorted(uuid.UUID(value) for value in ids)
+
+
+def test_uuid7_ids_keep_increasing_when_the_clock_goes_back(frozen_clock):
+    generator = UUID7Generator()
+    first = generator.new_id()
+    frozen_clock[0] -= 5_000 * 1_000_000
+
+    assert generator.new_id() > first
+
+
+def test_uuid7_layout(frozen_clock):
+    parsed = uuid.UUID(UUID7Generator().new_id())
+
+    assert parsed.version == 7
+    assert parsed.variant == uuid.RFC_4122
+    assert parsed.int >> 80 == frozen_clock[0] // 1_000_000
+
+
+def test_uuid4_generator_keeps_the_original_format():
+    assert uuid.UUID(UUID4Generator().new_id()).version == 4
+
+
+def test_derived_ids_are_stable_per_source_and_name():
+    assert derived_id("event-1", "DataValidated") == derived_id("event-1", "DataValidated")
+    assert derived_id("event-1", "DataValidated") != derived_id("event-1", "DataProcessed")
+    assert derived_id("event-1", "DataValidated") != derived_id("event-2", "DataValidated")
@@ -0,0 +1,88 @@
+# tests/test_metrics.py
+from sqlalchemy import create_engine, text
+
+from infrastructure.metrics import (
+    DB_POOL_CHECKED_OUT, DB_POOL_CHECKOUT_SECONDS, REGISTRY, Counter, Gauge, Histogram, MetricsRegistry,
+    instrument_engine, timed
+)
+
+
+def test_histogram_renders_cumulative_buckets_sum_and_count():
+    registry = MetricsRegistry()
+    histogram = Histogram("test_seconds", "Test durations", ("method",), buckets=(0.1, 1.0), registry=registry)
+    series = histogram.labels("get")
+    for value in (0.05, 0.5, 0.5, 3.0):
+        series.observe(value)
+
+    assert registry.render().splitlines() == [
+        "# HELP test_seconds Test durations",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{method="get",le="0.1"} 1',
+        'test_seconds_bucket{method="get",le="1.0"} 3',
+        'test_seconds_bucket{method="get",le="+Inf"} 4',
+        'test_seconds_sum{method="get"} 4.05',
+        'test_seconds_count{method="get"} 4',
+    ]
+
+
+def test_label_values_are_escaped_and_metrics_sorted_by_name():
+    registry = MetricsRegistry()
+    gauge = Gauge("b_gauge", "A gauge", ("topic",), registry=registry)
+    counter = Counter("a_total", "A counter", ("topic",), registry=registry)
+    counter.labels('say "hi"\\\n').inc(2)
+    gauge.labels("x").set_function(lambda: 7)
+
+    assert registry.render().splitlines() == [
+        "# HELP a_total A counter",
+        "# TYPE a_total counter",
+        'a_total{topic="say \\"hi\\"\\\\\\n"} 2',
+        "# HELP b_gauge A gauge",
+        "# TYPE b_gauge gauge",
+        'b_gauge{topic="x"} 7',
+    ]
+
+
+def test_global_registry_renders_the_service_metrics():
+    rendered = REGISTRY.render()
+
+    assert "# TYPE ingestion_repository_seconds histogram" in rendered
+    assert "# TYPE ingestion_messages_received_total counter" in rendered
+    assert rendered.endswith("\n")
+
+
+def test_timed_generator_observes_once_when_closed_early():
+    registry = MetricsRegistry()
+    series = Histogram("gen_seconds", "Generator", registry=registry).labels()
+
+    @timed(series)
+    def numbers():
+        yield from range(10)
+
+    produced = numbers()
+    assert series.count == 0
+    assert [next(produced) for _ in range(3)] == [0, 1, 2]
+    produced.close()
+
+    assert series.count == 1
+    assert list(numbers()) == list(range(10))
+    assert series.count == 2
+
+
+def test_pool_checkouts_are_timed_and_counted(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/metrics.db")
+    instrument_engine(engine, "test-db")
+    checkout_seconds = DB_POOL_CHECKOUT_SECONDS.labels("test-db")
+    checked_out = DB_POOL_CHECKED_OUT.labels("test-db")
+
+    with engine.connect() as connection:
+        connection.execute(text("select 1"))
+        assert checked_out.get() == 1
+    assert checked_out.get() == 0
+    assert checkout_seconds.count == 1
+
+    # The pool that replaces a disposed one is instrumented as well
+    engine.dispose()
+    with engine.connect() as connection:
+        connection.execute(text("select 1"))
+    assert checkout_seconds.count == 2
+    engine.dispose()
@@ -0,0 +1,102 @@
+# tests/test_outbox.py
+import json
+
+import pytest
+from sqlalchemy import delete, select
+
+from domain.factories import IngestedDataFactory
+from infrastructure.database import OutboxModel, SessionLocal, create_tables
+from infrastructure.outbox import OutboxRelay
+from infrastructure.repositories_impl import SQLAlchemyDataRepository
+
+
+class PoisonBus:
+    """Fails every batch containing one of the poison data IDs"""
+
+    def __init__(self, poison):
+        self.poison = set(poison)
+        self.published = []
+
+    def publish_batch(self, events):
+        if any(event.data_id in self.poison for event in events):
+            raise RuntimeError("cannot publish")
+        self.published.extend(event.data_id for event in events)
+
+
+@pytest.fixture
+def outbox_ids():
+    create_tables()
+    with SessionLocal() as session:
+        session.execute(delete(OutboxModel))
+        session.commit()
+    factory = IngestedDataFactory()
+    entities = [factory.create(f"partner-{index}", {"index": index}) for index in range(6)]
+    SQLAlchemyDataRepository(outbox=True).add_many(entities)
+    return [entity.id for entity in entities]
+
+
+def _rows():
+    """Outbox rows keyed by the data ID of their event"""
+    with SessionLocal() as session:
+        return {json.loads(row.data)["data_id"]: row for row in session.scalars(select(OutboxModel))}
+
+
+class DownBus:
+    """Fails every publish, like a broker outage"""
+
+    def publish_batch(self, events):
+        raise ConnectionError("broker unavailable")
+
+
+def test_poison_event_is_dead_lettered_and_stops_blocking(outbox_ids):
+    bus = PoisonBus([outbox_ids[2]])
+    relay = OutboxRelay(bus, batch_size=10, max_attempts=2)
+
+    # The events around the poison event go out; it is held back with one attempt
+    assert relay.relay_once() == 5
+    assert bus.published == outbox_ids[:2] + outbox_ids[3:]
+    assert _rows()[outbox_ids[2]].attempts == 1
+
+    # Alone, its failure cannot be told from an outage
+    with pytest.raises(RuntimeError):
+        relay.relay_once()
+    assert _rows()[outbox_ids[2]].attempts == 1
+
+    factory = IngestedDataFactory()
+    later = factory.create("partner-later", {"index": 6})
+    SQLAlchemyDataRepository(outbox=True).add_many([later])
+    assert relay.relay_once() == 1
+
+    dead = [row for row in _rows().values() if row.failed_at is not None]
+    assert [json.loads(row.data)["data_id"] for row in dead] == [outbox_ids[2]]
+    assert dead[0].attempts == 2 and dead[0].last_error == "cannot publish"
+
+
+def test_adjacent_poison_events_do_not_block_the_rest(outbox_ids):
+    bus = PoisonBus(outbox_ids[1:3])
+
+    assert OutboxRelay(bus, batch_size=10).relay_once() == 4
+    assert bus.published == [outbox_ids[0]] + outbox_ids[3:]
+
+
+def test_outage_dead_letters_nothing(outbox_ids):
+    relay = OutboxRelay(DownBus(), batch_size=10, max_attempts=2)
+
+    for _ in range(5):
+        with pytest.raises(ConnectionError):
+            relay.relay_once()
+
+    rows = _rows().values()
+    assert all(row.failed_at is None and row.sent_at is None and not row.attempts for row in rows)
+
+
+def test_unknown_event_type_is_dead_lettered(outbox_ids):
+    with SessionLocal() as session:
+        row = session.scalars(select(OutboxModel).order_by(OutboxModel.created_at)).first()
+        row.data = row.data.replace("DataIngested", "RemovedEvent")
+        session.commit()
+    bus = PoisonBus([])
+
+    assert OutboxRelay(bus, batch_size=10).relay_once() == 5
+    failed = [row for row in _rows().values() if row.failed_at is not None]
+    assert len(failed) == 1 and failed[0].sent_at is None
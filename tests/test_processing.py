@@ -0,0 +1,71 @@
+# tests/test_processing.py
+import random
+import threading
+import time
+
+import pytest
+
+from infrastructure.processing import PartitionedExecutor
+
+
+def test_tasks_of_a_key_run_in_submission_order():
+    executor = PartitionedExecutor(workers=4, name="test-order")
+    runs = []
+    lock = threading.Lock()
+
+    def step(key, index):
+        time.sleep(random.random() / 1000)
+        with lock:
+            runs.append((key, index))
+
+    keys = [f"partner-{index}" for index in range(10)]
+    futures = [executor.submit(key, step, key, index) for index in range(20) for key in keys]
+    for future in futures:
+        future.result()
+    executor.shutdown()
+
+    for key in keys:
+        assert [index for run_key, index in runs if run_key == key] == list(range(20))
+
+
+def test_a_failed_task_does_not_stop_its_lane():
+    executor = PartitionedExecutor(workers=1, name="test-failure")
+
+    def fail():
+        raise ValueError("bad payload")
+
+    failed = executor.submit("partner-1", fail)
+    after = executor.submit("partner-1", lambda: "done")
+
+    assert after.result() == "done"
+    with pytest.raises(ValueError):
+        failed.result()
+    executor.shutdown()
+    assert executor.stats()["failed"] == 1
+
+
+def test_shutdown_finishes_submitted_tasks_and_refuses_new_ones():
+    executor = PartitionedExecutor(workers=2, name="test-shutdown")
+    release = threading.Event()
+    finished = []
+
+    def step(index):
+        release.wait()
+        finished.append(index)
+
+    futures = [executor.submit(f"partner-{index % 3}", step, index) for index in range(6)]
+    stopper = threading.Thread(target=executor.shutdown)
+    stopper.start()
+    time.sleep(0.05)
+    # Still draining: shutdown waits for the accepted tasks
+    assert stopper.is_alive()
+    with pytest.raises(RuntimeError):
+        executor.submit("partner-0", step, 6)
+
+    release.set()
+    stopper.join(timeout=5)
+
+    assert not stopper.is_alive()
+    assert all(future.done() for future in futures)
+    assert sorted(finished) == list(range(6))
+    assert executor.stats()["in_flight"] == 0
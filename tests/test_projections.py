@@ -0,0 +1,81 @@
+# tests/test_projections.py
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from domain.events import DataIngested, DataValidated
+from domain.repositories import DataRepository
+from infrastructure.projections import DataViewProjection, ProjectionDataRepository
+
+
+@pytest.fixture
+def projection(tmp_path):
+    projection = DataViewProjection(lambda ids: {}, f"sqlite:///{tmp_path}/query_model.db")
+    projection.create_tables()
+    return projection
+
+
+def ingested(data_id):
+    return DataIngested(data_id, "partner-1", datetime(2024, 1, 1), {"value": data_id})
+
+
+def validated(data_id, is_valid, occurred_on):
+    event = DataValidated(data_id, "partner-1", is_valid, [] if is_valid else ["invalid"])
+    event.occurred_on = occurred_on
+    return event
+
+
+def test_read_repository_has_no_write_methods(projection):
+    repository = ProjectionDataRepository(projection)
+
+    assert not isinstance(repository, DataRepository)
+    assert not hasattr(repository, "add")
+    assert not hasattr(repository, "update")
+
+
+def test_events_of_one_row_in_separate_batches_complete_it(projection):
+    now = datetime.utcnow()
+    projection.apply([validated("a", False, now)])
+    projection.apply([ingested("a")])
+    projection.apply([validated("a", True, now - timedelta(seconds=1))])
+
+    view = ProjectionDataRepository(projection).get_view("a")
+
+    assert view["payload"] == {"value": "a"}
+    assert view["validation"]["is_valid"] is False
+
+
+def test_concurrent_batches_creating_the_same_rows_do_not_conflict(projection):
+    ids = [f"id-{index}" for index in range(200)]
+    now = datetime.utcnow()
+    batches = [[ingested(data_id) for data_id in ids], [validated(data_id, True, now) for data_id in ids]]
+    errors = []
+    start = threading.Barrier(len(batches))
+
+    def apply(batch):
+        start.wait()
+        try:
+            projection.apply(batch)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=apply, args=(batch,)) for batch in batches]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    views = [ProjectionDataRepository(projection).get_view(data_id) for data_id in ids]
+    assert all(view["payload"] == {"value": view["id"]} and view["validation"]["is_valid"] for view in views)
+
+
+def test_get_by_ids_reads_in_chunks(projection):
+    ids = [f"id-{index}" for index in range(25)]
+    projection.apply([ingested(data_id) for data_id in ids])
+    repository = ProjectionDataRepository(projection, in_chunk_size=10)
+
+    found = repository.get_by_ids(ids + ids[:3] + ["missing"])
+
+    assert sorted(found) == sorted(ids)
@@ -0,0 +1,40 @@
+# tests/test_request_params.py
+from datetime import datetime
+
+import pytest
+
+from infrastructure.request_params import MAX_PAGE_SIZE, page_limit, time_param
+
+
+@pytest.mark.parametrize("value", [
+    "2024-01-01T00:00:00Z",
+    "2024-01-01T00:00:00z",
+    "2024-01-01T01:00:00+01:00",
+    "2024-01-01T01:00:00 01:00",
+    "2024-01-01 01:00 01:00",
+    "2024-01-01T00:00:00",
+    "2024-01-01 00:00",
+])
+def test_time_param_returns_naive_utc(value):
+    assert time_param(value) == datetime(2024, 1, 1)
+
+
+def test_time_param_converts_negative_offsets():
+    assert time_param("2023-12-31T21:30:00-02:30") == datetime(2024, 1, 1)
+
+
+def test_time_param_rejects_garbage():
+    with pytest.raises(ValueError):
+        time_param("yesterday")
+
+
+def test_page_limit_defaults_and_clamps():
+    assert page_limit(None) == 100
+    assert page_limit("5") == 5
+    assert page_limit(str(MAX_PAGE_SIZE + 1)) == MAX_PAGE_SIZE
+
+
+@pytest.mark.parametrize("value", ["0", "-3", "ten"])
+def test_page_limit_rejects_non_positive_numbers(value):
+    with pytest.raises(ValueError):
+        page_limit(value)
@@ -0,0 +1,95 @@
+# tests/test_validation.py
+import json
+import os
+
+import pytest
+
+import domain.validation
+from domain.validation import RuleDefinitionError, RuleEngine, compile_rule_set
+from infrastructure.validation_rules import RulesFileWatcher
+
+
+@pytest.fixture
+def compile_count(monkeypatch):
+    calls = []
+    original = domain.validation.compile_rule_set
+
+    def counting(rule_set):
+        calls.append(rule_set.get("version"))
+        return original(rule_set)
+    monkeypatch.setattr(domain.validation, "compile_rule_set", counting)
+    return calls
+
+
+def test_default_rules_match_the_original_validator():
+    engine = RuleEngine()
+
+    assert engine.validate("any", {"name": "Ann", "age": 30}) == (True, [])
+    assert engine.validate("any", {"name": "", "age": 130}) == (
+        False, ["Name field is required", "Age must be between 0 and 120"]
+    )
+    assert engine.validate("any", {"name": "Ann", "age": "30"}) == (False, ["Age must be a number"])
+    assert engine.validate("any", ["not", "an", "object"]) == (False, ["Payload must be a JSON object"])
+
+
+def test_booleans_are_not_numbers():
+    validate = compile_rule_set({"rules": [{"path": "age", "type": "number", "min": 0}]})
+
+    assert validate({"age": True}) == (False, ["age must be of type number"])
+    assert validate({"age": 1.5}) == (True, [])
+
+
+def test_rules_on_nested_paths():
+    validate = compile_rule_set({"rules": [
+        {"path": "user.email", "required": True, "pattern": "^[^@]+@[^@]+$"},
+        {"path": "status", "enum": ["new", "done"], "messages": {"enum": "Unknown status"}},
+        {"path": "tags", "min_length": 1, "max_length": 2},
+    ]})
+
+    assert validate({"user": {"email": "a@b"}, "status": "new", "tags": ["x"]}) == (True, [])
+    assert validate({"user": {}, "status": "old", "tags": []}) == (
+        False, ["user.email is required", "Unknown status", "tags has an invalid length"]
+    )
+    assert validate({"user": {"email": "nope"}}) == (False, ["user.email must match ^[^@]+@[^@]+$"])
+
+
+@pytest.mark.parametrize("rule", [{"type": "number"}, {"path": "a", "type": "decimal"}, {"path": "a", "pattern": "("}])
+def test_invalid_rules_are_rejected(rule):
+    with pytest.raises(RuleDefinitionError):
+        compile_rule_set({"rules": [rule]})
+
+
+def test_engine_compiles_each_version_once(compile_count):
+    engine = RuleEngine()
+    acme = {"version": 1, "rules": [{"path": "id", "required": True}]}
+    engine.update({"acme": acme})
+    engine.validate("acme", {"id": 1})
+    engine.validate("other", {"name": "Ann"})
+    engine.update({"acme": acme})
+
+    assert compile_count == [1, 1]
+
+    engine.update({"acme": {"version": 2, "rules": []}})
+
+    assert compile_count == [1, 1, 2]
+    assert engine.validate("acme", {}) == (True, [])
+
+
+def test_watcher_reloads_changed_file_and_keeps_rules_of_a_broken_one(tmp_path, compile_count):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"partners": {"acme": {"version": 1, "rules": [{"path": "id", "required": True}]}}}))
+    engine = RuleEngine()
+    watcher = RulesFileWatcher(engine, str(path))
+
+    assert watcher.refresh()
+    assert not watcher.refresh()
+    # The partner's and the default rule set, each compiled once
+    assert len(compile_count) == 2
+    assert engine.validate("acme", {}) == (False, ["id is required"])
+
+    path.write_text(json.dumps({"partners": {"acme": {"version": 2, "rules": [{"path": "id", "type": "oops"}]}}}))
+    os.utime(path, (1, 1))
+
+    with pytest.raises(RuleDefinitionError):
+        watcher.refresh()
+    assert engine.validate("acme", {}) == (False, ["id is required"])
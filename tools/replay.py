@@ -0,0 +1,352 @@
+#!/usr/bin/env python
+# tools/replay.py
+"""Replay stored history through the projection, validation or processing handlers
+
+Reads ingested_data (or the event store) and re-runs one target in batches on a
+pool of processes, sharded by partner ID hash so each partner's records are
+replayed in order by a single process:
+
+    python tools/replay.py --target projection [--source table|events] [--workers 8]
+        [--batch-size 1000] [--checkpoint-dir replay-checkpoints] [--publish] [--reset]
+
+- projection: applies the records to the query service's read model (QUERY_DATABASE_URL)
+- validation / processing: re-runs the rules or the processing step; with --publish
+  the resulting DataValidated / DataProcessed events are published on the event bus
+
+With --source table every worker reads its own partners from ingested_data with
+a server-side cursor. With --source events the event store is streamed by
+sequence number and its batches are fanned out to the workers. Progress is
+checkpointed after every batch, so an interrupted replay resumes where it
+stopped unless --reset is given. A --source table replay only resumes with the
+same --workers, since its checkpoints are per shard.
+
+The projection never overwrites the ingested fields of rows it already has, so
+rebuilding an existing read model takes --reset, which drops and recreates
+data_view before replaying; queries see it empty until the replay completes.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import select, distinct, or_, and_
+from domain.events import DataIngested, DataValidated, DataProcessed
+from domain.validation import RuleEngine
+from infrastructure.processing import lane_for
+
+TARGETS = ("projection", "validation", "processing")
+SOURCES = ("table", "events")
+
+# Partners per IN query when a shard reads its partners from ingested_data
+PARTNER_CHUNK_SIZE = 500
+
+
+def _write_json(path, data):
+    # Write then rename, so an interrupted replay never leaves a truncated checkpoint
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as checkpoint_file:
+        json.dump(data, checkpoint_file)
+    os.replace(temp_path, path)
+
+
+def _read_json(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as checkpoint_file:
+        return json.load(checkpoint_file)
+
+
+def build_handler(target, publish):
+    """Callable applying a list of events to the target; DataIngested events may lack their payload"""
+    from infrastructure.repositories_impl import SQLAlchemyDataRepository
+    data_repo = SQLAlchemyDataRepository()
+
+    if target == "projection":
+        from infrastructure.projections import DataViewProjection
+
+        def load_payloads(ids):
+            return {data_id: data.payload.value for data_id, data in data_repo.get_by_ids(ids).items()}
+        return DataViewProjection(load_payloads).apply
+
+    event_bus = None
+    if publish:
+        from infrastructure.event_bus import create_event_bus
+        event_bus = create_event_bus(f"replay-{target}")
+
+    def payloads_of(events):
+        missing = [event.data_id for event in events if event.payload is None]
+        stored = data_repo.get_by_ids(missing) if missing else {}
+        return [
+            event.payload if event.payload is not None
+            else (stored[event.data_id].payload.value if event.data_id in stored else None)
+            for event in events
+        ]
+
+    if target == "validation":
+        from infrastructure.validation_rules import RulesFileWatcher
+        rule_engine = RuleEngine()
+        rules_path = os.environ.get('VALIDATION_RULES_PATH')
+        if rules_path:
+            RulesFileWatcher(rule_engine, rules_path).refresh()
+
+        def validate(events):
+            events = [event for event in events if isinstance(event, DataIngested)]
+            payloads = payloads_of(events)
+            results = rule_engine.validate_batch(
+                (event.partner_id, payload) for event, payload in zip(events, payloads) if payload is not None
+            )
+            results = iter(results)
+            validated_events = [
+                DataValidated(event.data_id, event.partner_id, *(
+                    next(results) if payload is not None else (False, ["Data not found in repository"])
+                ))
+                for event, payload in zip(events, payloads)
+            ]
+            if event_bus is not None:
+                event_bus.publish_batch(validated_events)
+        return validate
+
+    from application.processing import process_data
+
+    def process(events):
+        events = [event for event in events if isinstance(event, DataIngested)]
+        processed_events = [
+            DataProcessed(event.data_id, event.partner_id, process_data(event.data_id, event.partner_id, event.timestamp, payload))
+            for event, payload in zip(events, payloads_of(events))
+        ]
+        if event_bus is not None:
+            event_bus.publish_batch(processed_events)
+    return process
+
+
+def _shard_checkpoint_path(checkpoint_dir, target, shard, shards):
+    return os.path.join(checkpoint_dir, f"table-{target}-shard-{shard}-of-{shards}.json")
+
+
+def _checkpointed_shard_counts(checkpoint_dir, target):
+    """Worker counts of the table checkpoints left for a target by earlier runs"""
+    pattern = re.compile(rf"table-{re.escape(target)}-shard-\d+-of-(\d+)\.json$")
+    return {int(match.group(1)) for match in map(pattern.match, os.listdir(checkpoint_dir)) if match}
+
+
+def replay_table_shard(shard, shards, partners, target, publish, batch_size, checkpoint_dir):
+    """Replay the ingested_data rows of a shard's partners, ordered by (partner, timestamp, id)"""
+    from infrastructure.database import IngestedDataModel, SessionLocal, engine
+    # Never reuse connections inherited from the parent process
+    engine.dispose(close=False)
+    handle = build_handler(target, publish)
+
+    checkpoint_path = _shard_checkpoint_path(checkpoint_dir, target, shard, shards)
+    checkpoint = _read_json(checkpoint_path) or {"after": None, "count": 0, "done": False}
+    if checkpoint["done"]:
+        return checkpoint["count"]
+    after = checkpoint["after"]
+    count = checkpoint["count"]
+    model = IngestedDataModel
+
+    # The partner list is queried again on every run, so resume from the last partner
+    # replayed rather than from a position in the list; `after` is the last row replayed
+    if after is not None:
+        partners = [partner_id for partner_id in partners if partner_id >= after[0]]
+    for start in range(0, len(partners), PARTNER_CHUNK_SIZE):
+        chunk = partners[start:start + PARTNER_CHUNK_SIZE]
+        query = (
+            select(model.id, model.partner_id, model.timestamp, model.payload)
+            .where(model.partner_id.in_(chunk))
+            .order_by(model.partner_id, model.timestamp, model.id)
+            .execution_options(yield_per=batch_size)
+        )
+        if after is not None:
+            partner_id, timestamp, data_id = after[0], datetime.fromisoformat(after[1]), after[2]
+            query = query.where(or_(
+                model.partner_id > partner_id,
+                and_(model.partner_id == partner_id, or_(
+                    model.timestamp > timestamp,
+                    and_(model.timestamp == timestamp, model.id > data_id)
+                ))
+            ))
+        with SessionLocal() as session:
+            # yield_per streams the rows through a server-side cursor where the driver supports it
+            for rows in session.execute(query).partitions(batch_size):
+                handle([DataIngested(row.id, row.partner_id, row.timestamp, row.payload) for row in rows])
+                last = rows[-1]
+                after = [last.partner_id, last.timestamp.isoformat(), last.id]
+                count += len(rows)
+                _write_json(checkpoint_path, {"after": after, "count": count, "done": False})
+
+    _write_json(checkpoint_path, {"after": after, "count": count, "done": True})
+    return count
+
+
+def replay_table(args):
+    # Partners are sharded by worker count, so other shards' checkpoints do not apply
+    other_counts = _checkpointed_shard_counts(args.checkpoint_dir, args.target) - {args.workers}
+    if other_counts:
+        sys.exit(f"{args.checkpoint_dir} holds the checkpoints of a replay with --workers "
+                 f"{', '.join(map(str, sorted(other_counts)))}; resume it with the same --workers, "
+                 f"or start over with --reset")
+    from infrastructure.database import IngestedDataModel, SessionLocal
+    with SessionLocal() as session:
+        partner_ids = session.scalars(
+            select(distinct(IngestedDataModel.partner_id)).where(IngestedDataModel.partner_id.is_not(None))
+        ).all()
+    shards = [[] for _ in range(args.workers)]
+    for partner_id in partner_ids:
+        shards[lane_for(partner_id, args.workers)].append(partner_id)
+    checkpoint_paths = [_shard_checkpoint_path(args.checkpoint_dir, args.target, shard, args.workers)
+                        for shard in range(args.workers)]
+    print(f"Replaying {len(partner_ids)} partners from ingested_data on {args.workers} processes")
+
+    def progress():
+        return sum((_read_json(path) or {"count": 0})["count"] for path in checkpoint_paths)
+
+    with ProcessPoolExecutor(args.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [
+            pool.submit(replay_table_shard, shard, args.workers, sorted(partners), args.target, args.publish,
+                        args.batch_size, args.checkpoint_dir)
+            for shard, partners in enumerate(shards) if partners
+        ]
+        initial = progress()
+        _report_until_done(futures, progress)
+        return sum(future.result() for future in futures), initial
+
+
+_worker_handler = None
+
+
+def _init_events_worker(target, publish):
+    global _worker_handler
+    from infrastructure.database import engine
+    engine.dispose(close=False)
+    _worker_handler = build_handler(target, publish)
+
+
+def _apply_events(events):
+    _worker_handler(events)
+    return len(events)
+
+
+def replay_events(args):
+    """Stream the event store by sequence and fan each batch out to one process per shard"""
+    from infrastructure.event_store import SQLAlchemyEventStore
+    checkpoint_path = os.path.join(args.checkpoint_dir, f"events-{args.target}.json")
+    checkpoint = _read_json(checkpoint_path) or {"after_sequence": 0, "count": 0}
+    count = checkpoint["count"]
+    event_types = None if args.target == "projection" else ["DataIngested"]
+    print(f"Replaying the event store from sequence {checkpoint['after_sequence']} on {args.workers} processes")
+
+    # One single-process executor per shard keeps each shard's batches in order
+    context = multiprocessing.get_context("spawn")
+    shards = [
+        ProcessPoolExecutor(1, mp_context=context, initializer=_init_events_worker, initargs=(args.target, args.publish))
+        for _ in range(args.workers)
+    ]
+    pending = deque()
+    progress = [count]
+
+    def settle(block):
+        # Checkpoint the highest sequence whose batch and all earlier ones are applied
+        nonlocal checkpoint
+        while pending and (block or all(future.done() for future in pending[0][1])):
+            sequence, futures = pending.popleft()
+            for future in futures:
+                progress[0] += future.result()
+            checkpoint = {"after_sequence": sequence, "count": progress[0]}
+            _write_json(checkpoint_path, checkpoint)
+            block = False
+
+    try:
+        store = SQLAlchemyEventStore()
+        batch = []
+        started = time.perf_counter()
+        last_report = started
+
+        def submit(batch):
+            by_shard = {}
+            for _, event in batch:
+                by_shard.setdefault(lane_for(str(event.partner_id), args.workers), []).append(event)
+            pending.append((batch[-1][0], [shards[shard].submit(_apply_events, events) for shard, events in by_shard.items()]))
+            # Bound the batches in flight, and with them the memory of the reader
+            settle(block=len(pending) > 2 * args.workers)
+
+        for item in store.iter_events(checkpoint["after_sequence"], args.batch_size, event_types):
+            batch.append(item)
+            if len(batch) >= args.batch_size:
+                submit(batch)
+                batch = []
+                now = time.perf_counter()
+                if now - last_report >= 5:
+                    _print_progress(progress[0] - count, now - started)
+                    last_report = now
+        if batch:
+            submit(batch)
+        while pending:
+            settle(block=True)
+    finally:
+        for shard in shards:
+            shard.shutdown()
+    return progress[0], count
+
+
+def _print_progress(done, elapsed):
+    print(f"  {done} records in {elapsed:.1f}s ({done / elapsed if elapsed else 0:,.0f} records/s)")
+
+
+def _report_until_done(futures, progress, interval=5.0):
+    started = time.perf_counter()
+    initial = progress()
+    remaining = set(futures)
+    while remaining:
+        _, remaining = wait(remaining, timeout=interval, return_when=FIRST_COMPLETED)
+        _print_progress(progress() - initial, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", choices=TARGETS, required=True)
+    parser.add_argument("--source", choices=SOURCES, default="table")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--checkpoint-dir", default="replay-checkpoints")
+    parser.add_argument("--publish", action="store_true", help="publish the validation/processing results")
+    parser.add_argument("--reset", action="store_true",
+                        help="remove existing checkpoints and, for the projection, empty the read model first")
+    args = parser.parse_args()
+
+    os.makedirs(args.checkpoint_dir, exist_ok=True)
+    if args.reset:
+        for name in os.listdir(args.checkpoint_dir):
+            if name.startswith(f"{args.source}-{args.target}"):
+                os.remove(os.path.join(args.checkpoint_dir, name))
+    if args.target == "projection":
+        from infrastructure.projections import DataViewProjection
+        projection = DataViewProjection(lambda ids: {})
+        if args.reset:
+            # Rows already in the read model keep their ingested fields, so rebuild it from empty
+            projection.drop_tables()
+        projection.create_tables()
+
+    started = time.perf_counter()
+    total, resumed = replay_table(args) if args.source == "table" else replay_events(args)
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        "source": args.source,
+        "target": args.target,
+        "workers": args.workers,
+        "records": total,
+        "resumed_from": resumed,
+        "seconds": round(elapsed, 2),
+        "records_per_second": round((total - resumed) / elapsed) if elapsed else None,
+    }))
+
+
+if __name__ == "__main__":
+    main()